@@ -0,0 +1,134 @@
+"""Bootstrap many services described in a manifest file."""
+
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from time import perf_counter
+
+import click
+from pydantic import ValidationError
+
+from bootstrap.collector import Collector
+from bootstrap.exceptions import BootstrapError
+from bootstrap.runner import error, highlight, info
+
+# the names of the options accepted by the collector, i.e. by the bootstrap CLI
+COLLECTOR_OPTIONS = {i.name for i in fields(Collector) if i.init}
+
+
+@dataclass(kw_only=True)
+class BatchRunner:
+    """
+    The bootstrap batch runner.
+
+    The manifest `defaults` table and each `services` array entry hold the options
+    of the bootstrap CLI, with underscores, e.g.:
+
+        [defaults]
+        project_name = "My Project"
+
+        [[services]]
+        service_slug = "backend"
+    """
+
+    manifest_path: Path
+    jobs: int = 4
+    options: dict = field(default_factory=dict)
+    collectors: list = field(init=False, default_factory=list)
+    results: dict = field(init=False, default_factory=dict)
+    output_prefixes: dict = field(init=False, default_factory=dict)
+
+    def get_services_options(self):
+        """Return the options of every service, merged with the shared ones."""
+        manifest = tomllib.loads(self.manifest_path.read_text())
+        options = {
+            **{k: v for k, v in self.options.items() if v is not None},
+            **manifest.get("defaults", {}),
+        }
+        return [{**options, **i} for i in manifest.get("services", [])]
+
+    def collect(self):
+        """Collect and validate the options of every service, before running any."""
+        for index, options in enumerate(self.get_services_options(), start=1):
+            if unknown_names := sorted(set(options) - COLLECTOR_OPTIONS):
+                click.echo(
+                    error(
+                        f"Unknown options for service #{index}: "
+                        + ", ".join(unknown_names)
+                    )
+                )
+                raise BootstrapError
+            try:
+                collector = Collector(**options)
+            except ValidationError as e:
+                click.echo(error(f"Invalid options for service #{index}:\n{e}"))
+                raise BootstrapError from e
+            click.echo(highlight(f"Collecting the options for service #{index}:"))
+            collector.collect()
+            self.collectors.append(collector)
+        # the results and the Terraform data are stored by service slug
+        self.check_distinct("slugs", [i.service_slug for i in self.collectors])
+        self.check_distinct(
+            "directories", [i._service_dir.resolve() for i in self.collectors]
+        )
+
+    def check_distinct(self, name, values):
+        """Check the services have distinct values, failing on the duplicate ones."""
+        if duplicates := {i for i in values if values.count(i) > 1}:
+            click.echo(
+                error(
+                    f"Services must have distinct {name}: "
+                    + ", ".join(map(str, sorted(duplicates)))
+                )
+            )
+            raise BootstrapError
+
+    def run_service(self, collector, requirements_locks):
+        """Run the bootstrap of the given service and store its result."""
+        start_time = perf_counter()
+        try:
+            runner = collector.get_runner()
+            runner.requirements_locks = requirements_locks
+            runner.output_prefix = self.output_prefixes[collector.service_slug]
+            runner.run()
+        except Exception as e:
+            succeeded, message = False, f"failed ({str(e) or type(e).__name__})"
+        else:
+            succeeded, message = True, f"done (run id {runner.run_id})"
+        self.results[collector.service_slug] = (
+            succeeded,
+            message,
+            perf_counter() - start_time,
+        )
+
+    def echo_summary(self):
+        """Echo the summary of the services results."""
+        click.echo(highlight("Services summary:"))
+        width = max(map(len, self.results))
+        for service_slug, (succeeded, message, duration) in self.results.items():
+            click.echo(
+                f"{service_slug:<{width}}  {info(f'{duration:7.1f}s')}  "
+                + (highlight(message) if succeeded else error(message))
+            )
+
+    def run(self):
+        """Run the services bootstrap concurrently and echo their summary."""
+        requirements_locks = {}
+        # the concurrent services output lines are told apart by their prefix
+        width = max(len(i.service_slug) for i in self.collectors)
+        self.output_prefixes = {
+            i.service_slug: info(f"{i.service_slug:<{width}} | ")
+            for i in self.collectors
+        }
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            [
+                executor.submit(self.run_service, i, requirements_locks)
+                for i in self.collectors
+            ]
+        self.results = {
+            i.service_slug: self.results[i.service_slug] for i in self.collectors
+        }
+        self.echo_summary()
+        if not all(succeeded for succeeded, *_ in self.results.values()):
+            raise BootstrapError
@@ -0,0 +1,100 @@
+"""Bootstrap render cache."""
+
+import fcntl
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from time import time
+from uuid import uuid4
+
+from bootstrap.constants import RENDER_CACHE_MAX_AGE, RENDER_CACHE_MAX_SIZE
+
+# the Linux ioctl request sharing the data blocks of two files (aka reflink)
+FICLONE = 0x40049409
+
+
+@cache
+def get_tree_hash(*paths):
+    """Return a hash of the names, modes and contents of the given files trees."""
+    tree_hash = hashlib.sha256()
+    for path in paths:
+        for file_path in sorted(path.rglob("*")) if path.is_dir() else [path]:
+            if file_path.is_file():
+                relative_path = file_path.relative_to(path.parent)
+                tree_hash.update(
+                    f"{relative_path}\0{file_path.stat().st_mode}\0".encode()
+                )
+                tree_hash.update(file_path.read_bytes())
+    return tree_hash.hexdigest()
+
+
+def clone_file(src, dst):
+    """Copy the given file, sharing its data blocks if the filesystem allows it."""
+    try:
+        with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+            fcntl.ioctl(f_dst.fileno(), FICLONE, f_src.fileno())
+    except OSError:
+        shutil.copyfile(src, dst)
+    shutil.copymode(src, dst)
+
+
+def get_tree_size(path):
+    """Return the total size of the files in the given tree."""
+    return sum(i.stat().st_size for i in path.rglob("*") if i.is_file())
+
+
+@dataclass
+class RenderCache:
+    """
+    A cache of the rendered service trees, keyed by their template and context.
+
+    Files are cloned rather than hardlinked, because the rendered files are then
+    edited in place, e.g. by the formatter, which would alter the cached ones.
+    """
+
+    path: Path
+    max_age: float = RENDER_CACHE_MAX_AGE
+    max_size: int = RENDER_CACHE_MAX_SIZE
+
+    def materialize(self, key, output_path):
+        """Copy the given cache entry to the output path, if stored."""
+        entry_path = self.path / key
+        if not entry_path.is_dir():
+            return False
+        shutil.copytree(
+            entry_path, output_path, symlinks=True, copy_function=clone_file
+        )
+        os.utime(entry_path)
+        return True
+
+    def store(self, key, source_path):
+        """Store the given tree as a cache entry atomically, and evict stale ones."""
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self.path / f".{key}.{uuid4().hex}"
+        shutil.copytree(source_path, tmp_path, symlinks=True, copy_function=clone_file)
+        try:
+            tmp_path.rename(self.path / key)
+        except OSError:
+            # the same entry was stored concurrently
+            shutil.rmtree(tmp_path)
+        self.evict()
+
+    def evict(self):
+        """Remove the entries unused for too long, and the oldest beyond max size."""
+        entries = sorted(
+            (
+                i
+                for i in self.path.iterdir()
+                if i.is_dir() and not i.name.startswith(".")
+            ),
+            key=lambda i: i.stat().st_mtime,
+            reverse=True,
+        )
+        min_mtime, total_size = time() - self.max_age, 0
+        for entry_path in entries:
+            total_size += get_tree_size(entry_path)
+            if entry_path.stat().st_mtime < min_mtime or total_size > self.max_size:
+                shutil.rmtree(entry_path, ignore_errors=True)
@@ -2,7 +2,6 @@
 
 from dataclasses import dataclass
 from pathlib import Path
-from shutil import rmtree
 
 import click
 from pydantic import validate_arguments
@@ -20,6 +19,7 @@ from bootstrap.constants import (
     MEDIA_STORAGE_DIGITALOCEAN_S3,
     TERRAFORM_BACKEND_CHOICES,
     TERRAFORM_BACKEND_TFC,
+    TERRAFORM_LOG_LEVEL_DEFAULT,
 )
 from bootstrap.helpers import (
     validate_or_prompt_domain,
@@ -67,7 +67,15 @@ class Collector:
     uid: int | None = None
     gid: int | None = None
     terraform_dir: Path | None = None
+    terraform_plugin_cache_dir: Path | None = None
+    terraform_provider_mirror: Path | None = None
+    terraform_log_level: str = TERRAFORM_LOG_LEVEL_DEFAULT
     logs_dir: Path | None = None
+    render_cache_dir: Path | None = None
+    wheelhouse: Path | None = None
+    resume_run_id: str | None = None
+    keep_on_failure: bool = False
+    trace: bool = False
     quiet: bool = False
 
     def __post_init__(self):
@@ -76,6 +84,7 @@ class Collector:
 
     def collect(self):
         """Collect options."""
+        self.set_project_name()
         self.set_project_slug()
         self.set_service_slug()
         self.set_project_dirname()
@@ -90,6 +99,10 @@ class Collector:
         self.set_gitlab()
         self.set_media_storage()
 
+    def set_project_name(self):
+        """Set the project name option."""
+        self.project_name = self.project_name or click.prompt("Project name")
+
     def set_project_slug(self):
         """Set the project slug option."""
         self.project_slug = slugify(
@@ -116,14 +129,15 @@ class Collector:
     def set_service_dir(self):
         """Set the service dir option."""
         service_dir = self.output_dir / self.project_dirname
-        if service_dir.is_dir() and click.confirm(
-            warning(
-                f'A directory "{service_dir.resolve()}" already exists and '
-                "must be deleted. Continue?",
-            ),
-            abort=True,
-        ):
-            rmtree(service_dir)
+        # the existing directory is only replaced once the new one is complete
+        if not self.resume_run_id and service_dir.is_dir():
+            click.confirm(
+                warning(
+                    f'A directory "{service_dir.resolve()}" already exists and '
+                    "will be replaced. Continue?",
+                ),
+                abort=True,
+            )
         self._service_dir = service_dir
 
     def set_use_redis(self):
@@ -320,7 +334,15 @@ class Collector:
             gitlab_token=self.gitlab_token,
             gitlab_namespace_path=self.gitlab_namespace_path,
             terraform_dir=self.terraform_dir,
+            terraform_plugin_cache_dir=self.terraform_plugin_cache_dir,
+            terraform_provider_mirror=self.terraform_provider_mirror,
+            terraform_log_level=self.terraform_log_level,
             logs_dir=self.logs_dir,
+            render_cache_dir=self.render_cache_dir,
+            wheelhouse=self.wheelhouse,
+            resume_run_id=self.resume_run_id,
+            keep_on_failure=self.keep_on_failure,
+            trace=self.trace,
         )
 
     def launch_runner(self):
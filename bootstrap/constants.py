@@ -107,3 +107,53 @@ TERRAFORM_BACKEND_CHOICES = [TERRAFORM_BACKEND_GITLAB, TERRAFORM_BACKEND_TFC]
 # GitLab
 
 GITLAB_URL_DEFAULT = "https://gitlab.com"
+
+# Terraform modules
+
+TERRAFORM_MODULE_GITLAB = "gitlab"
+
+TERRAFORM_MODULE_TFC = "terraform-cloud"
+
+TERRAFORM_MODULE_VAULT = "vault"
+
+# BEWARE: a module is applied after and destroyed before the modules it depends on
+
+TERRAFORM_MODULES_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    TERRAFORM_MODULE_GITLAB: (),
+    TERRAFORM_MODULE_TFC: (),
+    TERRAFORM_MODULE_VAULT: (),
+}
+
+# Terraform logs
+
+TERRAFORM_LOG_LEVEL_DEFAULT = "INFO"
+
+TERRAFORM_LOG_LEVEL_OFF = "OFF"
+
+TERRAFORM_LOG_LEVEL_CHOICES = [
+    "TRACE",
+    "DEBUG",
+    TERRAFORM_LOG_LEVEL_DEFAULT,
+    "WARN",
+    "ERROR",
+    TERRAFORM_LOG_LEVEL_OFF,
+]
+
+TERRAFORM_LOG_ROTATIONS = 5
+
+TERRAFORM_PROGRESS_EVENTS = {
+    "apply_complete",
+    "apply_errored",
+    "change_summary",
+    "diagnostic",
+}
+
+# Render cache
+
+RENDER_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # 30 days
+
+RENDER_CACHE_MAX_SIZE = 256 * 1024 * 1024  # 256 MiB
+
+# Output
+
+DELETION_REPORT_INTERVAL = 2  # seconds
@@ -0,0 +1,44 @@
+"""Delete the replaced service directories, in detached processes."""
+
+import os
+import sys
+from time import monotonic
+
+from bootstrap.constants import DELETION_REPORT_INTERVAL
+
+
+def delete_tree(path, log_file, report_interval=DELETION_REPORT_INTERVAL):
+    """Delete the given tree, reporting the progress periodically in the log file."""
+    count, report_time = 0, monotonic() + report_interval
+    for dir_path, dir_names, file_names in os.walk(path, topdown=False):
+        for name in file_names:
+            os.unlink(os.path.join(dir_path, name))
+        for name in dir_names:
+            # links to directories are listed as directories, but not walked
+            entry_path = os.path.join(dir_path, name)
+            if os.path.islink(entry_path):
+                os.unlink(entry_path)
+            else:
+                os.rmdir(entry_path)
+        count += len(file_names) + len(dir_names)
+        if monotonic() > report_time:
+            print(f"{count} files deleted", file=log_file, flush=True)
+            report_time = monotonic() + report_interval
+    os.rmdir(path)
+    print(f"Deleted {count} files", file=log_file, flush=True)
+    return count
+
+
+def main(path, log_path):
+    """Delete the given tree in a detached grandchild process, not to be waited for."""
+    if os.fork():
+        return
+    os.setsid()
+    with open(log_path, "w") as log_file:
+        delete_tree(path, log_file)
+    # the grandchild leaves without running the interpreter exit handlers
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,43 @@
+"""Dependency graph helpers."""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import TopologicalSorter
+
+
+def reverse_graph(graph):
+    """Return the given dependency graph with reversed edges."""
+    reversed_graph = {node: set() for node in graph}
+    for node, dependencies in graph.items():
+        for dependency in dependencies:
+            reversed_graph.setdefault(dependency, set()).add(node)
+    return reversed_graph
+
+
+def run_graph(graph, func, max_workers=None):
+    """
+    Call the given function on every graph node, as soon as its dependencies are done.
+
+    Independent nodes run concurrently. When a call fails, no further node is started,
+    the running ones are awaited and the first raised exception is propagated.
+    """
+    sorter = TopologicalSorter(graph)
+    sorter.prepare()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(graph) or 1) as executor:
+        running = {}
+        failure = None
+        while failure is None and sorter.is_active():
+            for node in sorter.get_ready():
+                running[executor.submit(func, node)] = node
+            done, _pending = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                if (exception := future.exception()) is not None:
+                    failure = failure or exception
+                else:
+                    results[node] = future.result()
+                    sorter.done(node)
+        wait(running)
+    if failure is not None:
+        raise failure
+    return results
@@ -1,25 +1,24 @@
 """Web project initialization helpers."""
 
+import gzip
+import json
 import re
+import shutil
 from functools import partial
+from pathlib import Path
 
 import click
-import validators
-from slugify import slugify
 
 error = partial(click.style, fg="red")
 
 warning = partial(click.style, fg="yellow")
 
 
-def format_gitlab_variable(value, masked=False, protected=True):
-    """Format the given value to be used as a GitLab variable."""
-    return (
-        f'{{ value = "{value}"'
-        + (masked and ", masked = true" or "")
-        + (not protected and ", protected = false" or "")
-        + " }"
-    )
+def format_terraform_output(value):
+    """Format the given Terraform output value as the raw output command does."""
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else json.dumps(value)
 
 
 def format_tfvar(value, value_type=None):
@@ -34,13 +33,54 @@ def format_tfvar(value, value_type=None):
         return f'"{value}"'
 
 
+def get_requirements_includes(text):
+    """Return the requirements files included by the given requirements text."""
+    return re.findall(r"^\s*(?:-r|--requirement)(?:\s+|=)(\S+)", text, re.MULTILINE)
+
+
+def get_requirements_graph(requirements_path):
+    """Return the dependency graph of the given path requirements files."""
+    in_files = {i.stem: i for i in requirements_path.glob("*.in")}
+    return {
+        name: {
+            include_name
+            for i in get_requirements_includes(in_file.read_text())
+            if (include_name := Path(i).stem) in in_files
+        }
+        for name, in_file in in_files.items()
+    }
+
+
+def replace_placeholders(text, placeholders):
+    """Replace the given placeholders in a single pass, returning the count too."""
+    pattern = "|".join(map(re.escape, sorted(placeholders, key=len, reverse=True)))
+    return re.subn(pattern, lambda match: placeholders[match.group()], text)
+
+
+def rotate_log(log_path, count):
+    """Compress the given log file, keeping the given number of older ones."""
+    if not log_path.exists():
+        return
+    rotated_path = log_path.with_name(f"{log_path.name}.{{}}.gz").as_posix()
+    for i in range(count - 1, 0, -1):
+        if (older_path := Path(rotated_path.format(i))).exists():
+            older_path.replace(rotated_path.format(i + 1))
+    with open(log_path, "rb") as f_in, gzip.open(rotated_path.format(1), "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    log_path.unlink()
+
+
 def slugify_option(ctx, param, value):
     """Slugify an option value."""
+    from slugify import slugify
+
     return value and slugify(value)
 
 
 def validate_or_prompt_domain(message, value=None, default=None, required=True):
     """Validate the given domain or prompt until a valid value is provided."""
+    import validators
+
     if value is None:
         value = click.prompt(message, default=default)
     if not required and value == "" or validators.domain(value):
@@ -51,6 +91,8 @@ def validate_or_prompt_domain(message, value=None, default=None, required=True):
 
 def validate_or_prompt_email(message, value=None, default=None, required=True):
     """Validate the given email address or prompt until a valid value is provided."""
+    import validators
+
     if value is None:
         value = click.prompt(message, default=default)
     if not required and value == "" or validators.email(value):
@@ -61,6 +103,8 @@ def validate_or_prompt_email(message, value=None, default=None, required=True):
 
 def validate_or_prompt_secret(message, value=None, default=None, required=True):
     """Validate the given secret or prompt until a valid value is provided."""
+    import validators
+
     if value is None:
         value = click.prompt(message, default=default, hide_input=True)
     if not required and value == "" or validators.length(value, min=8):
@@ -91,6 +135,8 @@ def validate_or_prompt_path(message, value=None, default=None, required=True):
 
 def validate_or_prompt_url(message, value=None, default=None, required=True):
     """Validate the given URL or prompt until a valid value is provided."""
+    import validators
+
     if value is None:
         value = click.prompt(message, default=default)
     if not required and value == "" or validators.url(value):
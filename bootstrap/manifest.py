@@ -0,0 +1,52 @@
+"""Bootstrap run manifest."""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+
+
+def get_inputs_hash(inputs):
+    """Return a stable hash of the given JSON serializable inputs."""
+    return hashlib.sha256(
+        json.dumps(inputs, default=str, sort_keys=True).encode()
+    ).hexdigest()
+
+
+@dataclass
+class RunManifest:
+    """The manifest of the completed steps of a bootstrap run."""
+
+    path: Path
+    steps: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        """Load the manifest steps, if already stored."""
+        self._lock = Lock()
+        if self.path.is_file():
+            self.steps = json.loads(self.path.read_text())["steps"]
+
+    def is_done(self, step_name, inputs_hash):
+        """Tell if the given step was completed with the same inputs."""
+        return self.steps.get(step_name) == inputs_hash
+
+    def save(self):
+        """Store the manifest atomically."""
+        os.makedirs(self.path.parent, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"steps": self.steps}, indent=2))
+        tmp_path.replace(self.path)
+
+    def record(self, step_name, inputs_hash):
+        """Record the given step as completed with the given inputs."""
+        with self._lock:
+            self.steps[step_name] = inputs_hash
+            self.save()
+
+    def discard(self, step_name):
+        """Discard the given step, e.g. because its effects were reverted."""
+        with self._lock:
+            self.steps.pop(step_name, None)
+            self.save()
@@ -0,0 +1,29 @@
+"""Render the service template, in processes of their own."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+TEMPLATE_PATH = Path(__file__).parent.parent
+
+# cookiecutter changes the working directory while rendering, which would affect
+# the concurrent batch runners, so it runs in reused processes, started on demand
+# and spawned, since the bootstrap process runs threads
+RENDER_EXECUTOR = ProcessPoolExecutor(
+    max_workers=os.cpu_count(), mp_context=get_context("spawn")
+)
+
+
+def render(output_dir, context):
+    """Render the service template in the given directory, with the given context."""
+    from cookiecutter.main import cookiecutter
+
+    cookiecutter(
+        str(TEMPLATE_PATH), extra_context=context, output_dir=output_dir, no_input=True
+    )
+
+
+def render_service(output_dir, context):
+    """Render the service template, in one of the render processes."""
+    RENDER_EXECUTOR.submit(render, str(output_dir), context).result()
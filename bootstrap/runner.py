@@ -4,16 +4,21 @@ import json
 import os
 import secrets
 import subprocess  # nosec B404
+import sys
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from functools import partial
+from importlib.metadata import version
 from operator import itemgetter
 from pathlib import Path
+from shutil import copyfile, copymode, rmtree
+from threading import Lock
 from time import time
 
 import click
-from cookiecutter.main import cookiecutter
 from pydantic import validate_arguments
 
+from bootstrap.cache import RenderCache, get_tree_hash
 from bootstrap.constants import (
     DEV_ENV_NAME,
     DEV_ENV_SLUG,
@@ -30,9 +35,28 @@ from bootstrap.constants import (
     STAGE_ENV_STACK_CHOICES,
     STAGE_STACK_SLUG,
     TERRAFORM_BACKEND_TFC,
+    TERRAFORM_LOG_LEVEL_DEFAULT,
+    TERRAFORM_LOG_LEVEL_OFF,
+    TERRAFORM_LOG_ROTATIONS,
+    TERRAFORM_MODULE_GITLAB,
+    TERRAFORM_MODULE_TFC,
+    TERRAFORM_MODULE_VAULT,
+    TERRAFORM_MODULES_DEPENDENCIES,
+    TERRAFORM_PROGRESS_EVENTS,
 )
 from bootstrap.exceptions import BootstrapError
-from bootstrap.helpers import format_gitlab_variable, format_tfvar
+from bootstrap.graph import reverse_graph, run_graph
+from bootstrap.helpers import (
+    format_terraform_output,
+    format_tfvar,
+    get_requirements_graph,
+    replace_placeholders,
+    rotate_log,
+)
+from bootstrap.manifest import RunManifest, get_inputs_hash
+from bootstrap.render import TEMPLATE_PATH, render_service
+from bootstrap.tracing import Tracer
+from bootstrap.wheelhouse import get_valid_lock, get_wheelhouse_index_args
 
 error = partial(click.style, fg="red")
 
@@ -42,6 +66,10 @@ info = partial(click.style, dim=True)
 
 warning = partial(click.style, fg="yellow")
 
+# the init of a module writes its dependency lock file in the module directory, and
+# its providers in the plugin cache, both shared by the concurrent batch runners
+TERRAFORM_INIT_LOCKS = {i: Lock() for i in TERRAFORM_MODULES_DEPENDENCIES}
+
 
 @validate_arguments
 @dataclass(kw_only=True)
@@ -79,26 +107,78 @@ class Runner:
     uid: int | None = None
     gid: int | None = None
     terraform_dir: Path | None = None
+    terraform_plugin_cache_dir: Path | None = None
+    terraform_provider_mirror: Path | None = None
+    terraform_log_level: str = TERRAFORM_LOG_LEVEL_DEFAULT
     logs_dir: Path | None = None
+    render_cache_dir: Path | None = None
+    resume_run_id: str | None = None
+    keep_on_failure: bool = False
+    requirements_locks: dict | None = None
+    wheelhouse: Path | None = None
+    trace: bool = False
+    output_prefix: str = ""
     run_id: str = field(init=False)
     stacks: list = field(init=False, default_factory=list)
     envs: list = field(init=False, default_factory=list)
     gitlab_variables: dict = field(init=False, default_factory=dict)
     tfvars: dict = field(init=False, default_factory=dict)
     vault_secrets: dict = field(init=False, default_factory=dict)
-    terraform_run_modules: list = field(init=False, default_factory=list)
+    placeholders: dict = field(init=False, default_factory=dict)
+    terraform_run_modules: dict = field(init=False, default_factory=dict)
+    terraform_applied_modules: set = field(init=False, default_factory=set)
     terraform_outputs: dict = field(init=False, default_factory=dict)
+    terraform_state_outputs: dict = field(init=False, default_factory=dict)
+    manifest: RunManifest = field(init=False)
+    dirty: bool = field(init=False, default=False)
+    staging_dir: Path = field(init=False)
+    tracer: Tracer = field(init=False)
+    render_cache: RenderCache = field(init=False)
 
     def __post_init__(self):
         """Finalize initialization."""
         self.gitlab_url = self.gitlab_url and self.gitlab_url.rstrip("/")
-        self.run_id = f"{time():.0f}"
-        self.terraform_dir = self.terraform_dir or Path(f".terraform/{self.run_id}")
-        self.logs_dir = self.logs_dir or Path(f".logs/{self.run_id}")
+        self.run_id = self.resume_run_id or f"{time():.0f}"
+        # paths are made absolute, not to depend on the working directory
+        self.output_dir = self.output_dir.resolve()
+        self.service_dir = self.service_dir.resolve()
+        # the service is rendered next to its directory, on the same filesystem
+        self.staging_dir = (
+            self.service_dir.parent
+            / f".{self.service_dir.name}.{self.run_id}"
+            / self.service_dir.name
+        )
+        self.terraform_dir = (
+            self.terraform_dir or Path(f".terraform/{self.run_id}")
+        ).resolve()
+        self.terraform_plugin_cache_dir = (
+            self.terraform_plugin_cache_dir or Path(".terraform/plugin-cache")
+        ).resolve()
+        self.logs_dir = (self.logs_dir or Path(f".logs/{self.run_id}")).resolve()
+        self.wheelhouse = self.wheelhouse and self.wheelhouse.resolve()
+        self.manifest = RunManifest(
+            self.terraform_dir / self.service_slug / "manifest.json"
+        )
+        self.tracer = Tracer(enabled=self.trace)
+        self.render_cache = RenderCache(
+            (self.render_cache_dir or Path(".cache/render")).resolve()
+        )
         self.set_stacks()
         self.set_envs()
         self.collect_tfvars()
         self.collect_gitlab_variables()
+        self.collect_placeholders()
+
+    def echo(self, message):
+        """Echo the given message, prefixing its lines, e.g. in batch mode."""
+        if self.output_prefix:
+            message = "\n".join(self.output_prefix + i for i in message.split("\n"))
+        click.echo(message)
+
+    def echo_stream(self, stream):
+        """Echo the lines of the given subprocess output stream."""
+        for line in stream:
+            self.echo(line.rstrip("\n"))
 
     def set_stacks(self):
         """Set the stacks."""
@@ -143,7 +223,11 @@ class Runner:
         vars_dict = self.gitlab_variables.setdefault(level, {})
         if var_value is None:
             var_value = getattr(self, var_name)
-        vars_dict[var_name] = format_gitlab_variable(var_value, masked, protected)
+        vars_dict[var_name] = {
+            "value": str(var_value),
+            **(masked and {"masked": True} or {}),
+            **(not protected and {"protected": False} or {}),
+        }
 
     def register_gitlab_variables(self, level, *args):
         """Register one or more GitLab variable at the given level."""
@@ -178,12 +262,6 @@ class Runner:
                 ("SENTRY_DSN", self.sentry_dsn, True)
             )
 
-    def render_gitlab_variables_to_string(self, level):
-        """Return the given level GitLab variables rendered to string."""
-        return "{%s}" % ", ".join(
-            f"{k} = {v}" for k, v in self.gitlab_variables.get(level, {}).items()
-        )
-
     def register_tfvar(self, tf_stage, var_name, var_value=None, var_type=None):
         """Register a Terraform variable value for the given stage."""
         vars_list = self.tfvars.setdefault(tf_stage, [])
@@ -218,6 +296,18 @@ class Runner:
                 env_slug=env["slug"],
             )
 
+    def register_placeholder(self, placeholder, value, *file_paths):
+        """Register a placeholder to be replaced in the given service files."""
+        for file_path in file_paths:
+            self.placeholders.setdefault(str(self.staging_dir / file_path), {})[
+                placeholder
+            ] = value
+
+    def collect_placeholders(self):
+        """Collect the placeholders to be replaced in the service files."""
+        self.register_placeholder("__SECRETKEY__", secrets.token_urlsafe(40), ".env")
+        self.register_placeholder("__PASSWORD__", secrets.token_urlsafe(8), ".env")
+
     def register_vault_environment_secret(self, env_name, secret_name, secret_data):
         """Register a Vault environment secret locally."""
         self.vault_secrets[f"envs/{env_name}/{secret_name}"] = secret_data
@@ -233,58 +323,91 @@ class Runner:
         """Collect Vault secrets."""
         [self.collect_vault_environment_secrets(env["name"]) for env in self.envs]
 
+    def run_step(self, step_name, step, inputs=None):
+        """Run the given step, unless it was already completed with the same inputs."""
+        inputs_hash = get_inputs_hash(inputs)
+        if not self.dirty and self.manifest.is_done(step_name, inputs_hash):
+            self.echo(info(f"...skipping the completed {step_name} step"))
+            return
+        self.dirty = True
+        with self.tracer.span(step_name):
+            step()
+        self.manifest.record(step_name, inputs_hash)
+
+    def get_cookiecutter_context(self):
+        """Return the cookiecutter extra context."""
+        return {
+            "deployment_type": self.deployment_type,
+            "internal_service_port": self.internal_service_port,
+            "media_storage": self.media_storage,
+            "project_dirname": self.project_dirname,
+            "project_name": self.project_name,
+            "project_slug": self.project_slug,
+            "resources": {"envs": self.envs, "stacks": self.stacks},
+            "service_slug": self.service_slug,
+            "terraform_backend": self.terraform_backend,
+            "terraform_cloud_organization": self.terraform_cloud_organization,
+            "tfvars": self.tfvars,
+            "use_redis": self.use_redis and "true" or "false",
+            "use_vault": self.vault_url and "true" or "false",
+        }
+
+    def get_render_key(self, context):
+        """Return the render cache key of the given cookiecutter context."""
+        return get_inputs_hash(
+            {
+                "context": context,
+                "cookiecutter": version("cookiecutter"),
+                "template": get_tree_hash(
+                    TEMPLATE_PATH / "cookiecutter.json",
+                    TEMPLATE_PATH / "{{cookiecutter.project_dirname}}",
+                ),
+            }
+        )
+
     def init_service(self):
         """Initialize the service."""
-        click.echo(info("...cookiecutting the service"))
-        cookiecutter(
-            os.path.dirname(os.path.dirname(__file__)),
-            extra_context={
-                "deployment_type": self.deployment_type,
-                "internal_service_port": self.internal_service_port,
-                "media_storage": self.media_storage,
-                "project_dirname": self.project_dirname,
-                "project_name": self.project_name,
-                "project_slug": self.project_slug,
-                "resources": {"envs": self.envs, "stacks": self.stacks},
-                "service_slug": self.service_slug,
-                "terraform_backend": self.terraform_backend,
-                "terraform_cloud_organization": self.terraform_cloud_organization,
-                "tfvars": self.tfvars,
-                "use_redis": self.use_redis and "true" or "false",
-                "use_vault": self.vault_url and "true" or "false",
-            },
-            output_dir=self.output_dir,
-            no_input=True,
-        )
+        self.echo(info("...cookiecutting the service"))
+        # a resumed run replaces the partial output of the previous attempt
+        self.resume_run_id and rmtree(self.staging_dir, ignore_errors=True)
+        context = self.get_cookiecutter_context()
+        render_key = self.get_render_key(context)
+        if self.render_cache.materialize(render_key, self.staging_dir):
+            self.echo(info("\t- reused the cached render"))
+            return
+        with self.tracer.span("cookiecutter", "subprocess"):
+            render_service(self.staging_dir.parent, context)
+        self.render_cache.store(render_key, self.staging_dir)
 
     def create_env_file(self):
         """Create the final env file from its template."""
-        click.echo(info("...generating the .env file"))
-        env_path = self.service_dir / ".env_template"
-        env_text = (
-            env_path.read_text()
-            .replace("__SECRETKEY__", secrets.token_urlsafe(40))
-            .replace("__PASSWORD__", secrets.token_urlsafe(8))
-        )
-        (self.service_dir / ".env").write_text(env_text)
+        self.echo(info("...generating the .env file"))
+        copyfile(self.staging_dir / ".env_template", self.staging_dir / ".env")
 
     def format_files(self):
         """Format python code generated by cookiecutter."""
-        click.echo(info("...formatting the cookiecut python code"))
-        subprocess.run(  # nosec B603 B607
+        self.echo(info("...formatting the cookiecut python code"))
+        self.tracer.run(
             [
                 "python3",
                 "-m",
                 "ruff",
                 "format",
-                f"{self.service_dir.resolve()}",
-            ]
+                f"{self.staging_dir}",
+            ],
+            name="ruff format",
+            stderr=subprocess.STDOUT,
+            stdout=subprocess.PIPE,
+            read_stdout=self.echo_stream,
+            text=True,
         )
 
-    def compile_requirements(self):
-        """Compile the requirements files."""
-        click.echo(info("...compiling the requirements files"))
-        requirements_path = self.service_dir / "requirements"
+    def get_requirements_graph(self, requirements_path):
+        """Return the dependency graph of the given path requirements files."""
+        return get_requirements_graph(requirements_path)
+
+    def compile_requirements_file(self, requirements_path, graph, name):
+        """Compile the given requirements file, constrained by its locked includes."""
         PIP_COMPILE = [
             "python3",
             "-m",
@@ -296,33 +419,92 @@ class Runner:
             "--resolver=backtracking",
             "--strip-extras",
             "--upgrade",
-            "--output-file",
         ]
-        for in_file in requirements_path.glob("*.in"):
-            output_filename = f"{in_file.stem}.txt"
-            output_file = requirements_path / output_filename
-            subprocess.run(PIP_COMPILE + [output_file, in_file])  # nosec B603 B607
-            click.echo(info(f"\t- {output_filename}"))
+        output_filename = f"{name}.txt"
+        wheelhouse_args = []
+        if self.wheelhouse:
+            if lock_text := get_valid_lock(
+                self.wheelhouse, requirements_path, graph, name
+            ):
+                (requirements_path / output_filename).write_text(lock_text)
+                self.echo(info(f"\t- {output_filename} (wheelhouse)"))
+                return
+            wheelhouse_args = [
+                *get_wheelhouse_index_args(self.wheelhouse),
+                "--no-emit-find-links",
+                "--no-emit-index-url",
+            ]
+        constraints = [
+            f"--constraint={constraint_file}"
+            for i in sorted(graph[name])
+            if (constraint_file := requirements_path / f"{i}.txt").exists()
+        ]
+        self.tracer.run(
+            PIP_COMPILE
+            + wheelhouse_args
+            + constraints
+            + [
+                "--output-file",
+                requirements_path / output_filename,
+                requirements_path / f"{name}.in",
+            ],
+            name=f"pip-compile {name}",
+            stderr=subprocess.STDOUT,
+            stdout=subprocess.PIPE,
+            read_stdout=self.echo_stream,
+            text=True,
+        )
+        self.echo(info(f"\t- {output_filename}"))
+
+    def compile_requirements_files(self, requirements_path):
+        """Compile the given path requirements files, following their includes."""
+        graph = self.get_requirements_graph(requirements_path)
+        run_graph(
+            graph, partial(self.compile_requirements_file, requirements_path, graph)
+        )
+
+    def compile_requirements(self):
+        """Compile the requirements files, or reuse the shared identical ones."""
+        self.echo(info("...compiling the requirements files"))
+        requirements_path = self.staging_dir / "requirements"
+        if self.requirements_locks is None:
+            return self.compile_requirements_files(requirements_path)
+        locks_key = get_inputs_hash(
+            {i.name: i.read_text() for i in requirements_path.glob("*.in")}
+        )
+        locks = self.requirements_locks.setdefault(locks_key, future := Future())
+        if locks is future:
+            try:
+                self.compile_requirements_files(requirements_path)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            future.set_result(
+                {i.name: i.read_text() for i in requirements_path.glob("*.txt")}
+            )
+        else:
+            for filename, text in locks.result().items():
+                (requirements_path / filename).write_text(text)
+                self.echo(info(f"\t- {filename} (shared)"))
 
     def create_static_directory(self):
         """Create the static directory."""
-        click.echo(info("...creating the '/static' directory"))
-        (self.service_dir / "static").mkdir(exist_ok=True)
+        self.echo(info("...creating the '/static' directory"))
+        (self.staging_dir / "static").mkdir(exist_ok=True)
 
     def create_media_directory(self):
         """Create the media directory."""
-        click.echo(info("...creating the '/media' directory"))
-        (self.service_dir / "media").mkdir(exist_ok=True)
+        self.echo(info("...creating the '/media' directory"))
+        (self.staging_dir / "media").mkdir(exist_ok=True)
 
     def init_terraform_cloud(self):
         """Initialize the Terraform Cloud resources."""
-        click.echo(info("...creating the Terraform Cloud resources"))
+        self.echo(info("...creating the Terraform Cloud resources"))
         env = {
             "TF_VAR_admin_email": self.terraform_cloud_admin_email,
             "TF_VAR_create_organization": self.terraform_cloud_organization_create
             and "true"
             or "false",
-            "TF_VAR_environments": json.dumps(list(map(itemgetter("slug"), self.envs))),
             "TF_VAR_hostname": self.terraform_cloud_hostname,
             "TF_VAR_organization_name": self.terraform_cloud_organization,
             "TF_VAR_project_name": self.project_name,
@@ -330,210 +512,413 @@ class Runner:
             "TF_VAR_service_slug": self.service_slug,
             "TF_VAR_terraform_cloud_token": self.terraform_cloud_token,
         }
-        self.run_terraform("terraform-cloud", env)
+        tfvars = {"environments": list(map(itemgetter("slug"), self.envs))}
+        self.run_terraform(TERRAFORM_MODULE_TFC, env, tfvars=tfvars)
 
     def init_gitlab(self):
         """Initialize the GitLab resources."""
-        click.echo(info("...creating the GitLab resources"))
+        self.echo(info("...creating the GitLab resources"))
         env = {
             "TF_VAR_gitlab_token": self.gitlab_token,
             "TF_VAR_gitlab_url": self.gitlab_url,
-            "TF_VAR_group_variables": self.render_gitlab_variables_to_string("group"),
             "TF_VAR_namespace_path": self.gitlab_namespace_path,
             "TF_VAR_project_name": self.project_name,
             "TF_VAR_project_slug": self.project_slug,
-            "TF_VAR_project_variables": self.render_gitlab_variables_to_string(
-                "project"
-            ),
-            "TF_VAR_service_dir": self.service_dir,
+            "TF_VAR_service_dir": self.staging_dir,
             "TF_VAR_service_slug": self.service_slug,
         }
         self.gitlab_url != GITLAB_URL_DEFAULT and env.update(
             GITLAB_BASE_URL=f"{self.gitlab_url}/api/v4/"
         )
-        self.run_terraform("gitlab", env)
+        tfvars = {
+            "group_variables": self.gitlab_variables.get("group", {}),
+            "project_variables": self.gitlab_variables.get("project", {}),
+        }
+        self.run_terraform(TERRAFORM_MODULE_GITLAB, env, tfvars=tfvars)
 
     def init_vault(self):
         """Initialize the Vault resources."""
-        click.echo(info("...creating the Vault resources with Terraform"))
+        self.echo(info("...creating the Vault resources with Terraform"))
         self.collect_vault_secrets()
         env = {
             "TF_VAR_project_slug": self.project_slug,
-            "TF_VAR_secrets": json.dumps(self.vault_secrets),
             "TF_VAR_vault_address": self.vault_url,
             "TF_VAR_vault_token": self.vault_token,
         }
-        self.run_terraform("vault", env)
+        tfvars = {"secrets": self.vault_secrets}
+        self.run_terraform(TERRAFORM_MODULE_VAULT, env, tfvars=tfvars)
+
+    def get_terraform_cli_config(self):
+        """Return the Terraform CLI configuration shared by all modules."""
+        config = (
+            f'plugin_cache_dir = "{self.terraform_plugin_cache_dir.resolve()}"\n'
+            "plugin_cache_may_break_dependency_lock_file = true\n"
+        )
+        if self.terraform_provider_mirror:
+            config += (
+                "provider_installation {\n"
+                "  filesystem_mirror {\n"
+                f'    path = "{self.terraform_provider_mirror.resolve()}"\n'
+                "  }\n"
+                "}\n"
+            )
+        return config
+
+    def write_terraform_cli_config(self):
+        """Write the Terraform CLI configuration file."""
+        os.makedirs(self.terraform_plugin_cache_dir, exist_ok=True)
+        os.makedirs(self.terraform_dir / self.service_slug, exist_ok=True)
+        (self.terraform_dir / self.service_slug / "terraform.rc").write_text(
+            self.get_terraform_cli_config()
+        )
 
     def get_terraform_module_params(self, module_name, env):
         """Return Terraform parameters for the given module."""
+        terraform_dir = self.terraform_dir / self.service_slug / module_name
+        tf_env = {
+            **env,
+            "PATH": os.environ.get("PATH"),
+            "TF_CLI_CONFIG_FILE": str(
+                (terraform_dir.parent / "terraform.rc").resolve()
+            ),
+            "TF_DATA_DIR": str((terraform_dir / "data").resolve()),
+        }
+        self.terraform_log_level != TERRAFORM_LOG_LEVEL_OFF and tf_env.update(
+            TF_LOG=self.terraform_log_level
+        )
         return (
             Path(__file__).parent.parent / "terraform" / module_name,
             self.logs_dir / self.service_slug / "terraform" / module_name,
-            terraform_dir := self.terraform_dir / self.service_slug / module_name,
-            {
-                **env,
-                "PATH": os.environ.get("PATH"),
-                "TF_DATA_DIR": str((terraform_dir / "data").resolve()),
-                "TF_LOG": "INFO",
-            },
+            terraform_dir,
+            tf_env,
         )
 
+    def format_terraform_event(self, module_name, event):
+        """Return the progress message of the given Terraform JSON event, if any."""
+        if event.get("type") in TERRAFORM_PROGRESS_EVENTS:
+            style = {"error": error, "warn": warning}.get(event.get("@level"), info)
+            return style(f"\t{module_name}: {event['@message']}")
+
+    def stream_terraform_events(self, module_name, log_file, stream):
+        """Log the given Terraform JSON events stream, echoing the progress ones."""
+        for line in stream:
+            log_file.write(line)
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            message = self.format_terraform_event(module_name, event)
+            message and self.echo(message)
+
+    def run_terraform_command(self, command, cwd, env, logs_dir, *args):
+        """Run the given Terraform command, streaming its output to log files."""
+        log_path = logs_dir / f"{command}.log"
+        stdout_path = logs_dir / f"{command}-stdout.log"
+        stderr_path = logs_dir / f"{command}-stderr.log"
+        if "TF_LOG" in env:
+            rotate_log(log_path, TERRAFORM_LOG_ROTATIONS)
+            env = dict(**env, TF_LOG_PATH=str(log_path.resolve()))
+        json_events = "-json" in args
+        with open(stdout_path, "w") as stdout, open(stderr_path, "w") as stderr:
+            process = self.tracer.run(
+                ["terraform", command, *args, "-input=false", "-no-color"],
+                name=f"terraform {command} {cwd.name}",
+                cwd=cwd,
+                env=env,
+                read_stdout=partial(self.stream_terraform_events, cwd.name, stdout),
+                stderr=stderr,
+                stdout=json_events and subprocess.PIPE or stdout,
+                text=True,
+            )
+        if process.returncode != 0:
+            self.echo(
+                error(f"Terraform {command} failed (check the logs in {logs_dir})")
+            )
+            raise BootstrapError
+
     def run_terraform_init(self, cwd, env, logs_dir, state_path):
         """Run Terraform init."""
-        init_log_path = logs_dir / "init.log"
-        init_stdout_path = logs_dir / "init-stdout.log"
-        init_stderr_path = logs_dir / "init-stderr.log"
-        init_process = subprocess.run(  # nosec B603 B607
-            [
-                "terraform",
-                "init",
-                "-backend-config",
-                f"path={state_path.resolve()}",
-                "-input=false",
-                "-no-color",
-            ],
-            capture_output=True,
-            cwd=cwd,
-            env=dict(**env, TF_LOG_PATH=str(init_log_path.resolve())),
-            text=True,
+        self.run_terraform_command(
+            "init",
+            cwd,
+            env,
+            logs_dir,
+            "-backend-config",
+            f"path={state_path.resolve()}",
         )
-        init_stdout_path.write_text(init_process.stdout)
-        if init_process.returncode != 0:
-            init_stderr_path.write_text(init_process.stderr)
-            click.echo(
-                error(
-                    "Terraform init failed "
-                    f"(check {init_stderr_path} and {init_log_path})"
-                )
-            )
-            raise BootstrapError
 
-    def run_terraform_apply(self, cwd, env, logs_dir):
+    def run_terraform_apply(self, cwd, env, logs_dir, tfvars_path=None):
         """Run Terraform apply."""
-        apply_log_path = logs_dir / "apply.log"
-        apply_stdout_path = logs_dir / "apply-stdout.log"
-        apply_stderr_path = logs_dir / "apply-stderr.log"
-        apply_process = subprocess.run(  # nosec B603 B607
-            ["terraform", "apply", "-auto-approve", "-input=false", "-no-color"],
-            capture_output=True,
-            cwd=cwd,
-            env=dict(**env, TF_LOG_PATH=str(apply_log_path.resolve())),
-            text=True,
+        self.run_terraform_command(
+            "apply",
+            cwd,
+            env,
+            logs_dir,
+            "-auto-approve",
+            "-json",
+            *(tfvars_path and [f"-var-file={tfvars_path.resolve()}"] or []),
         )
-        apply_stdout_path.write_text(apply_process.stdout)
-        if apply_process.returncode != 0:
-            apply_stderr_path.write_text(apply_process.stderr)
-            click.echo(
-                error(
-                    "Terraform apply failed "
-                    f"(check {apply_stderr_path} and {apply_log_path})"
-                )
-            )
-            self.reset_terraform()
-            raise BootstrapError
 
-    def run_terraform_destroy(self, cwd, env, logs_dir):
+    def run_terraform_destroy(self, cwd, env, logs_dir, tfvars_path=None):
         """Run Terraform destroy."""
-        destroy_log_path = logs_dir / "destroy.log"
-        destroy_stdout_path = logs_dir / "destroy-stdout.log"
-        destroy_stderr_path = logs_dir / "destroy-stderr.log"
-        destroy_process = subprocess.run(  # nosec B603 B607
-            [
-                "terraform",
-                "destroy",
-                "-auto-approve",
-                "-input=false",
-                "-no-color",
-            ],
-            capture_output=True,
-            cwd=cwd,
-            env=dict(**env, TF_LOG_PATH=str(destroy_log_path.resolve())),
-            text=True,
+        self.run_terraform_command(
+            "destroy",
+            cwd,
+            env,
+            logs_dir,
+            "-auto-approve",
+            "-json",
+            *(tfvars_path and [f"-var-file={tfvars_path.resolve()}"] or []),
         )
-        destroy_stdout_path.write_text(destroy_process.stdout)
-        if destroy_process.returncode != 0:
-            destroy_stderr_path.write_text(destroy_process.stderr)
-            click.echo(
-                error(
-                    "Terraform destroy failed "
-                    f"(check {destroy_stderr_path} and {destroy_log_path})"
+
+    def read_terraform_outputs(self, module_name, cwd, env, state_path):
+        """Return all the given module outputs, reading its state once per run."""
+        if module_name not in self.terraform_state_outputs:
+            if state_path.is_file():
+                outputs = json.loads(state_path.read_text()).get("outputs", {})
+            else:
+                # the state is stored remotely
+                outputs = json.loads(
+                    self.tracer.run(
+                        ["terraform", "output", "-json"],
+                        name=f"terraform output {cwd.name}",
+                        cwd=cwd,
+                        env=env,
+                        stderr=subprocess.DEVNULL,
+                        stdout=subprocess.PIPE,
+                        text=True,
+                    ).stdout
+                    or "{}"
                 )
-            )
-            raise BootstrapError
+            self.terraform_state_outputs[module_name] = {
+                k: v["value"] for k, v in outputs.items()
+            }
+        return self.terraform_state_outputs[module_name]
 
-    def get_terraform_outputs(self, cwd, env, outputs):
+    def get_terraform_outputs(self, module_name, cwd, env, state_path, outputs):
         """Get Terraform outputs."""
+        module_outputs = self.read_terraform_outputs(module_name, cwd, env, state_path)
         return {
-            output_name: subprocess.run(  # nosec B603 B607
-                ["terraform", "output", "-raw", output_name],
-                capture_output=True,
-                cwd=cwd,
-                env=env,
-                text=True,
-            ).stdout
+            output_name: format_terraform_output(module_outputs.get(output_name))
             for output_name in outputs
         }
 
-    def reset_terraform(self):
-        """Destroy all Terraform modules resources."""
-        for module_name, env in self.terraform_run_modules:
-            click.echo(warning(f"Destroying Terraform {module_name} resources."))
-            cwd, logs_dir, _terraform_dir, env = self.get_terraform_module_params(
-                module_name, env
+    def destroy_terraform_module(self, module_name):
+        """Destroy the given Terraform module resources."""
+        self.echo(warning(f"Destroying Terraform {module_name} resources."))
+        cwd, logs_dir, terraform_dir, env = self.get_terraform_module_params(
+            module_name, self.terraform_run_modules[module_name]
+        )
+        tfvars_path = terraform_dir / f"{module_name}.auto.tfvars.json"
+        # a failed destroy must not leave the module recorded as completed
+        self.manifest.discard(f"terraform_{module_name}")
+        with self.tracer.span(f"destroy_terraform_{module_name}", "terraform"):
+            self.run_terraform_destroy(
+                cwd, env, logs_dir, tfvars_path.is_file() and tfvars_path or None
             )
-            self.run_terraform_destroy(cwd, env, logs_dir)
 
-    def run_terraform(self, module_name, env, outputs=None):
+    def reset_terraform(self):
+        """Destroy the applied Terraform modules resources, dependent ones first."""
+        module_names = list(self.terraform_run_modules)
+        if self.keep_on_failure:
+            # the completed modules are kept, to be skipped when resuming the run
+            module_names = [
+                i for i in module_names if f"terraform_{i}" not in self.manifest.steps
+            ]
+        run_graph(
+            reverse_graph(self.get_terraform_modules_graph(module_names)),
+            self.destroy_terraform_module,
+        )
+
+    def write_terraform_tfvars(self, tfvars_path, tfvars):
+        """Write the given Terraform variables to a file only readable by the owner."""
+        fd = os.open(tfvars_path, os.O_CREAT | os.O_TRUNC | os.O_WRONLY, 0o600)
+        os.fchmod(fd, 0o600)
+        with open(fd, "w") as f:
+            json.dump(tfvars, f)
+
+    def run_terraform(self, module_name, env, outputs=None, tfvars=None):
         """Initialize the Terraform controlled resources."""
-        self.terraform_run_modules.append((module_name, env))
-        cwd, logs_dir, terraform_dir, env = self.get_terraform_module_params(
+        cwd, logs_dir, terraform_dir, tf_env = self.get_terraform_module_params(
             module_name, env
         )
-        os.makedirs(terraform_dir, exist_ok=True)
-        os.makedirs(logs_dir)
-        self.run_terraform_init(cwd, env, logs_dir, terraform_dir / "terraform.tfstate")
-        self.run_terraform_apply(cwd, env, logs_dir)
+        state_path = terraform_dir / "terraform.tfstate"
+        tfvars_path = terraform_dir / f"{module_name}.auto.tfvars.json"
+        step_name = f"terraform_{module_name}"
+        inputs_hash = get_inputs_hash({"env": env, "tfvars": tfvars})
+        if (
+            not self.dirty
+            and not self.terraform_applied_modules.intersection(
+                TERRAFORM_MODULES_DEPENDENCIES.get(module_name, ())
+            )
+            and self.manifest.is_done(step_name, inputs_hash)
+        ):
+            self.echo(info(f"...skipping the completed {step_name} step"))
+            self.terraform_run_modules[module_name] = env
+        else:
+            # a module run again with changed inputs is no longer completed
+            self.manifest.discard(step_name)
+            os.makedirs(terraform_dir, exist_ok=True)
+            os.makedirs(logs_dir, exist_ok=True)
+            self.write_terraform_tfvars(tfvars_path, tfvars or {})
+            with self.tracer.span(step_name, "terraform"):
+                with TERRAFORM_INIT_LOCKS[module_name]:
+                    self.run_terraform_init(cwd, tf_env, logs_dir, state_path)
+                self.terraform_run_modules[module_name] = env
+                self.run_terraform_apply(cwd, tf_env, logs_dir, tfvars_path)
+            self.terraform_applied_modules.add(module_name)
+            self.terraform_state_outputs.pop(module_name, None)
+            self.manifest.record(step_name, inputs_hash)
         outputs and self.terraform_outputs.update(
-            {module_name: self.get_terraform_outputs(cwd, env, outputs)}
+            {
+                module_name: self.get_terraform_outputs(
+                    module_name, cwd, tf_env, state_path, outputs
+                )
+            }
         )
 
+    def get_terraform_modules(self):
+        """Return the init methods of the Terraform modules to run."""
+        modules = {}
+        if self.terraform_backend == TERRAFORM_BACKEND_TFC:
+            modules[TERRAFORM_MODULE_TFC] = self.init_terraform_cloud
+        if self.gitlab_namespace_path:
+            modules[TERRAFORM_MODULE_GITLAB] = self.init_gitlab
+        if self.vault_url:
+            modules[TERRAFORM_MODULE_VAULT] = self.init_vault
+        return modules
+
+    def get_terraform_modules_graph(self, module_names):
+        """Return the dependency graph of the given Terraform modules."""
+        return {
+            module_name: {
+                i
+                for i in TERRAFORM_MODULES_DEPENDENCIES.get(module_name, ())
+                if i in module_names
+            }
+            for module_name in module_names
+        }
+
+    def init_terraform_modules(self):
+        """Initialize the Terraform modules, running independent ones concurrently."""
+        modules = self.get_terraform_modules()
+        modules and self.write_terraform_cli_config()
+        try:
+            run_graph(
+                self.get_terraform_modules_graph(modules),
+                lambda module_name: modules[module_name](),
+            )
+        except BootstrapError:
+            self.terraform_run_modules and self.reset_terraform()
+            raise
+
     def make_sed(self, file_path, placeholder, replace_value):
         """Replace a placeholder value with a given one in a given file."""
-        subprocess.run(  # nosec B603 B607
-            [
-                "sed",
-                "-i",
-                f"s/{placeholder}/{replace_value}/",
-                str(self.output_dir / self.project_dirname / file_path),
-            ]
+        self.register_placeholder(placeholder, replace_value, file_path)
+
+    def walk_service_dir(self):
+        """Return the paths of the service directory tree, without following links."""
+        yield (staging_dir := str(self.staging_dir))
+        dir_paths = [staging_dir]
+        while dir_paths:
+            with os.scandir(dir_paths.pop()) as entries:
+                for entry in entries:
+                    yield entry.path
+                    entry.is_dir(follow_symlinks=False) and dir_paths.append(entry.path)
+
+    def post_process_files(self):
+        """Replace the placeholders and change the owner of the files in one pass."""
+        self.echo(info("...post-processing the service files"))
+        replaced_count = owned_count = 0
+        paths = self.walk_service_dir() if self.uid else list(self.placeholders)
+        for path in paths:
+            if (placeholders := self.placeholders.get(path)) and os.path.isfile(path):
+                with open(path) as f:
+                    text, count = replace_placeholders(f.read(), placeholders)
+                if count:
+                    with open(tmp_path := f"{path}.tmp", "w") as f:
+                        f.write(text)
+                    copymode(path, tmp_path)
+                    os.replace(tmp_path, path)
+                    replaced_count += 1
+            if self.uid:
+                os.lchown(path, self.uid, self.gid or -1)
+                owned_count += 1
+        self.echo(
+            info(f"\t- {replaced_count} files updated, {owned_count} files chowned")
         )
 
-    def change_output_owner(self):
-        """Change the owner of the output directory recursively."""
-        if self.uid:
-            subprocess.run(  # nosec B603 B607
+    def swap_service_dir(self):
+        """Replace the service directory with the staged one, deleting the old one."""
+        self.echo(info(f"...moving the service to {self.service_dir}"))
+        if self.service_dir.exists():
+            replaced_dir = self.staging_dir.parent / "replaced"
+            self.service_dir.rename(replaced_dir)
+            self.staging_dir.rename(self.service_dir)
+            log_path = self.logs_dir / self.service_slug / "deletion.log"
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self.echo(
+                info(
+                    f"...deleting the replaced {self.service_slug} files "
+                    f"in the background (see {log_path})"
+                )
+            )
+            # the deletion process detaches itself, not to be waited for on exit
+            subprocess.run(  # nosec B603
                 [
-                    "chown",
-                    "-R",
-                    ":".join(map(str, filter(None, (self.uid, self.gid)))),
-                    self.service_dir,
-                ]
+                    sys.executable,
+                    "-m",
+                    "bootstrap.deletion",
+                    str(self.staging_dir.parent),
+                    str(log_path),
+                ],
+                check=True,
+                cwd=TEMPLATE_PATH,
+                stdin=subprocess.DEVNULL,
             )
+        else:
+            self.staging_dir.rename(self.service_dir)
+            self.staging_dir.parent.rmdir()
+
+    def write_trace(self):
+        """Write the run trace and echo its summary."""
+        trace_dir = self.logs_dir / self.service_slug
+        self.tracer.write(trace_dir)
+        self.echo(highlight(f"Tracing summary (see {trace_dir / 'trace.json'}):"))
+        self.echo(self.tracer.get_summary())
 
     def run(self):
         """Run the bootstrap."""
-        click.echo(highlight(f"Initializing the {self.service_slug} service:"))
-        self.init_service()
-        self.create_env_file()
-        self.format_files()
-        self.compile_requirements()
-        self.create_static_directory()
-        self.media_storage == "local" and self.create_media_directory()
-        if self.terraform_backend == TERRAFORM_BACKEND_TFC:
-            self.init_terraform_cloud()
-        if self.gitlab_namespace_path:
-            self.init_gitlab()
-        if self.vault_url:
-            self.init_vault()
-        self.change_output_owner()
+        self.echo(highlight(f"Initializing the {self.service_slug} service:"))
+        try:
+            self.run_step(
+                "init_service", self.init_service, self.get_cookiecutter_context()
+            )
+            self.run_step("create_env_file", self.create_env_file)
+            self.run_step("format_files", self.format_files)
+            self.run_step("compile_requirements", self.compile_requirements)
+            self.run_step("create_static_directory", self.create_static_directory)
+            self.media_storage == "local" and self.run_step(
+                "create_media_directory", self.create_media_directory
+            )
+            with self.tracer.span("init_terraform_modules"):
+                self.init_terraform_modules()
+        except BootstrapError:
+            self.keep_on_failure and self.echo(
+                warning(f"Resume the bootstrap with --resume={self.run_id}")
+            )
+            raise
+        else:
+            self.run_step(
+                "post_process_files",
+                self.post_process_files,
+                {
+                    "gid": self.gid,
+                    "placeholders": {k: list(v) for k, v in self.placeholders.items()},
+                    "uid": self.uid,
+                },
+            )
+            # a resumed completed run has no staged service to move
+            self.run_step("swap_service_dir", self.swap_service_dir)
+        finally:
+            self.trace and self.write_trace()
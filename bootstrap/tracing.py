@@ -0,0 +1,126 @@
+"""Bootstrap steps and subprocesses tracing."""
+
+import json
+import os
+import subprocess  # nosec B404
+import sys
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from operator import methodcaller
+from threading import Lock, get_native_id
+from time import perf_counter
+
+# ru_maxrss is measured in bytes on macOS and in kilobytes elsewhere
+MAXRSS_KB_DIVISOR = 1024 if sys.platform == "darwin" else 1
+
+
+@dataclass
+class Tracer:
+    """A tracer recording the bootstrap steps and subprocesses as spans."""
+
+    enabled: bool = False
+    spans: list = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        """Finalize initialization."""
+        self._start_time = perf_counter()
+        self._lock = Lock()
+
+    def add_span(self, name, category, start_time, **args):
+        """Add a span, started at the given time and ending now."""
+        if self.enabled:
+            span = {
+                "name": name,
+                "cat": category,
+                "start": start_time - self._start_time,
+                "duration": perf_counter() - start_time,
+                "tid": get_native_id(),
+                "args": args,
+            }
+            with self._lock:
+                self.spans.append(span)
+
+    @contextmanager
+    def span(self, name, category="step"):
+        """Trace the wrapped code as a span."""
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start_time)
+
+    def run(self, args, *, name=None, stdout=None, read_stdout=None, **kwargs):
+        """
+        Run a command, tracing its wall time, CPU time and peak RSS.
+
+        Only the stdout can be captured, passing `subprocess.PIPE`, and it's either
+        read whole or consumed by the given `read_stdout` callable while running.
+        """
+        start_time = perf_counter()
+        with subprocess.Popen(args, stdout=stdout, **kwargs) as process:  # nosec B603
+            output = None
+            if stdout == subprocess.PIPE:
+                output = (read_stdout or methodcaller("read"))(process.stdout)
+            _pid, status, rusage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        self.add_span(
+            name or " ".join(map(str, args[:2])),
+            "subprocess",
+            start_time,
+            cpu_user=rusage.ru_utime,
+            cpu_system=rusage.ru_stime,
+            max_rss_kb=rusage.ru_maxrss // MAXRSS_KB_DIVISOR,
+            returncode=process.returncode,
+        )
+        return subprocess.CompletedProcess(args, process.returncode, output)
+
+    def get_chrome_trace(self):
+        """Return the spans in the Chrome trace event format."""
+        pid = os.getpid()
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "args": i["args"],
+                    "cat": i["cat"],
+                    "dur": round(i["duration"] * 1e6),
+                    "name": i["name"],
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": i["tid"],
+                    "ts": round(i["start"] * 1e6),
+                }
+                for i in self.spans
+            ],
+        }
+
+    def get_summary(self, limit=20):
+        """Return a summary table of the slowest spans, aggregated by name."""
+        totals = defaultdict(lambda: [0, 0.0, 0.0, 0])
+        for span in self.spans:
+            total = totals[(span["cat"], span["name"])]
+            total[0] += 1
+            total[1] += span["duration"]
+            total[2] += span["args"].get("cpu_user", 0) + span["args"].get(
+                "cpu_system", 0
+            )
+            total[3] = max(total[3], span["args"].get("max_rss_kb", 0))
+        width = max([len(name) for _cat, name in totals] + [4])
+        lines = [
+            f"{'span':<{width}}  {'count':>5}  {'wall':>9}  {'cpu':>9}  {'rss':>9}"
+        ]
+        for (_cat, name), (count, wall, cpu, rss) in sorted(
+            totals.items(), key=lambda i: -i[1][1]
+        )[:limit]:
+            lines.append(
+                f"{name:<{width}}  {count:>5}  {wall:>8.2f}s  {cpu:>8.2f}s  "
+                + (f"{rss / 1024:>6.0f} MB" if rss else f"{'-':>9}")
+            )
+        return "\n".join(lines)
+
+    def write(self, logs_dir):
+        """Write the Chrome trace and its summary to the given directory."""
+        os.makedirs(logs_dir, exist_ok=True)
+        (logs_dir / "trace.json").write_text(json.dumps(self.get_chrome_trace()))
+        (logs_dir / "trace-summary.txt").write_text(self.get_summary() + "\n")
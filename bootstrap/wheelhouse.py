@@ -0,0 +1,102 @@
+"""Bootstrap requirements wheelhouse."""
+
+import re
+import subprocess  # nosec B404
+from shutil import copyfile
+
+from bootstrap.manifest import get_inputs_hash
+
+# wheel names have their dashes escaped, unlike source distribution names
+DISTRIBUTION_PATTERNS = (
+    re.compile(r"^(?P<name>[^-]+)-(?P<version>[^-]+)-.+\.whl$"),
+    re.compile(r"^(?P<name>.+)-(?P<version>[^-]+)\.(?:tar\.gz|zip)$"),
+)
+
+PIN_PATTERN = re.compile(
+    r"^(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)(?:\[[^\]]*\])?==(?P<version>[^\s;\\]+)",
+    re.MULTILINE,
+)
+
+
+def normalize_name(name):
+    """Return the normalized form of the given distribution name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def get_wheelhouse_index_args(wheelhouse_path):
+    """Return the pip arguments resolving the requirements from the wheelhouse."""
+    for index_path in (wheelhouse_path, wheelhouse_path / "simple"):
+        if (index_path / "index.html").is_file():
+            return [f"--index-url={index_path.resolve().as_uri()}"]
+    return ["--no-index", f"--find-links={wheelhouse_path.resolve()}"]
+
+
+def get_wheelhouse_distributions(wheelhouse_path):
+    """Return the names and versions of the distributions in the wheelhouse."""
+    return {
+        (normalize_name(match["name"]), match["version"])
+        for i in wheelhouse_path.rglob("*")
+        for pattern in DISTRIBUTION_PATTERNS
+        if (match := pattern.match(i.name))
+    }
+
+
+def get_lock_key(requirements_path, graph, name):
+    """Return the key of the given requirements file and its includes contents."""
+    names, pending = set(), [name]
+    while pending:
+        if (i := pending.pop()) not in names:
+            names.add(i)
+            pending.extend(graph[i])
+    return get_inputs_hash(
+        {i: (requirements_path / f"{i}.in").read_text() for i in names}
+    )
+
+
+def get_lock_path(wheelhouse_path, lock_key):
+    """Return the path of the stored lock file with the given key."""
+    return wheelhouse_path / "locks" / f"{lock_key}.txt"
+
+
+def get_valid_lock(wheelhouse_path, requirements_path, graph, name):
+    """Return the stored lock text of the given requirements file, if still valid."""
+    lock_path = get_lock_path(
+        wheelhouse_path, get_lock_key(requirements_path, graph, name)
+    )
+    if not lock_path.is_file():
+        return None
+    lock_text = lock_path.read_text()
+    pins = {
+        (normalize_name(i["name"]), i["version"])
+        for i in PIN_PATTERN.finditer(lock_text)
+    }
+    if pins <= get_wheelhouse_distributions(wheelhouse_path):
+        return lock_text
+
+
+def fill_wheelhouse(wheelhouse_path, requirements_path, graph):
+    """Download the locked distributions in the wheelhouse and store the locks."""
+    for name in sorted(graph):
+        if not (lock_path := requirements_path / f"{name}.txt").is_file():
+            continue
+        subprocess.run(  # nosec B603 B607
+            [
+                "python3",
+                "-m",
+                "pip",
+                "download",
+                "--dest",
+                wheelhouse_path,
+                "--no-deps",
+                "--quiet",
+                "--requirement",
+                lock_path,
+            ],
+            check=True,
+        )
+        stored_lock_path = get_lock_path(
+            wheelhouse_path, get_lock_key(requirements_path, graph, name)
+        )
+        stored_lock_path.parent.mkdir(parents=True, exist_ok=True)
+        copyfile(lock_path, stored_lock_path)
+        yield lock_path
@@ -5,12 +5,13 @@ from pathlib import Path
 
 import click
 
-from bootstrap.collector import Collector
 from bootstrap.constants import (
     DEPLOYMENT_TYPE_CHOICES,
     ENVIRONMENTS_DISTRIBUTION_CHOICES,
     GITLAB_TOKEN_ENV_VAR,
     MEDIA_STORAGE_CHOICES,
+    TERRAFORM_LOG_LEVEL_CHOICES,
+    TERRAFORM_LOG_LEVEL_DEFAULT,
     VAULT_TOKEN_ENV_VAR,
 )
 from bootstrap.exceptions import BootstrapError
@@ -28,7 +29,7 @@ from bootstrap.helpers import slugify_option
         exists=True, path_type=Path, file_okay=False, readable=True, writable=True
     ),
 )
-@click.option("--project-name", prompt=True)
+@click.option("--project-name")
 @click.option("--project-slug", callback=slugify_option)
 @click.option("--project-dirname")
 @click.option("--service-slug", callback=slugify_option)
@@ -67,14 +68,48 @@ from bootstrap.helpers import slugify_option
 @click.option("--gitlab-token", envvar=GITLAB_TOKEN_ENV_VAR)
 @click.option("--gitlab-namespace-path")
 @click.option("--terraform-dir")
+@click.option("--terraform-plugin-cache-dir", envvar="TF_PLUGIN_CACHE_DIR")
+@click.option(
+    "--terraform-provider-mirror",
+    type=click.Path(exists=True, path_type=Path, file_okay=False, readable=True),
+)
+@click.option(
+    "--terraform-log-level",
+    default=TERRAFORM_LOG_LEVEL_DEFAULT,
+    type=click.Choice(TERRAFORM_LOG_LEVEL_CHOICES, case_sensitive=False),
+)
 @click.option("--logs-dir")
+@click.option("--render-cache-dir")
+@click.option(
+    "--wheelhouse",
+    type=click.Path(exists=True, path_type=Path, file_okay=False, readable=True),
+)
+@click.option("--resume", "resume_run_id")
+@click.option("--keep-on-failure", is_flag=True)
+@click.option("--trace", is_flag=True)
 @click.option("--quiet", is_flag=True)
-def main(**options):
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, path_type=Path, dir_okay=False, readable=True),
+)
+@click.option("--jobs", default=4, type=click.IntRange(min=1))
+def main(manifest, jobs, **options):
     """Run the setup."""
+    # imported here, so that the CLI starts fast, e.g. to show the help
+    from bootstrap.batch import BatchRunner
+    from bootstrap.collector import Collector
+
     try:
-        collector = Collector(**options)
-        collector.collect()
-        collector.launch_runner()
+        if manifest:
+            batch_runner = BatchRunner(
+                manifest_path=manifest, jobs=jobs, options=options
+            )
+            batch_runner.collect()
+            batch_runner.run()
+        else:
+            collector = Collector(**options)
+            collector.collect()
+            collector.launch_runner()
     except BootstrapError as e:
         raise click.Abort() from e
 
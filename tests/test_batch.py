@@ -0,0 +1,159 @@
+"""Bootstrap batch runner tests."""
+
+from pathlib import Path
+from shutil import rmtree
+from unittest import TestCase, mock
+
+import click
+
+from bootstrap.batch import BatchRunner
+from bootstrap.exceptions import BootstrapError
+
+MANIFEST = """
+[defaults]
+project_name = "Test Project"
+media_storage = "none"
+
+[[services]]
+service_slug = "backend"
+project_dirname = "backend"
+
+[[services]]
+service_slug = "worker"
+project_dirname = "worker"
+media_storage = "local"
+"""
+
+
+class TestBootstrapBatchRunner(TestCase):
+    """Test the bootstrap batch runner."""
+
+    maxDiff = None
+
+    def setUp(self):
+        """Set up the test data."""
+        self.output_dir = Path("./tests/test_files")
+        rmtree(self.output_dir, ignore_errors=True)
+        self.output_dir.mkdir()
+        self.manifest_path = self.output_dir / "services.toml"
+        self.manifest_path.write_text(MANIFEST)
+        return super().setUp()
+
+    def tearDown(self):
+        """Cleanup after each test."""
+        rmtree(self.output_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def test_get_services_options(self):
+        """Test merging the services options with the shared ones."""
+        batch_runner = BatchRunner(
+            manifest_path=self.manifest_path,
+            options={"media_storage": "aws-s3", "quiet": True, "vault_url": None},
+        )
+        self.assertEqual(
+            batch_runner.get_services_options(),
+            [
+                {
+                    "media_storage": "none",
+                    "project_dirname": "backend",
+                    "project_name": "Test Project",
+                    "quiet": True,
+                    "service_slug": "backend",
+                },
+                {
+                    "media_storage": "local",
+                    "project_dirname": "worker",
+                    "project_name": "Test Project",
+                    "quiet": True,
+                    "service_slug": "worker",
+                },
+            ],
+        )
+
+    def get_collector(self, **options):
+        """Return a mocked collector with the given options."""
+        return mock.MagicMock(
+            _service_dir=self.output_dir / options["project_dirname"], **options
+        )
+
+    def test_collect(self):
+        """Test collecting the options of every service."""
+        batch_runner = BatchRunner(manifest_path=self.manifest_path)
+        with mock.patch("bootstrap.batch.Collector", side_effect=self.get_collector):
+            batch_runner.collect()
+        self.assertEqual(
+            [i.service_slug for i in batch_runner.collectors], ["backend", "worker"]
+        )
+        [i.collect.assert_called_once() for i in batch_runner.collectors]
+
+    def test_collect_duplicate_directories(self):
+        """Test collecting services sharing the same directory."""
+        batch_runner = BatchRunner(manifest_path=self.manifest_path)
+        self.manifest_path.write_text(
+            MANIFEST.replace('dirname = "worker"', 'dirname = "backend"')
+        )
+        with mock.patch(
+            "bootstrap.batch.Collector", side_effect=self.get_collector
+        ), mock.patch("bootstrap.batch.click.echo") as mocked_echo:
+            with self.assertRaises(BootstrapError):
+                batch_runner.collect()
+        self.assertIn("distinct directories", mocked_echo.call_args.args[0])
+
+    def test_collect_duplicate_slugs(self):
+        """Test collecting services sharing the same slug."""
+        batch_runner = BatchRunner(manifest_path=self.manifest_path)
+        self.manifest_path.write_text(
+            MANIFEST.replace('slug = "worker"', 'slug = "backend"')
+        )
+        with mock.patch(
+            "bootstrap.batch.Collector", side_effect=self.get_collector
+        ), mock.patch("bootstrap.batch.click.echo") as mocked_echo:
+            with self.assertRaises(BootstrapError):
+                batch_runner.collect()
+        self.assertIn("distinct slugs: backend", mocked_echo.call_args.args[0])
+
+    def test_collect_invalid_options(self):
+        """Test collecting invalid service options."""
+        self.manifest_path.write_text('[[services]]\ninternal_service_port = "abc"')
+        batch_runner = BatchRunner(manifest_path=self.manifest_path)
+        with self.assertRaises(BootstrapError):
+            batch_runner.collect()
+
+    def test_collect_unknown_options(self):
+        """Test collecting unknown service options."""
+        self.manifest_path.write_text(
+            MANIFEST + '\n[[services]]\nservice_slug = "api"\nservice_port = 80'
+        )
+        batch_runner = BatchRunner(manifest_path=self.manifest_path)
+        with mock.patch(
+            "bootstrap.batch.Collector", side_effect=self.get_collector
+        ), mock.patch("bootstrap.batch.click.echo") as mocked_echo:
+            with self.assertRaises(BootstrapError):
+                batch_runner.collect()
+        self.assertIn(
+            "Unknown options for service #3: service_port",
+            mocked_echo.call_args.args[0],
+        )
+
+    def test_run(self):
+        """Test running the services and failing when one of them fails."""
+        batch_runner = BatchRunner(manifest_path=self.manifest_path)
+        runners = {}
+        for service_slug in ("backend", "worker"):
+            collector = mock.MagicMock(service_slug=service_slug)
+            runners[service_slug] = collector.get_runner.return_value
+            batch_runner.collectors.append(collector)
+        runners["worker"].run.side_effect = BootstrapError
+        with self.assertRaises(BootstrapError):
+            batch_runner.run()
+        self.assertEqual(
+            [(i, s) for i, (s, *_) in batch_runner.results.items()],
+            [("backend", True), ("worker", False)],
+        )
+        self.assertIs(
+            runners["backend"].requirements_locks, runners["worker"].requirements_locks
+        )
+        self.assertEqual(
+            [click.unstyle(i.output_prefix) for i in runners.values()],
+            ["backend | ", "worker  | "],
+        )
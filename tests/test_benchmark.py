@@ -0,0 +1,191 @@
+"""Bootstrap pipeline benchmarks."""
+
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from unittest import TestCase, mock, skipUnless
+
+from bootstrap.batch import BatchRunner
+from bootstrap.collector import Collector
+
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+
+# the relative and absolute (in seconds) slowdowns tolerated over the baseline
+THRESHOLD = float(os.environ.get("BOOTSTRAP_BENCHMARK_THRESHOLD", "0.25"))
+
+TOLERANCE = 0.05
+
+# the simulated latencies of the external commands, in seconds, which can be
+# overridden by the environment variables with the same names
+LATENCIES = {
+    "BENCHMARK_PIPTOOLS_LATENCY": "0.05",
+    "BENCHMARK_RUFF_LATENCY": "0.05",
+    "BENCHMARK_TERRAFORM_LATENCY": "0.1",
+}
+
+PYTHON_STUB = """#!/bin/sh
+case "$2" in
+  piptools)
+    sleep BENCHMARK_PIPTOOLS_LATENCY
+    for arg; do output_file="$input_file"; input_file="$arg"; done
+    grep -v '^-r' "$input_file" > "$output_file" ;;
+  ruff)
+    sleep BENCHMARK_RUFF_LATENCY ;;
+  *)
+    exit 1 ;;
+esac
+"""
+
+TERRAFORM_STUB = """#!/bin/sh
+sleep BENCHMARK_TERRAFORM_LATENCY
+if [ "$1" = "apply" ]; then
+  echo '{"@level":"info","@message":"Apply complete!","type":"change_summary"}'
+fi
+"""
+
+OPTIONS = {
+    "deployment_type": "digitalocean-k8s",
+    "environments_distribution": "3",
+    "gitlab_namespace_path": "group",
+    "gitlab_token": "gitlab-token",
+    "gitlab_url": "https://gitlab.com",
+    "internal_service_port": 8000,
+    "media_storage": "local",
+    "project_name": "Benchmark Project",
+    "project_slug": "benchmark-project",
+    "project_url_dev": "https://dev.benchmark.com",
+    "project_url_prod": "https://www.benchmark.com",
+    "project_url_stage": "https://stage.benchmark.com",
+    "quiet": True,
+    "sentry_org": "",
+    "terraform_backend": "terraform-cloud",
+    "terraform_cloud_hostname": "app.terraform.io",
+    "terraform_cloud_organization": "benchmark",
+    "terraform_cloud_organization_create": False,
+    "terraform_cloud_token": "terraform-cloud-token",
+    "use_redis": False,
+    "vault_token": "vault-token",
+    "vault_url": "https://vault.benchmark.com",
+}
+
+
+@skipUnless(os.environ.get("BOOTSTRAP_BENCHMARK"), "set BOOTSTRAP_BENCHMARK=1")
+class TestBootstrapBenchmark(TestCase):
+    """Benchmark the bootstrap pipeline against local stand-in commands."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the baseline timings."""
+        cls.baseline = (
+            json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.is_file() else {}
+        )
+        cls.timings = {}
+        return super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Store the timings as the new baseline, if requested."""
+        if os.environ.get("BOOTSTRAP_BENCHMARK_UPDATE"):
+            BASELINE_PATH.write_text(
+                json.dumps({**cls.baseline, **cls.timings}, indent=2, sort_keys=True)
+                + "\n"
+            )
+        return super().tearDownClass()
+
+    def setUp(self):
+        """Set up the stand-in commands and the output directories."""
+        self.tmp_dir = TemporaryDirectory()
+        self.output_dir = Path(self.tmp_dir.name)
+        (bin_dir := self.output_dir / "bin").mkdir()
+        for name, stub in (("python3", PYTHON_STUB), ("terraform", TERRAFORM_STUB)):
+            for latency_name, latency in LATENCIES.items():
+                latency = str(float(os.environ.get(latency_name, latency)))
+                stub = stub.replace(latency_name, latency)
+            (bin_dir / name).write_text(stub)
+            (bin_dir / name).chmod(0o755)
+        self.environ = mock.patch.dict(
+            os.environ, PATH=f"{bin_dir}:{os.environ['PATH']}"
+        )
+        self.environ.start()
+        self.options = {
+            **OPTIONS,
+            "logs_dir": self.output_dir / ".logs",
+            "output_dir": self.output_dir,
+            "render_cache_dir": self.output_dir / ".cache",
+            "terraform_dir": self.output_dir / ".terraform",
+            "terraform_plugin_cache_dir": self.output_dir / ".terraform" / "cache",
+            "trace": True,
+        }
+        return super().setUp()
+
+    def tearDown(self):
+        """Cleanup after each benchmark."""
+        self.environ.stop()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def assertNoRegression(self, scenario, timings):
+        """Assert the given scenario timings are within the baseline threshold."""
+        self.timings[scenario] = {k: round(v, 3) for k, v in timings.items()}
+        baseline = self.baseline.get(scenario, {})
+        regressions = {
+            name: f"{timing:.3f}s > {baseline[name]:.3f}s"
+            for name, timing in timings.items()
+            if name in baseline
+            and timing > baseline[name] * (1 + THRESHOLD) + TOLERANCE
+        }
+        self.assertEqual(regressions, {}, f"{scenario} is slower than the baseline")
+
+    def get_steps_timings(self, tracer):
+        """Return the total time of the given tracer steps and subprocesses."""
+        timings = defaultdict(float)
+        for span in tracer.spans:
+            timings[span["name"].rsplit(" ", 1)[0]] += span["duration"]
+        return timings
+
+    def test_service(self):
+        """Benchmark a service with Terraform modules and 3 environments stacks."""
+        start_time = perf_counter()
+        collector = Collector(
+            **self.options, project_dirname="backend", service_slug="backend"
+        )
+        collector.collect()
+        collect_time = perf_counter() - start_time
+        runner = collector.get_runner()
+        runner.run()
+        self.assertNoRegression(
+            "service",
+            {
+                "collect": collect_time,
+                "run": perf_counter() - start_time - collect_time,
+                **self.get_steps_timings(runner.tracer),
+            },
+        )
+
+    def test_batch(self):
+        """Benchmark a batch of 50 services."""
+        manifest_path = self.output_dir / "services.toml"
+        manifest_path.write_text(
+            "".join(
+                f'[[services]]\nservice_slug = "service{i}"\n'
+                f'project_dirname = "service{i}"\n'
+                for i in range(50)
+            )
+        )
+        batch_runner = BatchRunner(
+            manifest_path=manifest_path, options={**self.options, "trace": False}
+        )
+        start_time = perf_counter()
+        batch_runner.collect()
+        collect_time = perf_counter() - start_time
+        batch_runner.run()
+        self.assertNoRegression(
+            "batch",
+            {
+                "collect": collect_time,
+                "run": perf_counter() - start_time - collect_time,
+            },
+        )
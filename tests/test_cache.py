@@ -0,0 +1,56 @@
+"""Bootstrap render cache tests."""
+
+import os
+from pathlib import Path
+from shutil import rmtree
+from time import time
+from unittest import TestCase
+
+from bootstrap.cache import RenderCache, get_tree_hash
+
+
+class TestBootstrapRenderCache(TestCase):
+    """Test the render cache."""
+
+    def setUp(self):
+        """Set up the test data."""
+        self.output_dir = Path("./tests/test_files")
+        rmtree(self.output_dir, ignore_errors=True)
+        self.source_path = self.output_dir / "source"
+        self.source_path.mkdir(parents=True)
+        (self.source_path / "file.txt").write_text("x" * 100)
+        return super().setUp()
+
+    def tearDown(self):
+        """Cleanup after each test."""
+        rmtree(self.output_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def test_get_tree_hash(self):
+        """Test the tree hash changes with the file names and contents."""
+        tree_hash = get_tree_hash(self.source_path)
+        (self.source_path / "file.txt").write_text("y" * 100)
+        self.assertNotEqual(get_tree_hash.__wrapped__(self.source_path), tree_hash)
+
+    def test_materialize(self):
+        """Test materializing a stored entry, isolated from the cached files."""
+        render_cache = RenderCache(self.output_dir / "cache")
+        self.assertFalse(render_cache.materialize("key", self.output_dir / "out"))
+        render_cache.store("key", self.source_path)
+        render_cache.store("key", self.source_path)
+        self.assertTrue(render_cache.materialize("key", self.output_dir / "out"))
+        (self.output_dir / "out" / "file.txt").write_text("edited")
+        self.assertEqual(
+            (render_cache.path / "key" / "file.txt").read_text(), "x" * 100
+        )
+        self.assertEqual(os.listdir(render_cache.path), ["key"])
+
+    def test_evict(self):
+        """Test evicting the stale entries and the oldest beyond max size."""
+        render_cache = RenderCache(self.output_dir / "cache", max_size=250)
+        for key, age in (("stale", 3600), ("old", 2), ("recent", 1), ("new", 0)):
+            render_cache.store(key, self.source_path)
+            os.utime(render_cache.path / key, (time() - age,) * 2)
+        render_cache.max_age = 60
+        render_cache.evict()
+        self.assertEqual(sorted(os.listdir(render_cache.path)), ["new", "recent"])
@@ -31,6 +31,7 @@ class TestBootstrapCollector(TestCase):
             project_name="project_name",
         )
         collector.set_project_dirname = mock.MagicMock()
+        collector.set_project_name = mock.MagicMock()
         collector.set_project_slug = mock.MagicMock()
         collector.set_service_slug = mock.MagicMock()
         collector.set_project_urls = mock.MagicMock()
@@ -46,6 +47,7 @@ class TestBootstrapCollector(TestCase):
         collector.set_gitlab = mock.MagicMock()
         collector.set_media_storage = mock.MagicMock()
         collector.collect()
+        collector.set_project_name.assert_called_once()
         collector.set_project_slug.assert_called_once()
         collector.set_project_dirname.assert_called_once()
         collector.set_service_dir.assert_called_once()
@@ -244,6 +246,14 @@ class TestBootstrapCollector(TestCase):
         self.assertEqual(collector.project_url_prod, "https://www.domain.com")
         mocked_prompt.assert_not_called()
 
+    def test_project_name_from_input(self):
+        """Test collecting the project name from user input."""
+        collector = Collector()
+        self.assertIsNone(collector.project_name)
+        with mock_input("My Project"):
+            collector.set_project_name()
+        self.assertEqual(collector.project_name, "My Project")
+
     def test_project_slug_from_default(self):
         """Test collecting the project slug from its default value."""
         collector = Collector(project_name="My Project")
@@ -444,7 +454,7 @@ class TestBootstrapCollector(TestCase):
         self.assertEqual(collector._service_dir, service_dir.resolve())
 
     def test_service_dir_already_exists(self):
-        """Test service dir with a new folder."""
+        """Test service dir with an existing folder, kept until replaced."""
         collector = Collector(
             project_name="project_name",
             output_dir=str(self.output_dir.resolve()),
@@ -454,7 +464,23 @@ class TestBootstrapCollector(TestCase):
         os.makedirs(service_dir, exist_ok=True)
         with mock_input("y"):
             collector.set_service_dir()
-        self.assertFalse(os.path.exists(service_dir))
+        self.assertTrue(os.path.exists(service_dir))
+        self.assertEqual(collector._service_dir, service_dir.resolve())
+
+    def test_service_dir_resume(self):
+        """Test service dir of a resumed run is kept."""
+        collector = Collector(
+            project_name="project_name",
+            output_dir=str(self.output_dir.resolve()),
+            project_dirname="test_project",
+            resume_run_id="1700000000",
+        )
+        service_dir = self.output_dir / "test_project"
+        os.makedirs(service_dir, exist_ok=True)
+        with mock.patch("bootstrap.collector.click.confirm") as mocked_confirm:
+            collector.set_service_dir()
+        mocked_confirm.assert_not_called()
+        self.assertTrue(os.path.exists(service_dir))
         self.assertEqual(collector._service_dir, service_dir.resolve())
 
     def test_terraform_backend_from_default(self):
@@ -0,0 +1,31 @@
+"""Bootstrap deletion tests."""
+
+import os
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from bootstrap.deletion import delete_tree
+
+
+class TestBootstrapDeletion(TestCase):
+    """Test the bootstrap deletion."""
+
+    def test_delete_tree(self):
+        """Test deleting a tree, reporting the progress, without following links."""
+        with TemporaryDirectory() as temp_dir:
+            (kept_dir := Path(temp_dir) / "kept").mkdir()
+            (kept_dir / "file.txt").write_text("kept")
+            (tree_dir := Path(temp_dir) / "tree" / "sub").mkdir(parents=True)
+            (tree_dir / "file.txt").write_text("deleted")
+            (tree_dir / "link").symlink_to(kept_dir)
+            log_file = StringIO()
+            count = delete_tree(tree_dir.parent, log_file, report_interval=0)
+            self.assertEqual(count, 3)
+            self.assertEqual(os.listdir(temp_dir), ["kept"])
+            self.assertEqual(os.listdir(kept_dir), ["file.txt"])
+        self.assertEqual(
+            log_file.getvalue().splitlines(),
+            ["2 files deleted", "3 files deleted", "Deleted 3 files"],
+        )
@@ -0,0 +1,51 @@
+"""Bootstrap graph tests."""
+
+from threading import Barrier
+from unittest import TestCase
+
+from bootstrap.graph import reverse_graph, run_graph
+
+
+class TestBootstrapReverseGraph(TestCase):
+    """Test the 'reverse_graph' function."""
+
+    def test_reverse_graph(self):
+        """Test reversing a dependency graph."""
+        self.assertEqual(
+            reverse_graph({"a": set(), "b": {"a"}, "c": {"a", "b"}}),
+            {"a": {"b", "c"}, "b": {"c"}, "c": set()},
+        )
+
+
+class TestBootstrapRunGraph(TestCase):
+    """Test the 'run_graph' function."""
+
+    def test_run_graph_order(self):
+        """Test nodes are run after their dependencies."""
+        calls = []
+        results = run_graph(
+            {"a": set(), "b": {"a"}, "c": {"b"}}, lambda node: calls.append(node)
+        )
+        self.assertEqual(calls, ["a", "b", "c"])
+        self.assertEqual(results, {"a": None, "b": None, "c": None})
+
+    def test_run_graph_concurrency(self):
+        """Test independent nodes are run concurrently."""
+        barrier = Barrier(3, timeout=5)
+        results = run_graph(
+            {"a": set(), "b": set(), "c": set()}, lambda node: barrier.wait() >= 0
+        )
+        self.assertEqual(results, {"a": True, "b": True, "c": True})
+
+    def test_run_graph_failure(self):
+        """Test dependent nodes are not run when a dependency fails."""
+        calls = []
+
+        def func(node):
+            calls.append(node)
+            if node == "a":
+                raise ValueError(node)
+
+        with self.assertRaises(ValueError):
+            run_graph({"a": set(), "b": {"a"}}, func)
+        self.assertEqual(calls, ["a"])
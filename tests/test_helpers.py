@@ -1,10 +1,15 @@
 """Bootstrap helpers tests."""
 
+import gzip
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
 from bootstrap.helpers import (
-    format_gitlab_variable,
     format_tfvar,
+    get_requirements_includes,
+    replace_placeholders,
+    rotate_log,
     slugify_option,
     validate_or_prompt_domain,
     validate_or_prompt_path,
@@ -14,37 +19,6 @@ from bootstrap.helpers import (
 from tests.utils import mock_input
 
 
-class GitlabVariableTestcase(TestCase):
-    """Test the 'format_gitlab_varialbe' function."""
-
-    def test_gitlab_variable_unmasked_unprotected(self):
-        """Test the formatting of a gitlab unmasked, unprotected variable."""
-        self.assertEqual(
-            format_gitlab_variable("value", False, False),
-            '{ value = "value", protected = false }',
-        )
-
-    def test_gitlab_variable_masked_unprotected(self):
-        """Test the formatting of a gitlab masked, unprotected variable."""
-        self.assertEqual(
-            format_gitlab_variable("value", True, False),
-            '{ value = "value", masked = true, protected = false }',
-        )
-
-    def test_gitlab_variable_unmasked_protected(self):
-        """Test the formatting of a gitlab unmasked, protected variable."""
-        self.assertEqual(
-            format_gitlab_variable("value", False, True), '{ value = "value" }'
-        )
-
-    def test_gitlab_variable_masked_protected(self):
-        """Test the formatting of a gitlab masked, unprotected variable."""
-        self.assertEqual(
-            format_gitlab_variable("value", True, True),
-            '{ value = "value", masked = true }',
-        )
-
-
 class FormatTFVarTestCase(TestCase):
     """Test the 'format_tfvar' function."""
 
@@ -65,6 +39,52 @@ class FormatTFVarTestCase(TestCase):
         self.assertEqual(format_tfvar("something else", "default"), '"something else"')
 
 
+class GetRequirementsIncludesTestCase(TestCase):
+    """Test the 'get_requirements_includes' function."""
+
+    def test_get_requirements_includes(self):
+        """Test getting the included requirements files."""
+        self.assertEqual(
+            get_requirements_includes(
+                "-r base.in\ndjango~=5.0.0\n--requirement=test.in\n-c constraints.txt"
+            ),
+            ["base.in", "test.in"],
+        )
+
+
+class ReplacePlaceholdersTestCase(TestCase):
+    """Test the 'replace_placeholders' function."""
+
+    def test_replace_placeholders(self):
+        """Test replacing overlapping placeholders in a single pass."""
+        self.assertEqual(
+            replace_placeholders(
+                "__A__ __AB__ __A__\\1", {"__A__": "__AB__", "__AB__": "\\2"}
+            ),
+            ("__AB__ \\2 __AB__\\1", 3),
+        )
+
+
+class RotateLogTestCase(TestCase):
+    """Test the 'rotate_log' function."""
+
+    def test_rotate_log(self):
+        """Test compressing a log file, dropping the oldest rotated ones."""
+        with TemporaryDirectory() as logs_dir:
+            log_path = Path(logs_dir) / "apply.log"
+            rotate_log(log_path, 2)
+            for i in range(3):
+                log_path.write_text(f"run {i}")
+                rotate_log(log_path, 2)
+            self.assertFalse(log_path.exists())
+            self.assertEqual(
+                sorted(i.name for i in Path(logs_dir).iterdir()),
+                ["apply.log.1.gz", "apply.log.2.gz"],
+            )
+            with gzip.open(log_path.with_name("apply.log.1.gz"), "rt") as f:
+                self.assertEqual(f.read(), "run 2")
+
+
 class OptionSlugifyTestCase(TestCase):
     """Test the 'option_slugify' function."""
 
@@ -0,0 +1,198 @@
+"""Deploy plan summary script tests."""
+
+import json
+import os
+import subprocess  # nosec B404
+import sys
+from io import StringIO
+from pathlib import Path
+from shutil import which
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from unittest import TestCase, skipUnless
+
+from bootstrap.tracing import MAXRSS_KB_DIVISOR
+from tests.utils import DEPLOY_SCRIPTS_PATH, load_deploy_script
+
+# the jq filter formerly used by the deploy Terraform script, as a reference
+JQ_PLAN = """
+  (
+    [.resource_changes[]?.change.actions?] | flatten
+  ) | {
+    "create":(map(select(.=="create")) | length),
+    "update":(map(select(.=="update")) | length),
+    "delete":(map(select(.=="delete")) | length)
+  }
+"""
+
+# the commands are run by a fresh interpreter, since the peak RSS of a forked
+# process includes the one of its parent, i.e. the test process
+MEASURE_SCRIPT = (
+    "import resource, subprocess, sys\n"
+    "subprocess.run(sys.argv[2:], stdin=open(sys.argv[1]), check=True)\n"
+    "print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss, file=sys.stderr)"
+)
+
+PLAN = {
+    "format_version": "1.2",
+    "planned_values": {"root_module": {"resources": [{"values": {"a": '"]}{['}}]}},
+    "resource_drift": [],
+    "resource_changes": [
+        {
+            "address": "kubernetes_deployment_v1.main",
+            "type": "kubernetes_deployment_v1",
+            "change": {"actions": ["delete", "create"], "after": {"b": "\\\\"}},
+        },
+        {
+            "address": "kubernetes_secret_v1.main",
+            "type": "kubernetes_secret_v1",
+            "change": {"actions": ["no-op"], "after": None},
+        },
+        {
+            "address": "kubernetes_service_v1.main",
+            "type": "kubernetes_service_v1",
+            "change": {"actions": ["update"], "after": {"port": 8000}},
+        },
+    ],
+    "prior_state": {"values": {"outputs": {"resource_changes": []}}},
+    "errored": False,
+}
+
+
+def get_synthetic_plan(resources_count, value_size):
+    """Return a synthetic plan with the given number of resources."""
+    value = "x" * value_size
+    resources = [
+        {"address": f"null_resource.r{i}", "type": "null_resource", "values": value}
+        for i in range(resources_count)
+    ]
+    actions = (["create"], ["update"], ["delete", "create"], ["no-op"])
+    return {
+        "format_version": "1.2",
+        "planned_values": {"root_module": {"resources": resources}},
+        "resource_changes": [
+            {
+                "address": f"null_resource.r{i}",
+                "type": "null_resource",
+                "change": {"actions": actions[i % 4], "before": value, "after": value},
+            }
+            for i in range(resources_count)
+        ],
+        "prior_state": {"values": {"root_module": {"resources": resources}}},
+    }
+
+
+class TestBootstrapPlanSummaryScript(TestCase):
+    """Test the deploy plan summary script."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the script module."""
+        cls.plan_summary = load_deploy_script("plan_summary")
+        return super().setUpClass()
+
+    def get_summary(self, plan_text, chunk_size, addresses=False):
+        """Return the summary of the given plan text, scanned in the given chunks."""
+        scanner = self.plan_summary.PlanScanner(StringIO(plan_text), chunk_size)
+        return self.plan_summary.summarize(scanner.iter_resource_changes(), addresses)
+
+    def test_summarize(self):
+        """Test summarizing a plan, regardless of the chunks and whitespace."""
+        for plan_text in (json.dumps(PLAN), json.dumps(PLAN, indent=2)):
+            for chunk_size in (1, 7, 1 << 16):
+                with self.subTest(chunk_size=chunk_size):
+                    self.assertEqual(
+                        self.get_summary(plan_text, chunk_size, addresses=True),
+                        {
+                            "counts": {"create": 1, "update": 1, "delete": 1},
+                            "resource_types": {
+                                "kubernetes_deployment_v1": {
+                                    "create": 1,
+                                    "update": 0,
+                                    "delete": 1,
+                                },
+                                "kubernetes_service_v1": {
+                                    "create": 0,
+                                    "update": 1,
+                                    "delete": 0,
+                                },
+                            },
+                            "addresses": [
+                                {
+                                    "actions": ["delete", "create"],
+                                    "address": "kubernetes_deployment_v1.main",
+                                },
+                                {
+                                    "actions": ["update"],
+                                    "address": "kubernetes_service_v1.main",
+                                },
+                            ],
+                        },
+                    )
+
+    def test_summarize_no_changes(self):
+        """Test summarizing a plan without resource changes."""
+        self.assertEqual(
+            self.get_summary('{"format_version": "1.2", "errored": false}', 4),
+            {"counts": {"create": 0, "update": 0, "delete": 0}, "resource_types": {}},
+        )
+
+    def test_truncated_plan(self):
+        """Test a truncated plan is rejected."""
+        with self.assertRaises(ValueError):
+            self.get_summary(json.dumps(PLAN)[:-40], 16)
+
+    @skipUnless(which("jq"), "jq is not installed")
+    def test_jq_counts(self):
+        """Test the printed counts match the ones of the jq filter."""
+        plan_text = json.dumps(get_synthetic_plan(100, 10))
+        jq_output = subprocess.run(  # nosec B603 B607
+            ["jq", "-c", JQ_PLAN], input=plan_text, capture_output=True, text=True
+        ).stdout
+        script_output = subprocess.run(  # nosec B603
+            [sys.executable, DEPLOY_SCRIPTS_PATH / "plan_summary.py"],
+            input=plan_text,
+            capture_output=True,
+            text=True,
+        ).stdout
+        self.assertEqual(json.loads(script_output), json.loads(jq_output))
+
+
+@skipUnless(os.environ.get("BOOTSTRAP_BENCHMARK"), "set BOOTSTRAP_BENCHMARK=1")
+@skipUnless(which("jq"), "jq is not installed")
+class TestBootstrapPlanSummaryBenchmark(TestCase):
+    """Benchmark the deploy plan summary script against the jq filter."""
+
+    def measure(self, plan_path, *args):
+        """Return the wall time, peak RSS and output of the given plan command."""
+        start_time = perf_counter()
+        process = subprocess.run(  # nosec B603
+            [sys.executable, "-c", MEASURE_SCRIPT, plan_path, *args],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        return (
+            perf_counter() - start_time,
+            int(process.stderr) // MAXRSS_KB_DIVISOR,
+            json.loads(process.stdout),
+        )
+
+    def test_synthetic_plan(self):
+        """Benchmark summarizing a multi-megabyte plan, with bounded memory."""
+        with TemporaryDirectory() as tmp_dir:
+            plan_path = Path(tmp_dir) / "plan.json"
+            with plan_path.open("w") as plan_file:
+                json.dump(get_synthetic_plan(20_000, 500), plan_file)
+            plan_size_kb = plan_path.stat().st_size // 1024
+            jq_time, jq_rss_kb, jq_output = self.measure(plan_path, "jq", "-c", JQ_PLAN)
+            script_time, script_rss_kb, script_output = self.measure(
+                plan_path, sys.executable, DEPLOY_SCRIPTS_PATH / "plan_summary.py"
+            )
+        print(
+            f"\nplan: {plan_size_kb} KiB"
+            f"\njq: {jq_time:.2f}s, {jq_rss_kb} KiB"
+            f"\nplan_summary.py: {script_time:.2f}s, {script_rss_kb} KiB"
+        )
+        self.assertEqual(script_output, jq_output)
+        self.assertLess(script_rss_kb, plan_size_kb)
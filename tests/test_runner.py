@@ -0,0 +1,610 @@
+"""Bootstrap runner tests."""
+
+import json
+import os
+from pathlib import Path
+from shutil import rmtree
+from time import sleep
+from unittest import TestCase, mock
+
+import click
+
+from bootstrap.exceptions import BootstrapError
+from bootstrap.render import render
+from bootstrap.runner import TERRAFORM_INIT_LOCKS, Runner
+from bootstrap.wheelhouse import get_lock_key, get_lock_path
+
+TERRAFORM_STUB = """#!/bin/sh
+if [ "$1" = "init" ]; then
+  cache=$(sed -n 's/^plugin_cache_dir = "\\(.*\\)"$/\\1/p' "$TF_CLI_CONFIG_FILE")
+  mirror=$(sed -n 's/^ *path = "\\(.*\\)"$/\\1/p' "$TF_CLI_CONFIG_FILE")
+  [ -f "$cache/provider" ] || ln "$mirror/provider" "$cache/provider"
+fi
+"""
+
+TERRAFORM_JSON_STUB = """#!/bin/sh
+echo "init" >> "$TF_LOG_PATH"
+if [ "$1" = "apply" ]; then
+  echo '{"@level":"info","@message":"null.x: Creating","type":"apply_start"}'
+  echo '{"@level":"info","@message":"null.x: Created","type":"apply_complete"}'
+  echo '{"@level":"error","@message":"Error: failed","type":"diagnostic"}'
+  exit 1
+fi
+"""
+
+
+class TestBootstrapRunner(TestCase):
+    """Test the bootstrap runner."""
+
+    maxDiff = None
+
+    def setUp(self):
+        """Set up the test data."""
+        self.output_dir = Path("./tests/test_files")
+        rmtree(self.output_dir, ignore_errors=True)
+        return super().setUp()
+
+    def tearDown(self):
+        """Cleanup after each test."""
+        rmtree(self.output_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def get_runner(self, **kwargs):
+        """Return a runner instance with the given options."""
+        return Runner(
+            **{
+                "deployment_type": "digitalocean-k8s",
+                "environments_distribution": "1",
+                "internal_service_port": 8000,
+                "logs_dir": self.output_dir / ".logs",
+                "media_storage": "none",
+                "output_dir": self.output_dir,
+                "project_dirname": "backend",
+                "project_name": "Test Project",
+                "project_slug": "test-project",
+                "render_cache_dir": self.output_dir / ".cache",
+                "service_dir": self.output_dir / "backend",
+                "service_slug": "backend",
+                "terraform_backend": "terraform-cloud",
+                "terraform_dir": self.output_dir / ".terraform",
+                "terraform_plugin_cache_dir": self.output_dir / "plugin-cache",
+                **kwargs,
+            }
+        )
+
+    def test_get_terraform_modules(self):
+        """Test getting the Terraform modules to run."""
+        runner = self.get_runner(
+            gitlab_namespace_path="namespace", vault_url="https://vault.test.com"
+        )
+        self.assertEqual(
+            list(runner.get_terraform_modules()), ["terraform-cloud", "gitlab", "vault"]
+        )
+        runner = self.get_runner(terraform_backend="gitlab")
+        self.assertEqual(runner.get_terraform_modules(), {})
+
+    def test_init_terraform_modules(self):
+        """Test initializing the Terraform modules."""
+        runner = self.get_runner(
+            gitlab_namespace_path="namespace", vault_url="https://vault.test.com"
+        )
+        with mock.patch.object(runner, "run_terraform") as mocked_run_terraform:
+            runner.init_terraform_modules()
+        self.assertEqual(
+            sorted(i.args[0] for i in mocked_run_terraform.call_args_list),
+            ["gitlab", "terraform-cloud", "vault"],
+        )
+
+    def test_init_terraform_modules_failure(self):
+        """Test the applied Terraform modules are destroyed on failure."""
+        for keep_on_failure, destroyed in ((False, 2), (True, 1)):
+            with self.subTest(keep_on_failure=keep_on_failure):
+                runner = self.get_runner(
+                    gitlab_namespace_path="namespace",
+                    keep_on_failure=keep_on_failure,
+                    terraform_dir=self.output_dir / f".terraform-{keep_on_failure}",
+                )
+
+                def run_terraform(
+                    module_name, env, outputs=None, tfvars=None, runner=runner
+                ):
+                    runner.terraform_run_modules[module_name] = env
+                    if module_name == "gitlab":
+                        raise BootstrapError
+                    runner.manifest.record(f"terraform_{module_name}", "hash")
+
+                with mock.patch.object(
+                    runner, "run_terraform", side_effect=run_terraform
+                ), mock.patch.object(runner, "run_terraform_destroy") as mocked_destroy:
+                    with self.assertRaises(BootstrapError):
+                        runner.init_terraform_modules()
+                self.assertEqual(mocked_destroy.call_count, destroyed)
+                self.assertEqual(
+                    list(runner.manifest.steps),
+                    keep_on_failure and ["terraform_terraform-cloud"] or [],
+                )
+
+    def test_destroy_terraform_module_failure(self):
+        """Test a Terraform module is no longer completed, even if its destroy fails."""
+        runner = self.get_runner()
+        runner.terraform_run_modules["vault"] = {}
+        runner.manifest.record("terraform_vault", "hash")
+        with mock.patch.object(
+            runner, "run_terraform_destroy", side_effect=BootstrapError
+        ), self.assertRaises(BootstrapError):
+            runner.destroy_terraform_module("vault")
+        self.assertEqual(runner.manifest.steps, {})
+
+    def test_run_terraform_tfvars(self):
+        """Test the Terraform structured variables are passed through a file."""
+        runner = self.get_runner(
+            gitlab_namespace_path="namespace",
+            sentry_dsn="https://sentry.test.com/1",
+            sentry_org="test",
+            sentry_url="https://sentry.test.com",
+        )
+        with mock.patch.object(runner, "run_terraform_command") as mocked_command:
+            runner.init_gitlab()
+        tfvars_path = (
+            runner.terraform_dir / "backend" / "gitlab" / "gitlab.auto.tfvars.json"
+        )
+        self.assertEqual(tfvars_path.stat().st_mode & 0o777, 0o600)
+        self.assertEqual(
+            json.loads(tfvars_path.read_text()),
+            {
+                "group_variables": {},
+                "project_variables": {
+                    "SENTRY_DSN": {
+                        "masked": True,
+                        "value": "https://sentry.test.com/1",
+                    },
+                    "SENTRY_ENABLED": {"value": "true"},
+                    "SENTRY_ORG": {"value": "test"},
+                    "SENTRY_URL": {"value": "https://sentry.test.com"},
+                },
+            },
+        )
+        apply_args = mocked_command.call_args_list[-1].args
+        self.assertEqual(apply_args[0], "apply")
+        self.assertIn(f"-var-file={tfvars_path.resolve()}", apply_args)
+        self.assertFalse([i for i in apply_args[2] if i.endswith("_variables")])
+
+    def test_compile_requirements(self):
+        """Test compiling the requirements files following their includes."""
+        runner = self.get_runner()
+        requirements_path = runner.staging_dir / "requirements"
+        requirements_path.mkdir(parents=True)
+        (requirements_path / "base.in").write_text("psycopg[c]~=3.1.0\n")
+        (requirements_path / "common.in").write_text("-r base.in\ndjango~=5.0.0\n")
+        (requirements_path / "local.in").write_text("-r test.in\nipython~=8.20.0\n")
+        (requirements_path / "remote.in").write_text("-r common.in\ngunicorn\n")
+        (requirements_path / "test.in").write_text("-r common.in\ncoverage\n")
+        self.assertEqual(
+            runner.get_requirements_graph(requirements_path),
+            {
+                "base": set(),
+                "common": {"base"},
+                "local": {"test"},
+                "remote": {"common"},
+                "test": {"common"},
+            },
+        )
+        compiled = []
+
+        def run(args, **kwargs):
+            compiled.append(Path(args[-1]).stem)
+            Path(args[-2]).touch()
+
+        with mock.patch("bootstrap.tracing.Tracer.run", side_effect=run) as mocked:
+            runner.compile_requirements()
+        self.assertEqual(compiled[:2], ["base", "common"])
+        self.assertEqual(compiled[-1], "local")
+        local_args = mocked.call_args_list[-1].args[0]
+        self.assertIn(f"--constraint={requirements_path / 'test.txt'}", local_args)
+
+    def test_compile_requirements_wheelhouse(self):
+        """Test resolving from a wheelhouse, reusing its valid lock files."""
+        wheelhouse_path = self.output_dir / "wheelhouse"
+        (wheelhouse_path / "locks").mkdir(parents=True)
+        runner = self.get_runner(wheelhouse=wheelhouse_path)
+        requirements_path = runner.staging_dir / "requirements"
+        requirements_path.mkdir(parents=True)
+        (requirements_path / "base.in").write_text("django~=5.0.0\n")
+        (requirements_path / "test.in").write_text("coverage\n")
+        graph = runner.get_requirements_graph(requirements_path)
+        lock_path = get_lock_path(
+            wheelhouse_path, get_lock_key(requirements_path, graph, "base")
+        )
+        lock_path.write_text("django==5.0.1\n")
+        (wheelhouse_path / "Django-5.0.1-py3-none-any.whl").touch()
+        with mock.patch("bootstrap.tracing.Tracer.run") as mocked:
+            runner.compile_requirements()
+        self.assertEqual(
+            (requirements_path / "base.txt").read_text(), "django==5.0.1\n"
+        )
+        test_args = mocked.call_args.args[0]
+        self.assertEqual(test_args[-1], requirements_path / "test.in")
+        self.assertIn("--no-index", test_args)
+        self.assertIn("--no-emit-find-links", test_args)
+
+    def test_terraform_plugin_cache(self):
+        """Test Terraform providers are installed once from the filesystem mirror."""
+        bin_dir = self.output_dir / "bin"
+        bin_dir.mkdir(parents=True)
+        (terraform_stub := bin_dir / "terraform").write_text(TERRAFORM_STUB)
+        terraform_stub.chmod(0o755)
+        (mirror_dir := self.output_dir / "mirror").mkdir()
+        (mirror_dir / "provider").write_bytes(b"provider")
+        plugin_cache_dir = self.output_dir / "plugin-cache"
+        for run_id in ("1", "2"):
+            runner = self.get_runner(
+                logs_dir=self.output_dir / ".logs" / run_id,
+                terraform_dir=self.output_dir / ".terraform" / run_id,
+                terraform_plugin_cache_dir=plugin_cache_dir,
+                terraform_provider_mirror=mirror_dir,
+            )
+            runner.write_terraform_cli_config()
+            with mock.patch.dict(
+                os.environ, PATH=f"{bin_dir.resolve()}:{os.environ['PATH']}"
+            ):
+                runner.run_terraform("terraform-cloud", {})
+                runner.run_terraform("vault", {})
+        cached_provider = plugin_cache_dir / "provider"
+        self.assertTrue(cached_provider.samefile(mirror_dir / "provider"))
+        self.assertEqual(cached_provider.stat().st_nlink, 2)
+
+    def test_run_terraform_init_lock(self):
+        """Test a Terraform module is initialized by one batch runner at a time."""
+        runner = self.get_runner()
+        with mock.patch.object(
+            runner,
+            "run_terraform_init",
+            side_effect=lambda *args: self.assertTrue(
+                TERRAFORM_INIT_LOCKS["vault"].locked()
+            ),
+        ) as mocked_init, mock.patch.object(runner, "run_terraform_apply"):
+            runner.run_terraform("vault", {})
+        mocked_init.assert_called_once()
+        self.assertFalse(TERRAFORM_INIT_LOCKS["vault"].locked())
+
+    def test_run_terraform_streaming(self):
+        """Test Terraform events are logged and their progress echoed."""
+        bin_dir = self.output_dir / "bin"
+        bin_dir.mkdir(parents=True)
+        (terraform_stub := bin_dir / "terraform").write_text(TERRAFORM_JSON_STUB)
+        terraform_stub.chmod(0o755)
+        runner = self.get_runner(terraform_log_level="DEBUG")
+        runner.write_terraform_cli_config()
+        with mock.patch.dict(
+            os.environ, PATH=f"{bin_dir.resolve()}:{os.environ['PATH']}"
+        ), mock.patch("bootstrap.runner.click.echo") as mocked_echo:
+            for _ in range(2):
+                with self.assertRaises(BootstrapError):
+                    runner.run_terraform("vault", {})
+        messages = [click.unstyle(i.args[0]) for i in mocked_echo.call_args_list]
+        self.assertIn("\tvault: null.x: Created", messages)
+        self.assertIn("\tvault: Error: failed", messages)
+        self.assertNotIn("\tvault: null.x: Creating", messages)
+        logs_dir = runner.logs_dir / "backend" / "terraform" / "vault"
+        self.assertEqual(
+            len((logs_dir / "apply-stdout.log").read_text().splitlines()), 3
+        )
+        self.assertEqual((logs_dir / "apply.log").read_text(), "init\n")
+        self.assertTrue((logs_dir / "apply.log.1.gz").exists())
+
+    def test_init_service_render_cache(self):
+        """Test the service is rendered once per template and context."""
+
+        def cookiecutter(template, extra_context, output_dir, no_input):
+            service_dir = Path(output_dir) / extra_context["project_dirname"]
+            (service_dir / "scripts").mkdir(parents=True)
+            (service_dir / "scripts" / "run.sh").write_text(
+                extra_context["project_name"]
+            )
+            (service_dir / "scripts" / "run.sh").chmod(0o755)
+
+        # the service is rendered in the test process
+        with mock.patch(
+            "cookiecutter.main.cookiecutter", side_effect=cookiecutter
+        ) as mocked_cookiecutter, mock.patch(
+            "bootstrap.runner.render_service", side_effect=render
+        ):
+            staging_dirs = []
+            for output_dirname in ("first", "second", "third"):
+                runner = self.get_runner(
+                    output_dir=(output_dir := self.output_dir / output_dirname),
+                    project_name=output_dirname == "third" and "Other" or "Test",
+                    service_dir=output_dir / "backend",
+                )
+                runner.init_service()
+                staging_dirs.append(runner.staging_dir)
+        self.assertEqual(mocked_cookiecutter.call_count, 2)
+        cached_script = staging_dirs[1] / "scripts" / "run.sh"
+        self.assertEqual(cached_script.read_text(), "Test")
+        self.assertEqual(cached_script.stat().st_mode & 0o777, 0o755)
+
+    def test_echo_prefix(self):
+        """Test the output lines are prefixed, e.g. in batch mode."""
+        runner = self.get_runner(output_prefix="backend | ")
+        with mock.patch("bootstrap.runner.click.echo") as mocked_echo:
+            runner.echo_stream(["1 file reformatted\n", "done\n"])
+        self.assertEqual(
+            [i.args[0] for i in mocked_echo.call_args_list],
+            ["backend | 1 file reformatted", "backend | done"],
+        )
+        with mock.patch("bootstrap.runner.click.echo") as mocked_echo:
+            runner.echo("a\nb")
+        mocked_echo.assert_called_once_with("backend | a\nbackend | b")
+
+    def test_post_process_files(self):
+        """Test replacing the placeholders and changing the owner in one pass."""
+        runner = self.get_runner(uid=1000)
+        (runner.staging_dir / "scripts").mkdir(parents=True)
+        (runner.staging_dir / ".env_template").write_text("SECRET_KEY=__SECRETKEY__")
+        (script_path := runner.staging_dir / "scripts" / "run.sh").write_text("__A__")
+        script_path.chmod(0o755)
+        (runner.staging_dir / "link").symlink_to("missing")
+        runner.create_env_file()
+        runner.make_sed("scripts/run.sh", "__A__", "__AB__")
+        runner.register_placeholder("__AB__", "b", "scripts/run.sh")
+        with mock.patch("bootstrap.runner.os.lchown") as mocked_lchown:
+            runner.post_process_files()
+        self.assertEqual(mocked_lchown.call_count, 6)
+        mocked_lchown.assert_called_with(mock.ANY, 1000, -1)
+        env_text = (runner.staging_dir / ".env").read_text()
+        self.assertNotIn("__SECRETKEY__", env_text)
+        self.assertEqual(len(env_text), len("SECRET_KEY=") + 54)
+        self.assertEqual(script_path.read_text(), "__AB__")
+        self.assertEqual(script_path.stat().st_mode & 0o777, 0o755)
+
+    def test_swap_service_dir(self):
+        """Test the service directory is replaced, deleting the old one after."""
+        runner = self.get_runner()
+        (runner.service_dir / "old").mkdir(parents=True)
+        (runner.service_dir / "old" / "file.txt").write_text("old")
+        (runner.service_dir / "link").symlink_to(runner.service_dir / "old")
+        runner.staging_dir.mkdir(parents=True)
+        (runner.staging_dir / "file.txt").write_text("new")
+        runner.swap_service_dir()
+        self.assertEqual((runner.service_dir / "file.txt").read_text(), "new")
+        log_path = runner.logs_dir / runner.service_slug / "deletion.log"
+        # the deletion is left running in a detached process
+        for _ in range(100):
+            if log_path.exists() and "Deleted" in log_path.read_text():
+                break
+            sleep(0.1)
+        self.assertEqual(log_path.read_text(), "Deleted 4 files\n")
+        self.assertFalse(runner.staging_dir.parent.exists())
+        self.assertEqual(os.listdir(runner.service_dir), ["file.txt"])
+
+    def test_swap_service_dir_new(self):
+        """Test the staged service directory is moved, with nothing to delete."""
+        runner = self.get_runner()
+        runner.staging_dir.mkdir(parents=True)
+        runner.swap_service_dir()
+        self.assertTrue(runner.service_dir.is_dir())
+        self.assertFalse(runner.staging_dir.parent.exists())
+        self.assertFalse((runner.logs_dir / runner.service_slug).exists())
+
+    def test_get_terraform_outputs(self):
+        """Test reading the Terraform outputs from the local state, once."""
+        runner = self.get_runner()
+        cwd, _logs_dir, terraform_dir, env = runner.get_terraform_module_params(
+            "vault", {}
+        )
+        terraform_dir.mkdir(parents=True)
+        (state_path := terraform_dir / "terraform.tfstate").write_text(
+            '{"version": 4, "outputs": {"url": {"value": "https://a.b"}, '
+            '"port": {"value": 80}, "enabled": {"value": true}}}'
+        )
+        with mock.patch.object(runner.tracer, "run") as mocked_run:
+            outputs = runner.get_terraform_outputs(
+                "vault", cwd, env, state_path, ["url", "port", "enabled", "missing"]
+            )
+            state_path.unlink()
+            runner.get_terraform_outputs("vault", cwd, env, state_path, ["url"])
+        mocked_run.assert_not_called()
+        self.assertEqual(
+            outputs,
+            {"enabled": "true", "missing": "", "port": "80", "url": "https://a.b"},
+        )
+
+    def test_get_terraform_outputs_remote(self):
+        """Test reading the Terraform outputs of a remote state."""
+        runner = self.get_runner()
+        cwd, _logs_dir, terraform_dir, env = runner.get_terraform_module_params(
+            "vault", {}
+        )
+        with mock.patch.object(runner.tracer, "run") as mocked_run:
+            mocked_run.return_value.stdout = '{"url": {"value": "https://a.b"}}'
+            outputs = runner.get_terraform_outputs(
+                "vault", cwd, env, terraform_dir / "terraform.tfstate", ["url"]
+            )
+        mocked_run.assert_called_once()
+        self.assertEqual(mocked_run.call_args.args[0], ["terraform", "output", "-json"])
+        self.assertEqual(outputs, {"url": "https://a.b"})
+
+    def test_run_resume(self):
+        """Test resuming a run skips the steps completed with the same inputs."""
+        runner = self.get_runner(project_url_dev="https://dev.test.com")
+        runner.init_service = mock.MagicMock()
+        runner.create_env_file = mock.MagicMock()
+        runner.format_files = mock.MagicMock()
+        runner.compile_requirements = mock.MagicMock(side_effect=BootstrapError)
+        with self.assertRaises(BootstrapError):
+            runner.run()
+        resumed_runner = self.get_runner(
+            project_url_dev="https://dev.test.com", resume_run_id=runner.run_id
+        )
+        for step_name in (
+            "init_service",
+            "create_env_file",
+            "format_files",
+            "compile_requirements",
+            "create_static_directory",
+            "init_terraform_modules",
+            "post_process_files",
+            "swap_service_dir",
+        ):
+            setattr(resumed_runner, step_name, mock.MagicMock())
+        resumed_runner.run()
+        resumed_runner.init_service.assert_not_called()
+        resumed_runner.create_env_file.assert_not_called()
+        resumed_runner.format_files.assert_not_called()
+        resumed_runner.compile_requirements.assert_called_once()
+        resumed_runner.create_static_directory.assert_called_once()
+
+    def test_run_resume_changed_inputs(self):
+        """Test resuming a run from the first step whose inputs changed."""
+        runner = self.get_runner(project_url_dev="https://dev.test.com")
+        runner.init_service = mock.MagicMock()
+        runner.create_env_file = mock.MagicMock(side_effect=BootstrapError)
+        with self.assertRaises(BootstrapError):
+            runner.run()
+        resumed_runner = self.get_runner(
+            project_url_dev="https://dev.changed.com", resume_run_id=runner.run_id
+        )
+        resumed_runner.init_service = mock.MagicMock(side_effect=BootstrapError)
+        with self.assertRaises(BootstrapError):
+            resumed_runner.run()
+        resumed_runner.init_service.assert_called_once()
+
+    def test_run_resume_terraform(self):
+        """Test resuming a run skips the completed Terraform modules, if kept."""
+        runner = self.get_runner(
+            gitlab_namespace_path="namespace", keep_on_failure=True
+        )
+
+        def run_terraform_command(command, cwd, env, logs_dir, *args):
+            if (command, cwd.name) == ("apply", "gitlab"):
+                raise BootstrapError
+
+        with mock.patch.object(
+            runner, "run_terraform_command", side_effect=run_terraform_command
+        ) as mocked_command, self.assertRaises(BootstrapError):
+            runner.init_terraform_modules()
+        self.assertEqual(
+            sorted((i.args[0], i.args[1].name) for i in mocked_command.call_args_list),
+            [
+                ("apply", "gitlab"),
+                ("apply", "terraform-cloud"),
+                ("destroy", "gitlab"),
+                ("init", "gitlab"),
+                ("init", "terraform-cloud"),
+            ],
+        )
+        resumed_runner = self.get_runner(
+            gitlab_namespace_path="namespace",
+            keep_on_failure=True,
+            resume_run_id=runner.run_id,
+        )
+        with mock.patch.object(
+            resumed_runner, "run_terraform_command"
+        ) as mocked_command:
+            resumed_runner.init_terraform_modules()
+        self.assertEqual(
+            [(i.args[0], i.args[1].name) for i in mocked_command.call_args_list],
+            [("init", "gitlab"), ("apply", "gitlab")],
+        )
+
+    def test_run_resume_terraform_changed_inputs(self):
+        """Test a Terraform module rerun with changed inputs is destroyed on failure."""
+        runner = self.get_runner(
+            terraform_backend="gitlab", vault_url="https://vault.test.com"
+        )
+        with mock.patch.object(runner, "run_terraform_command"):
+            runner.init_terraform_modules()
+        resumed_runner = self.get_runner(
+            resume_run_id=runner.run_id,
+            terraform_backend="gitlab",
+            vault_url="https://vault.changed.com",
+        )
+
+        def run_terraform_command(command, cwd, env, logs_dir, *args):
+            if command == "apply":
+                raise BootstrapError
+
+        with mock.patch.object(
+            resumed_runner, "run_terraform_command", side_effect=run_terraform_command
+        ) as mocked_command, self.assertRaises(BootstrapError):
+            resumed_runner.init_terraform_modules()
+        self.assertEqual(
+            [(i.args[0], i.args[1].name) for i in mocked_command.call_args_list],
+            [("init", "vault"), ("apply", "vault"), ("destroy", "vault")],
+        )
+        self.assertEqual(resumed_runner.manifest.steps, {})
+
+    def test_compile_requirements_shared_locks(self):
+        """Test identical requirements files are compiled once by batch runners."""
+        requirements_locks = {}
+        runners = [
+            self.get_runner(
+                requirements_locks=requirements_locks,
+                service_dir=self.output_dir / service_slug,
+                service_slug=service_slug,
+            )
+            for service_slug in ("backend", "worker")
+        ]
+        for runner in runners:
+            requirements_path = runner.staging_dir / "requirements"
+            requirements_path.mkdir(parents=True)
+            (requirements_path / "base.in").write_text("django~=5.0.0\n")
+
+        def run(args, **kwargs):
+            Path(args[-2]).write_text("django==5.0.1\n")
+
+        with mock.patch("bootstrap.tracing.Tracer.run", side_effect=run) as mocked:
+            [runner.compile_requirements() for runner in runners]
+        mocked.assert_called_once()
+        self.assertEqual(
+            (runners[1].staging_dir / "requirements" / "base.txt").read_text(),
+            "django==5.0.1\n",
+        )
+
+    def test_run_resume_completed(self):
+        """Test resuming a completed run skips all the steps."""
+        runner = self.get_runner(terraform_backend="gitlab")
+        for step_name in (
+            "create_env_file",
+            "format_files",
+            "compile_requirements",
+            "create_static_directory",
+            "post_process_files",
+        ):
+            setattr(runner, step_name, mock.MagicMock())
+        runner.init_service = mock.MagicMock(
+            side_effect=lambda: runner.staging_dir.mkdir(parents=True)
+        )
+        runner.run()
+        resumed_runner = self.get_runner(
+            resume_run_id=runner.run_id, terraform_backend="gitlab"
+        )
+        resumed_runner.init_service = mock.MagicMock()
+        resumed_runner.run()
+        resumed_runner.init_service.assert_not_called()
+        self.assertTrue(resumed_runner.service_dir.is_dir())
+
+    def test_run_resume_hint(self):
+        """Test the resume hint is shown only keeping the completed modules."""
+        for keep_on_failure in (False, True):
+            with self.subTest(keep_on_failure=keep_on_failure):
+                runner = self.get_runner(keep_on_failure=keep_on_failure)
+                runner.init_service = mock.MagicMock(side_effect=BootstrapError)
+                with mock.patch(
+                    "bootstrap.runner.click.echo"
+                ) as mocked_echo, self.assertRaises(BootstrapError):
+                    runner.run()
+                self.assertEqual(
+                    any("--resume=" in i.args[0] for i in mocked_echo.call_args_list),
+                    keep_on_failure,
+                )
+
+    def test_run_trace(self):
+        """Test the run trace is written, even when the run fails."""
+        runner = self.get_runner(trace=True)
+        runner.init_service = mock.MagicMock()
+        runner.create_env_file = mock.MagicMock(side_effect=BootstrapError)
+        with self.assertRaises(BootstrapError):
+            runner.run()
+        trace_path = runner.logs_dir / "backend" / "trace.json"
+        self.assertIn('"name": "create_env_file"', trace_path.read_text())
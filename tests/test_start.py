@@ -0,0 +1,67 @@
+"""Bootstrap CLI tests."""
+
+import subprocess  # nosec B404
+import sys
+from unittest import TestCase
+
+# the modules only needed after the CLI options are parsed
+DEFERRED_MODULES = {
+    "bootstrap.collector",
+    "bootstrap.runner",
+    "cookiecutter",
+    "pydantic",
+    "slugify",
+    "validators",
+}
+
+# the maximum cumulative import time of the CLI modules, in microseconds, generous
+# enough not to depend on the machine, but exceeded importing a deferred module
+IMPORT_TIME_BUDGET = 200_000
+
+# runs the CLI, then prints the names of the imported modules to the stderr
+CLI_MODULES_SCRIPT = """
+import sys
+
+from start import main
+
+main(sys.argv[1:], standalone_mode=False)
+print("\\n".join(sys.modules), file=sys.stderr)
+"""
+
+
+class TestBootstrapCLI(TestCase):
+    """Test the bootstrap CLI."""
+
+    def get_imported_modules(self, *args):
+        """Return the names and the CLI import times of the modules imported."""
+        process = subprocess.run(  # nosec B603
+            [sys.executable, "-X", "importtime", "-c", CLI_MODULES_SCRIPT, *args],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        imported_modules, import_times = [], {}
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:"):
+                imported_modules.append(line)
+            elif (name := line.rpartition("|")[2].strip()) == "start" or (
+                name.startswith("bootstrap.")
+            ):
+                import_times[name] = int(line.split("|")[1])
+        return imported_modules, import_times
+
+    def test_help(self):
+        """Test showing the help imports no deferred module, within budget."""
+        imported_modules, import_times = self.get_imported_modules("--help")
+        self.assertIn("start", imported_modules)
+        self.assertEqual(
+            [
+                name
+                for name in imported_modules
+                if name in DEFERRED_MODULES
+                or name.partition(".")[0] in DEFERRED_MODULES
+            ],
+            [],
+        )
+        self.assertIn("start", import_times)
+        self.assertLess(sum(import_times.values()), IMPORT_TIME_BUDGET)
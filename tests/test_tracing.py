@@ -0,0 +1,75 @@
+"""Bootstrap tracing tests."""
+
+import json
+import subprocess  # nosec B404
+from pathlib import Path
+from shutil import rmtree
+from unittest import TestCase
+
+from bootstrap.tracing import Tracer
+
+
+class TestBootstrapTracer(TestCase):
+    """Test the tracer."""
+
+    maxDiff = None
+
+    def setUp(self):
+        """Set up the test data."""
+        self.output_dir = Path("./tests/test_files")
+        rmtree(self.output_dir, ignore_errors=True)
+        return super().setUp()
+
+    def tearDown(self):
+        """Cleanup after each test."""
+        rmtree(self.output_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def test_span(self):
+        """Test tracing a block of code, even when it fails."""
+        tracer = Tracer(enabled=True)
+        with self.assertRaises(ValueError):
+            with tracer.span("failing_step"):
+                raise ValueError
+        self.assertEqual(
+            [(i["name"], i["cat"]) for i in tracer.spans], [("failing_step", "step")]
+        )
+        self.assertGreaterEqual(tracer.spans[0]["duration"], 0)
+
+    def test_disabled(self):
+        """Test a disabled tracer records nothing."""
+        tracer = Tracer()
+        with tracer.span("step"):
+            tracer.run(["true"])
+        self.assertEqual(tracer.spans, [])
+
+    def test_run(self):
+        """Test tracing a subprocess resources usage."""
+        tracer = Tracer(enabled=True)
+        process = tracer.run(
+            ["python3", "-c", "print('traced'); exit(3)"],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.assertEqual((process.returncode, process.stdout), (3, "traced\n"))
+        (span,) = tracer.spans
+        self.assertEqual((span["name"], span["cat"]), ("python3 -c", "subprocess"))
+        self.assertEqual(span["args"]["returncode"], 3)
+        self.assertGreater(span["args"]["max_rss_kb"], 0)
+        self.assertGreater(span["args"]["cpu_user"] + span["args"]["cpu_system"], 0)
+
+    def test_write(self):
+        """Test writing the Chrome trace and its summary."""
+        tracer = Tracer(enabled=True)
+        for _ in range(2):
+            with tracer.span("step"):
+                tracer.run(["true"], name="noop")
+        tracer.write(self.output_dir)
+        trace = json.loads((self.output_dir / "trace.json").read_text())
+        self.assertEqual(
+            [(i["name"], i["ph"]) for i in trace["traceEvents"]],
+            [("noop", "X"), ("step", "X")] * 2,
+        )
+        summary = (self.output_dir / "trace-summary.txt").read_text().splitlines()
+        self.assertEqual(len(summary), 3)
+        self.assertEqual(summary[1].split()[:2], ["step", "2"])
@@ -0,0 +1,131 @@
+"""Deploy Vault script tests."""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, mock
+
+from tests.utils import load_deploy_script
+
+SECRETS = {
+    "/v1/project/envs/dev/email": {"data": {"email_url": "smtp://a", "x": {"a": 1}}},
+    "/v1/project/envs/dev/s3": {"data": {"s3_region": "fra1", "x": {"b": 2}}},
+    "/v1/project/envs/dev/backend/extra": {"data": {"email_url": "smtp://b"}},
+    "/v1/project-tfc/creds/default": {"data": {"token": "tfc-token"}},
+}
+
+
+class VaultHandler(BaseHTTPRequestHandler):
+    """A stub Vault HTTP API request handler."""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, status, data):
+        """Send the given JSON response."""
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        """Respond to the login requests."""
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/v1/auth/gitlab-jwt/login" and body["jwt"] == "jwt":
+            self.send_json(200, {"auth": {"client_token": "vault-token"}})
+        else:
+            self.send_json(403, {"errors": ["permission denied"]})
+
+    def do_GET(self):
+        """Respond to the secrets requests."""
+        self.server.requests.append(self.path)
+        if self.headers["X-Vault-Token"] != "vault-token":
+            self.send_json(403, {"errors": ["permission denied"]})
+        elif self.path in SECRETS:
+            self.send_json(200, SECRETS[self.path])
+        else:
+            self.send_json(404, {"errors": []})
+
+    def log_message(self, *args):
+        """Skip logging the requests."""
+
+
+class TestBootstrapVaultScript(TestCase):
+    """Test the deploy Vault script."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the script module."""
+        cls.vault = load_deploy_script("vault")
+        return super().setUpClass()
+
+    def setUp(self):
+        """Start the stub Vault server."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), VaultHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.vault_url = f"http://127.0.0.1:{self.server.server_port}/"
+        self.tmp_dir = TemporaryDirectory()
+        return super().setUp()
+
+    def tearDown(self):
+        """Stop the stub Vault server."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_deep_merge(self):
+        """Test merging nested dicts, the source values taking precedence."""
+        self.assertEqual(
+            self.vault.deep_merge({"a": {"b": 1, "c": 2}, "d": 3}, {"a": {"b": 4}}),
+            {"a": {"b": 4, "c": 2}, "d": 3},
+        )
+
+    def test_main(self):
+        """Test writing the merged secrets and printing the Terraform Cloud token."""
+        close = self.vault.VaultClient.close
+        with mock.patch.dict(
+            os.environ,
+            PROJECT_SLUG="project",
+            TERRAFORM_BACKEND="terraform-cloud",
+            TERRAFORM_VARS_DIR=self.tmp_dir.name,
+            VAULT_ADDR=self.vault_url,
+            VAULT_ID_TOKEN="jwt",
+            VAULT_ROLE="role",
+            VAULT_SECRETS="email missing s3 backend/extra",
+            VAULT_SECRETS_PREFIX="envs/dev",
+        ), mock.patch("builtins.print") as mocked_print, mock.patch.object(
+            self.vault.VaultClient, "close", autospec=True, side_effect=close
+        ) as mocked_close:
+            self.vault.main()
+        mocked_print.assert_called_once_with("tfc-token")
+        self.assertEqual(
+            json.loads(
+                (Path(self.tmp_dir.name) / "vault-secrets.tfvars.json").read_text()
+            ),
+            {"email_url": "smtp://b", "s3_region": "fra1", "x": {"a": 1, "b": 2}},
+        )
+        self.assertEqual(len(self.server.requests), 5)
+        mocked_close.assert_called_once()
+
+    def test_login_failed(self):
+        """Test a failed login exits."""
+        client = self.vault.VaultClient(self.vault_url)
+        self.addCleanup(client.close)
+        with self.assertRaises(SystemExit) as context:
+            client.login("role", "wrong")
+        self.assertEqual(context.exception.code, "Vault login failed (403).")
+
+    def test_close(self):
+        """Test the connections of all the threads are closed."""
+        client = self.vault.VaultClient(self.vault_url, "vault-token")
+        self.vault.fetch_secrets(client, ["project/envs/dev/email"] * 4, 2)
+        connections = list(client.connections)
+        self.assertTrue(connections)
+        client.close()
+        self.assertEqual(client.connections, [])
+        self.assertFalse([i for i in connections if i.sock is not None])
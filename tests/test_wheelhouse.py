@@ -0,0 +1,82 @@
+"""Bootstrap requirements wheelhouse tests."""
+
+from pathlib import Path
+from shutil import rmtree
+from unittest import TestCase, mock
+
+from bootstrap.wheelhouse import (
+    fill_wheelhouse,
+    get_valid_lock,
+    get_wheelhouse_distributions,
+    get_wheelhouse_index_args,
+)
+
+LOCK_TEXT = """django==5.0.1 \\
+    --hash=sha256:abc
+django-configurations[cache]==2.5 \\
+    --hash=sha256:def
+"""
+
+
+class TestBootstrapWheelhouse(TestCase):
+    """Test the requirements wheelhouse."""
+
+    def setUp(self):
+        """Set up the test data."""
+        self.output_dir = Path("./tests/test_files")
+        rmtree(self.output_dir, ignore_errors=True)
+        self.wheelhouse_path = self.output_dir / "wheelhouse"
+        self.wheelhouse_path.mkdir(parents=True)
+        self.requirements_path = self.output_dir / "requirements"
+        self.requirements_path.mkdir()
+        (self.requirements_path / "base.in").write_text("django~=5.0.0\n")
+        (self.requirements_path / "common.in").write_text("-r base.in\n")
+        (self.requirements_path / "common.txt").write_text(LOCK_TEXT)
+        self.graph = {"base": set(), "common": {"base"}}
+        return super().setUp()
+
+    def tearDown(self):
+        """Cleanup after each test."""
+        rmtree(self.output_dir, ignore_errors=True)
+        return super().tearDown()
+
+    def test_get_wheelhouse_index_args(self):
+        """Test resolving from a flat wheelhouse or a simple index."""
+        self.assertEqual(
+            get_wheelhouse_index_args(self.wheelhouse_path),
+            ["--no-index", f"--find-links={self.wheelhouse_path.resolve()}"],
+        )
+        (self.wheelhouse_path / "simple").mkdir()
+        (self.wheelhouse_path / "simple" / "index.html").touch()
+        self.assertEqual(
+            get_wheelhouse_index_args(self.wheelhouse_path),
+            [f"--index-url={(self.wheelhouse_path / 'simple').resolve().as_uri()}"],
+        )
+
+    def test_get_wheelhouse_distributions(self):
+        """Test listing the wheels and source distributions of the wheelhouse."""
+        (self.wheelhouse_path / "Django-5.0.1-py3-none-any.whl").touch()
+        (self.wheelhouse_path / "django-configurations-2.5.tar.gz").touch()
+        (self.wheelhouse_path / "README").touch()
+        self.assertEqual(
+            get_wheelhouse_distributions(self.wheelhouse_path),
+            {("django", "5.0.1"), ("django-configurations", "2.5")},
+        )
+
+    def test_fill_wheelhouse(self):
+        """Test filling the wheelhouse stores locks valid until their inputs change."""
+        with mock.patch("bootstrap.wheelhouse.subprocess.run") as mocked_run:
+            filled = list(
+                fill_wheelhouse(
+                    self.wheelhouse_path, self.requirements_path, self.graph
+                )
+            )
+        self.assertEqual(filled, [self.requirements_path / "common.txt"])
+        mocked_run.assert_called_once()
+        args = (self.wheelhouse_path, self.requirements_path, self.graph, "common")
+        self.assertIsNone(get_valid_lock(*args))
+        (self.wheelhouse_path / "Django-5.0.1-py3-none-any.whl").touch()
+        (self.wheelhouse_path / "django_configurations-2.5-py3-none-any.whl").touch()
+        self.assertEqual(get_valid_lock(*args), LOCK_TEXT)
+        (self.requirements_path / "base.in").write_text("django~=5.1.0\n")
+        self.assertIsNone(get_valid_lock(*args))
@@ -1,9 +1,18 @@
 """Test utils for the project."""
 
 from contextlib import contextmanager
+from importlib.util import module_from_spec, spec_from_file_location
 from io import StringIO
+from pathlib import Path
 from unittest import mock
 
+DEPLOY_SCRIPTS_PATH = (
+    Path(__file__).parent.parent
+    / "{{cookiecutter.project_dirname}}"
+    / "scripts"
+    / "deploy"
+)
+
 
 @contextmanager
 def mock_input(*cmds):
@@ -14,3 +23,11 @@ def mock_input(*cmds):
         "getpass.getpass", side_effect=hidden_cmds
     ):
         yield
+
+
+def load_deploy_script(name):
+    """Load the given template deploy script as a module."""
+    spec = spec_from_file_location(name, DEPLOY_SCRIPTS_PATH / f"{name}.py")
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""Fill a requirements wheelhouse from the lock files of bootstrapped services."""
+
+import subprocess  # nosec B404
+from pathlib import Path
+
+import click
+
+from bootstrap.helpers import get_requirements_graph
+from bootstrap.wheelhouse import fill_wheelhouse
+
+
+@click.command()
+@click.option(
+    "--wheelhouse",
+    required=True,
+    type=click.Path(file_okay=False, path_type=Path, writable=True),
+)
+@click.argument(
+    "requirements_dirs",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, file_okay=False, path_type=Path, readable=True),
+)
+def main(wheelhouse, requirements_dirs):
+    """Download the locked distributions of the given requirements directories."""
+    wheelhouse.mkdir(parents=True, exist_ok=True)
+    for requirements_path in requirements_dirs:
+        graph = get_requirements_graph(requirements_path)
+        try:
+            for lock_path in fill_wheelhouse(wheelhouse, requirements_path, graph):
+                click.echo(click.style(f"\t- {lock_path}", dim=True))
+        except subprocess.CalledProcessError as e:
+            raise click.ClickException(f"Downloading {e.cmd[-1]} failed") from e
+
+
+if __name__ == "__main__":
+    main()
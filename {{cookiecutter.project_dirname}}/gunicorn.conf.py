@@ -1,6 +1,8 @@
 """Gunicorn configuration file."""
 
 import os
+from pathlib import Path
+from shutil import rmtree
 
 # Logging
 # https://docs.gunicorn.org/en/stable/settings.html#logging
@@ -26,3 +28,23 @@ worker_class = "{{ cookiecutter.django_settings_dirname }}.workers.UvicornDjango
 # https://docs.gunicorn.org/en/stable/settings.html#worker-tmp-dir
 
 worker_tmp_dir = "/dev/shm"  # nosec B108
+
+# Prometheus multiprocess mode
+# https://prometheus.github.io/client_python/multiprocess/
+
+prometheus_multiproc_dir = Path(worker_tmp_dir) / "prometheus"
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", str(prometheus_multiproc_dir))
+
+
+def on_starting(server):
+    """Reset the metrics files of the previous workers."""
+    rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+def child_exit(server, worker):
+    """Mark the metrics of the exited worker as dead."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark the cache backends reads, and their hit ratio across processes."""
+
+import argparse
+{% if cookiecutter.use_redis == "true" %}import json
+{% endif %}import multiprocessing
+import os
+import random
+import statistics
+from tempfile import TemporaryDirectory
+from time import perf_counter{% if cookiecutter.use_redis == "true" %}, sleep
+from uuid import uuid4{% endif %}
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+{% if cookiecutter.use_redis == "true" %}
+INVALIDATION_POLL_INTERVAL = 0.0001  # seconds
+{% endif %}
+
+def get_caches(directory, max_entries, workers):
+    """Return the benchmarked caches settings."""
+    options = {"OPTIONS": {"MAX_ENTRIES": max_entries}}
+    return {
+        "locmem": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            **options,
+        },
+        # the shared memory cache has the memory of all the workers locmem caches
+        "shm": {
+            "BACKEND": "{{ cookiecutter.django_settings_dirname }}.caches.SharedMemoryCache",
+            "LOCATION": os.path.join(directory, "cache"),
+            "OPTIONS": {"MAX_ENTRIES": max_entries * workers},
+        },{% if cookiecutter.use_redis == "true" %}
+        "redis": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "KEY_PREFIX": f"benchmark-{uuid4().hex}",
+            "LOCATION": os.environ["REDIS_URL"],
+        },
+        "tiered": {
+            "BACKEND": "{{ cookiecutter.django_settings_dirname }}.caches.TieredRedisCache",
+            "KEY_PREFIX": f"benchmark-{uuid4().hex}",
+            "LOCATION": os.environ["REDIS_URL"],
+            **options,
+        },{% endif %}
+    }
+
+
+def measure_reads(cache, reads):
+    """Return the wall times of the given hot key reads."""
+    cache.set("hot", {"value": "x" * 100}, 60)
+    cache.get("hot")  # warm up
+    times = []
+    for _ in range(reads):
+        start_time = perf_counter()
+        cache.get("hot")
+        times.append(perf_counter() - start_time)
+    return times
+
+
+def count_hits(alias, requests, keys, seed):
+    """Return the hits of the given requests, caching the missed keys."""
+    cache = caches[alias]
+    # the keys popularity follows a Zipf distribution, like the real traffic
+    weights = [1 / (i + 1) for i in range(keys)]
+    generator = random.Random(seed)  # nosec B311
+    hits = 0
+    for key in generator.choices(range(keys), weights, k=requests):
+        if cache.get(f"key-{key}") is None:
+            cache.set(f"key-{key}", {"value": "x" * 100})
+        else:
+            hits += 1
+    return hits
+
+
+def measure_hit_ratio(alias, workers, requests, keys):
+    """Return the hit ratio of the given requests, split between the workers."""
+    # the workers are forked like the gunicorn ones, each with its own locmem
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        hits = pool.starmap(
+            count_hits,
+            [(alias, requests // workers, keys, seed) for seed in range(workers)],
+        )
+    return sum(hits) / (requests // workers * workers){% if cookiecutter.use_redis == "true" %}
+
+
+def measure_invalidations(cache, invalidations):
+    """Return the delays of the invalidations published by other processes."""
+    from {{ cookiecutter.django_settings_dirname }}.caches import INVALIDATIONS_CHANNEL
+
+    client = cache._cache.get_client(write=True)
+    tier = cache._cache._tier
+    while not tier.subscribed:
+        sleep(INVALIDATION_POLL_INTERVAL)
+    delays = []
+    for _ in range(invalidations):
+        generation = tier.generation
+        message = json.dumps({"sender": "benchmark", "keys": [cache.make_key("hot")]})
+        start_time = perf_counter()
+        client.publish(INVALIDATIONS_CHANNEL, message)
+        while tier.generation == generation:
+            sleep(INVALIDATION_POLL_INTERVAL)
+        delays.append(perf_counter() - start_time)
+    return delays{% endif %}
+
+
+def main():
+    """Print the latency of the hot keys reads, and the hit ratio of the workers."""
+    parser = argparse.ArgumentParser(description=__doc__){% if cookiecutter.use_redis == "true" %}
+    parser.add_argument("--invalidations", type=int, default=200){% endif %}
+    parser.add_argument("--keys", type=int, default=2000)
+    parser.add_argument("--max-entries", type=int, default=300)
+    parser.add_argument("--reads", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=40000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as directory:
+        settings.configure(CACHES=get_caches(directory, args.max_entries, args.workers))
+        django.setup()
+        for alias in settings.CACHES:
+            times = measure_reads(caches[alias], args.reads)
+            ratio = measure_hit_ratio(alias, args.workers, args.requests, args.keys)
+            print(
+                f"{alias}: "
+                f"read mean {statistics.fmean(times) * 1e6:.1f}us, "
+                f"p99 {statistics.quantiles(times, n=100)[-1] * 1e6:.1f}us, "
+                f"hit ratio {ratio:.1%} with {args.workers} workers"
+            ){% if cookiecutter.use_redis == "true" %}
+        delays = measure_invalidations(caches["tiered"], args.invalidations)
+        print(
+            f"tiered invalidation: "
+            f"mean {statistics.fmean(delays) * 1e6:.1f}us, "
+            f"p99 {statistics.quantiles(delays, n=100)[-1] * 1e6:.1f}us"
+        ){% endif %}
+
+
+if __name__ == "__main__":
+    main()
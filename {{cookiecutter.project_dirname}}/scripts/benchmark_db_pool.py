@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Benchmark the database connections of concurrent requests, with and without pool."""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread
+from time import perf_counter
+
+import dj_database_url
+import django
+from django.conf import settings
+from django.db import connections
+
+MONITOR_INTERVAL = 0.01  # seconds
+
+
+def get_databases(database_url, pool_max_size):
+    """Return the monitor, direct and pooled databases settings."""
+    database = dj_database_url.parse(database_url)
+    options = database.get("OPTIONS", {})
+    pool = {"min_size": 1, "max_size": pool_max_size, "timeout": 60}
+    return {
+        alias: {
+            **database,
+            "OPTIONS": {**options, "application_name": f"benchmark-{alias}", **extra},
+        }
+        for alias, extra in (
+            ("default", {}),
+            ("direct", {}),
+            ("pooled", {"pool": pool}),
+        )
+    }
+
+
+def handle_request(alias, query_duration):
+    """Run a query, closing the connection at the end like a Django request."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_sleep(%s)", [query_duration])
+    finally:
+        connection.close()
+
+
+def monitor(alias, stop, counts):
+    """Count the open connections of the given database, until stopped."""
+    connection = connections["default"]
+    with connection.cursor() as cursor:
+        while not stop.wait(MONITOR_INTERVAL):
+            cursor.execute(
+                "SELECT count(*) FROM pg_stat_activity WHERE application_name = %s",
+                [f"benchmark-{alias}"],
+            )
+            counts.append(cursor.fetchone()[0])
+    connection.close()
+
+
+def run(alias, concurrency, requests, query_duration):
+    """Run the requests concurrently, and return the elapsed time and peak count."""
+    stop = Event()
+    counts = [0]
+    monitor_thread = Thread(target=monitor, args=(alias, stop, counts))
+    monitor_thread.start()
+    start_time = perf_counter()
+    try:
+        # each thread has its own connection, like the ASGI sync_to_async threads
+        with ThreadPoolExecutor(concurrency) as executor:
+            futures = [
+                executor.submit(handle_request, alias, query_duration)
+                for _ in range(requests)
+            ]
+            for future in futures:
+                future.result()
+        return perf_counter() - start_time, max(counts)
+    finally:
+        stop.set()
+        monitor_thread.join()
+
+
+def main():
+    """Print the peak connections count of concurrent requests."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pool-max-size", type=int, default=4)
+    parser.add_argument("--query-duration", type=float, default=0.005)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    settings.configure(
+        DATABASES=get_databases(os.environ["DATABASE_URL"], args.pool_max_size)
+    )
+    django.setup()
+    for alias in ("direct", "pooled"):
+        elapsed, peak_count = run(
+            alias, args.concurrency, args.requests, args.query_duration
+        )
+        print(
+            f"{alias}: {args.requests} requests in {elapsed:.2f}s, "
+            f"{args.concurrency} concurrent, peak {peak_count} connections"
+        )
+    stats = connections["pooled"].pool.get_stats()
+    connections["pooled"].close_pool()
+    print(
+        f"pool: {stats.get('requests_queued', 0)} requests queued, "
+        f"{stats.get('requests_wait_ms', 0) / stats['requests_num']:.1f}ms mean wait"
+    )
+
+
+if __name__ == "__main__":
+    main()
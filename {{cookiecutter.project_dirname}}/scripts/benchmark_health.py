@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark the health checks answered by the ASGI router and by Django."""
+
+import argparse
+import asyncio
+import os
+import statistics
+from time import perf_counter, process_time
+
+HOST = "localhost"
+
+os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+os.environ.setdefault("DJANGO_ALLOWED_HOSTS", HOST)
+os.environ.setdefault("DJANGO_CONFIGURATION", "Testing")
+
+
+async def measure(application, path, requests):
+    """Return the wall times and the total CPU time of the given requests."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", HOST.encode())],
+        "client": ("127.0.0.1", 12345),
+        "server": (HOST, 8000),
+    }
+    statuses = []
+    disconnected = asyncio.Event()
+
+    def get_receive():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            # the client stays connected until the response is sent
+            if messages:
+                return messages.pop()
+            await disconnected.wait()
+
+        return receive
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    times = []
+    start_cpu_time = process_time()
+    for _ in range(requests):
+        receive = get_receive()
+        start_time = perf_counter()
+        await application(scope, receive, send)
+        times.append(perf_counter() - start_time)
+    cpu_time = process_time() - start_cpu_time
+    if set(statuses) != {204}:
+        raise SystemExit(f"Unexpected health check statuses {set(statuses)}.")
+    return times, cpu_time
+
+
+def main():
+    """Print the latency and CPU time of the health checks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    from {{ cookiecutter.django_settings_dirname }}.asgi import application
+    from {{ cookiecutter.django_settings_dirname }}.health import HEALTH_PATH
+
+    for name, app in (("django", application.application), ("router", application)):
+        asyncio.run(measure(app, HEALTH_PATH, args.requests // 10))  # warm up
+        times, cpu_time = asyncio.run(measure(app, HEALTH_PATH, args.requests))
+        print(
+            f"{name}: "
+            f"mean {statistics.fmean(times) * 1e6:.1f}us, "
+            f"p99 {statistics.quantiles(times, n=100)[-1] * 1e6:.1f}us, "
+            f"CPU {cpu_time / args.requests * 1e6:.1f}us/request"
+        )
+
+
+if __name__ == "__main__":
+    main()
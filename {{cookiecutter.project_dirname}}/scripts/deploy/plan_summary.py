@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Summarize the resource changes of a Terraform JSON plan, streaming it."""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter, defaultdict
+
+ACTIONS = ("create", "update", "delete")
+
+CHUNK_SIZE = 1 << 16
+
+NON_SPACE = re.compile(r"\S")
+
+SCALAR_END = re.compile(r"[,}\]\s]")
+
+STRING_END = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+# the text up to the next bracket, skipping the strings
+TO_BRACKET = re.compile(
+    r'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*[\[\]{}]', re.DOTALL
+)
+
+
+class PlanScanner:
+    """A JSON plan scanner, keeping only the text of the current value in memory."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        """Initialize the scanner."""
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.mark = None
+
+    def read(self):
+        """Read the next chunk, dropping the scanned text, return False at the end."""
+        if not (chunk := self.stream.read(self.chunk_size)):
+            return False
+        start = self.pos if self.mark is None else self.mark
+        self.buffer = self.buffer[start:] + chunk
+        self.pos -= start
+        self.mark = self.mark and self.mark - start
+        return True
+
+    def match(self, pattern, search=True):
+        """Return the next match of the given pattern, reading more if needed."""
+        find = pattern.search if search else pattern.match
+        while not (match := find(self.buffer, self.pos)):
+            if not self.read():
+                raise ValueError("Unexpected end of the plan.")
+        return match
+
+    def next_char(self):
+        """Move to the next non whitespace character, and return it."""
+        self.pos = self.match(NON_SPACE).start()
+        return self.buffer[self.pos]
+
+    def skip_string(self):
+        """Move past the string starting at the current position."""
+        self.pos = self.match(STRING_END, search=False).end()
+
+    def skip_value(self):
+        """Move past the value starting at the next non whitespace character."""
+        char = self.next_char()
+        self.pos += 1
+        if char == '"':
+            self.skip_string()
+        elif char in "[{":
+            depth = 1
+            while depth:
+                self.pos = self.match(TO_BRACKET, search=False).end()
+                depth += 1 if self.buffer[self.pos - 1] in "[{" else -1
+        else:
+            self.pos = self.match(SCALAR_END).start()
+
+    def expect(self, chars):
+        """Move past the next character, if one of the given ones, and return it."""
+        if (char := self.next_char()) not in chars:
+            raise ValueError(f"Unexpected {char!r} in the plan.")
+        self.pos += 1
+        return char
+
+    def iter_items(self):
+        """Return the keys of the current object, positioned before their values."""
+        self.expect("{")
+        while self.expect('",}') != "}":
+            if self.buffer[self.pos - 1] == ",":
+                self.expect('"')
+            self.mark = self.pos - 1
+            self.skip_string()
+            key = json.loads(self.buffer[self.mark : self.pos])
+            self.mark = None
+            self.expect(":")
+            yield key
+
+    def iter_array(self):
+        """Return the parsed values of the current array, one at a time."""
+        self.expect("[")
+        if self.next_char() == "]":
+            self.pos += 1
+            return
+        while True:
+            self.next_char()
+            self.mark = self.pos
+            self.skip_value()
+            value = json.loads(self.buffer[self.mark : self.pos])
+            self.mark = None
+            yield value
+            if self.expect(",]") == "]":
+                return
+
+    def iter_resource_changes(self):
+        """Return the resource changes of the plan, one at a time."""
+        for key in self.iter_items():
+            if key == "resource_changes":
+                yield from self.iter_array()
+            else:
+                self.skip_value()
+
+
+def summarize(resource_changes, addresses=False):
+    """Return the counts of the given resource changes actions."""
+    counts = Counter()
+    types_counts = defaultdict(Counter)
+    changed = []
+    for resource_change in resource_changes:
+        actions = (resource_change.get("change") or {}).get("actions") or []
+        if actions := [i for i in actions if i in ACTIONS]:
+            counts.update(actions)
+            types_counts[resource_change.get("type")].update(actions)
+            if addresses:
+                changed.append(
+                    {"actions": actions, "address": resource_change.get("address")}
+                )
+    summary = {
+        "counts": {i: counts[i] for i in ACTIONS},
+        "resource_types": {
+            resource_type: {i: type_counts[i] for i in ACTIONS}
+            for resource_type, type_counts in sorted(types_counts.items())
+        },
+    }
+    if addresses:
+        summary["addresses"] = changed
+    return summary
+
+
+def main():
+    """Print the plan actions counts, and write the detailed summary."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--addresses", action="store_true")
+    parser.add_argument("--details", type=argparse.FileType("w"))
+    args = parser.parse_args()
+    summary = summarize(PlanScanner(sys.stdin).iter_resource_changes(), args.addresses)
+    # the counts are printed in the GitLab Terraform report format
+    print(json.dumps(summary["counts"]))
+    if args.details:
+        json.dump(summary, args.details, indent=2)
+
+
+if __name__ == "__main__":
+    main()
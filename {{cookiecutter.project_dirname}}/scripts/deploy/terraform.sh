@@ -8,16 +8,7 @@ fi
 
 plan_cache="plan.cache"
 plan_json="plan.json"
-
-JQ_PLAN='
-  (
-    [.resource_changes[]?.change.actions?] | flatten
-  ) | {
-    "create":(map(select(.=="create")) | length),
-    "update":(map(select(.=="update")) | length),
-    "delete":(map(select(.=="delete")) | length)
-  }
-'
+plan_summary_json="plan-summary.json"
 
 # Use terraform automation mode (will remove some verbose unneeded messages)
 export TF_IN_AUTOMATION=true
@@ -55,8 +46,9 @@ case "${1}" in
   "plan-json")
     init
     terraform plan -input=false -out="${plan_cache}"
+    # the plan is streamed, and summarized by resource type too
     terraform show -json "${plan_cache}" | \
-      jq -r "${JQ_PLAN}" \
+      python3 "${PROJECT_DIR}"/scripts/deploy/plan_summary.py --addresses --details "${plan_summary_json}" \
       > "${plan_json}"
   ;;
   "validate")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Fetch the deployment secrets from Vault as a Terraform variables file."""
+
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from pathlib import Path
+from urllib.parse import urlsplit
+
+MAX_WORKERS = 8
+
+TIMEOUT = 30  # seconds
+
+
+class VaultClient:
+    """A Vault HTTP API client, keeping a connection alive per thread."""
+
+    def __init__(self, url, token=None, timeout=TIMEOUT):
+        """Initialize the client."""
+        url_parts = urlsplit(url)
+        self.connection_class = (
+            HTTPSConnection if url_parts.scheme == "https" else HTTPConnection
+        )
+        self.host = url_parts.netloc
+        self.path = url_parts.path.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def get_connection(self, reset=False):
+        """Return the connection of the current thread."""
+        if reset or not hasattr(self.local, "connection"):
+            self.local.connection = self.connection_class(
+                self.host, timeout=self.timeout
+            )
+            # the connections of all the threads are kept, to be closed at the end
+            with self.lock:
+                self.connections.append(self.local.connection)
+        return self.local.connection
+
+    def close(self):
+        """Close the connections of all the threads."""
+        with self.lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections.clear()
+
+    def request(self, method, path, data=None):
+        """Return the status and the JSON content of the given API request."""
+        body = data is not None and json.dumps(data) or None
+        headers = self.token and {"X-Vault-Token": self.token} or {}
+        for reset in (False, True):
+            connection = self.get_connection(reset)
+            try:
+                connection.request(method, f"{self.path}/v1/{path}", body, headers)
+                response = connection.getresponse()
+                content = response.read()
+            except (HTTPException, OSError):
+                # a kept alive connection may have been closed by the server
+                connection.close()
+                if reset:
+                    raise
+            else:
+                break
+        try:
+            return response.status, json.loads(content or "{}")
+        except ValueError:
+            return response.status, {}
+
+    def login(self, role, jwt):
+        """Authenticate with the given GitLab JWT."""
+        status, content = self.request(
+            "POST", "auth/gitlab-jwt/login", {"jwt": jwt, "role": role}
+        )
+        try:
+            self.token = content["auth"]["client_token"]
+        except (KeyError, TypeError):
+            sys.exit(f"Vault login failed ({status}).")
+
+    def read(self, path):
+        """Return the data of the given secret, or an empty one."""
+        status, content = self.request("GET", path)
+        return status == 200 and content.get("data") or {}
+
+
+def deep_merge(target, source):
+    """Merge the source dict into the target one, recursively."""
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            deep_merge(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+def fetch_secrets(client, paths, max_workers=MAX_WORKERS):
+    """Return the merged data of the given secrets, fetched concurrently."""
+    secrets_data = {}
+    if paths:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+            # the secrets are merged in the given order, later ones taking precedence
+            for secret_data in executor.map(client.read, paths):
+                deep_merge(secrets_data, secret_data)
+    return secrets_data
+
+
+def main():
+    """Write the Vault secrets variables file, and print the Terraform Cloud token."""
+    client = VaultClient(os.environ["VAULT_ADDR"])
+    project_slug = os.environ["PROJECT_SLUG"]
+    secrets_prefix = os.environ.get("VAULT_SECRETS_PREFIX", "")
+    secrets_paths = [
+        "/".join(filter(None, (project_slug, secrets_prefix, secret_path)))
+        for secret_path in os.environ.get("VAULT_SECRETS", "").split()
+    ]
+    vars_path = Path(os.environ["TERRAFORM_VARS_DIR"]) / "vault-secrets.tfvars.json"
+    try:
+        client.login(os.environ["VAULT_ROLE"], os.environ["VAULT_ID_TOKEN"])
+        vars_path.write_text(json.dumps(fetch_secrets(client, secrets_paths)))
+        if os.environ.get("TERRAFORM_BACKEND") == "terraform-cloud":
+            tfc_data = client.read(f"{project_slug}-tfc/creds/default")
+            print(tfc_data.get("token", ""))
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
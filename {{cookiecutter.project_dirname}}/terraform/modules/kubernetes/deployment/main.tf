@@ -18,7 +18,7 @@ locals {
 
   additional_secrets = var.use_redis ? ["database-url", "redis-url"] : ["database-url"]
 
-  cache_url = var.cache_url != "" ? var.cache_url : var.use_redis ? "$(REDIS_URL)?key_prefix=${var.environment_slug}" : ""
+  cache_url = var.cache_url != "" ? var.cache_url : var.use_redis ? "$(REDIS_URL)?key_prefix=${var.environment_slug}{% if cookiecutter.use_redis == "true" %}&lib=tiered{% endif %}" : ""
 
   use_s3 = length(regexall("s3", var.media_storage)) > 0
 }
@@ -116,6 +116,11 @@ resource "kubernetes_deployment_v1" "main" {
     template {
       metadata {
         labels = local.service_labels
+        annotations = {
+          "prometheus.io/scrape" = "true"
+          "prometheus.io/path"   = "/${var.service_slug}/metrics/"
+          "prometheus.io/port"   = var.service_container_port
+        }
       }
       spec {
         dynamic "volume" {
@@ -147,6 +152,28 @@ resource "kubernetes_deployment_v1" "main" {
           port {
             container_port = var.service_container_port
           }
+          liveness_probe {
+            http_get {
+              path = "/${var.service_slug}/health/"
+              port = var.service_container_port
+            }
+            failure_threshold = 3
+            period_seconds    = 10
+          }
+          readiness_probe {
+            http_get {
+              path = "/${var.service_slug}/ready/"
+              port = var.service_container_port
+              # the kubelet sends the pod IP as host, not an allowed one
+              http_header {
+                name  = "Host"
+                value = var.service_slug
+              }
+            }
+            failure_threshold = 2
+            period_seconds    = 5
+            timeout_seconds   = 3
+          }
           dynamic "volume_mount" {
             for_each = toset(var.media_persistent_volume_claim_name != "" ? [1] : [])
 
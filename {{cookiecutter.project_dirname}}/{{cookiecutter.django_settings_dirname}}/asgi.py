@@ -16,4 +16,7 @@ os.environ.setdefault(
 
 from configurations.asgi import get_asgi_application
 
-application = get_asgi_application()
+from {{ cookiecutter.django_settings_dirname }}.health import HealthRouter
+
+# the health checks are answered without going through the Django middleware
+application = HealthRouter(get_asgi_application())
@@ -0,0 +1,612 @@
+"""The cache backends."""
+
+import fcntl
+import hashlib{% if cookiecutter.use_redis == "true" %}
+import json{% endif %}
+import logging
+import mmap
+import os
+import pickle  # nosec B403
+import struct{% if cookiecutter.use_redis == "true" %}
+from collections import OrderedDict{% endif %}
+from contextlib import ExitStack, contextmanager
+from math import ceil, inf
+from threading import {% if cookiecutter.use_redis == "true" %}Event, Lock, Thread{% else %}Lock{% endif %}
+from time import {% if cookiecutter.use_redis == "true" %}monotonic, {% endif %}time{% if cookiecutter.use_redis == "true" %}
+from uuid import uuid4{% endif %}
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache{% if cookiecutter.use_redis == "true" %}
+from django.core.cache.backends.redis import RedisCache, RedisCacheClient{% endif %}
+from django.core.exceptions import ImproperlyConfigured{% if cookiecutter.use_redis == "true" %}
+from prometheus_client import Counter
+from redis.exceptions import RedisError{% endif %}
+
+LOCK_STRIPES = 64
+
+SLOT_HEADER = struct.Struct("<ddQHI")  # expires, accessed, key hash, key/value sizes
+
+SLOT_SIZE = 4096  # bytes
+
+TABLE_HEADER = struct.Struct("<8sIII")  # magic, sets, ways, slot size
+
+TABLE_MAGIC = b"DJSHMC01"
+
+TABLE_OFFSET = mmap.PAGESIZE
+
+WAYS = 8
+
+logger = logging.getLogger(__name__)
+
+_tables = {}
+
+_tables_lock = Lock()
+
+
+class SharedMemoryTable:
+    """A set-associative hash table in a memory-mapped file, shared by processes."""
+
+    def __init__(self, path, sets, slot_size):
+        """Initialize the table, mapping its file."""
+        self.path = path
+        self.pid = os.getpid()
+        self.sets = sets
+        self.slot_size = slot_size
+        self.set_size = WAYS * slot_size
+        self.size = TABLE_OFFSET + sets * self.set_size
+        # the process locks are needed too, the file locks being per process
+        self.locks = [Lock() for _ in range(LOCK_STRIPES)]
+        self.fd = self.open()
+        self.map = mmap.mmap(self.fd, self.size)
+
+    def open(self):
+        """Open the table file, replacing it if missing or with another layout."""
+        header = TABLE_HEADER.pack(TABLE_MAGIC, self.sets, WAYS, self.slot_size)
+        lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            try:
+                fd = os.open(self.path, os.O_RDWR)
+            except FileNotFoundError:
+                pass
+            else:
+                if (
+                    os.pread(fd, TABLE_HEADER.size, 0) == header
+                    and os.fstat(fd).st_size == self.size
+                ):
+                    return fd
+                os.close(fd)
+            # the file is replaced, not resized, not to break the existing mappings
+            temp_path = f"{self.path}.{self.pid}"
+            fd = os.open(temp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.ftruncate(fd, self.size)
+            os.pwrite(fd, header, 0)
+            os.replace(temp_path, self.path)
+            return fd
+        finally:
+            os.close(lock_fd)
+
+    def locate(self, key):
+        """Return the set offset and the hash of the given key."""
+        key_hash = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest())
+        return TABLE_OFFSET + key_hash % self.sets * self.set_size, key_hash
+
+    @contextmanager
+    def lock(self, offset):
+        """Lock the set at the given offset, in the threads and the processes."""
+        with self.locks[offset // self.set_size % LOCK_STRIPES]:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.set_size, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, self.set_size, offset)
+
+    def find(self, offset, key_hash, key):
+        """Return the slot of the given key in the locked set, if not expired."""
+        for slot in range(offset, offset + self.set_size, self.slot_size):
+            expires, _, slot_hash, key_size, _ = SLOT_HEADER.unpack_from(self.map, slot)
+            start = slot + SLOT_HEADER.size
+            if (
+                slot_hash == key_hash
+                and expires
+                and self.map[start : start + key_size] == key
+            ):
+                if expires > time():
+                    return slot
+                self.free(slot)
+                return None
+        return None
+
+    def read(self, offset, key_hash, key):
+        """Return the value and expiration of the given key in the locked set."""
+        if (slot := self.find(offset, key_hash, key)) is None:
+            return None
+        expires, _, _, key_size, value_size = SLOT_HEADER.unpack_from(self.map, slot)
+        # the reads update the access time, the least recently used keys being evicted
+        SLOT_HEADER.pack_into(
+            self.map, slot, expires, time(), key_hash, key_size, value_size
+        )
+        start = slot + SLOT_HEADER.size + key_size
+        return self.map[start : start + value_size], expires
+
+    def write(self, offset, key_hash, key, value, expires):
+        """Write the given key in the locked set, and return whether it fits."""
+        slot = self.find(offset, key_hash, key)
+        if SLOT_HEADER.size + len(key) + len(value) > self.slot_size:
+            if slot is not None:
+                self.free(slot)
+            return False
+        if slot is None:
+            slot = self.evict(offset)
+        SLOT_HEADER.pack_into(
+            self.map, slot, expires, time(), key_hash, len(key), len(value)
+        )
+        start = slot + SLOT_HEADER.size
+        self.map[start : start + len(key) + len(value)] = key + value
+        return True
+
+    def touch(self, offset, key_hash, key, expires):
+        """Set the expiration of the given key in the locked set, if found."""
+        if (slot := self.find(offset, key_hash, key)) is None:
+            return False
+        _, accessed, _, key_size, value_size = SLOT_HEADER.unpack_from(self.map, slot)
+        SLOT_HEADER.pack_into(
+            self.map, slot, expires, accessed, key_hash, key_size, value_size
+        )
+        return True
+
+    def delete(self, offset, key_hash, key):
+        """Delete the given key in the locked set, if found."""
+        if (slot := self.find(offset, key_hash, key)) is None:
+            return False
+        self.free(slot)
+        return True
+
+    def evict(self, offset):
+        """Return an empty or expired slot of the locked set, or the least used."""
+        now = time()
+        slots = {}
+        for slot in range(offset, offset + self.set_size, self.slot_size):
+            expires, accessed, *_ = SLOT_HEADER.unpack_from(self.map, slot)
+            if expires <= now:
+                return slot
+            slots[slot] = accessed
+        return min(slots, key=slots.get)
+
+    def free(self, slot):
+        """Free the given slot."""
+        SLOT_HEADER.pack_into(self.map, slot, 0.0, 0.0, 0, 0, 0)
+
+    def clear(self):
+        """Free all the slots."""
+        with ExitStack() as stack:
+            for lock in self.locks:
+                stack.enter_context(lock)
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.size - TABLE_OFFSET, TABLE_OFFSET)
+            try:
+                for slot in range(TABLE_OFFSET, self.size, self.slot_size):
+                    self.free(slot)
+            finally:
+                fcntl.lockf(
+                    self.fd, fcntl.LOCK_UN, self.size - TABLE_OFFSET, TABLE_OFFSET
+                )
+
+
+def get_table(path, sets, slot_size):
+    """Return the table at the given path, mapped once by each process."""
+    with _tables_lock:
+        table = _tables.get(path)
+        # the forked processes map the table again, not to share the file locks
+        if table is None or table.pid != os.getpid():
+            table = _tables[path] = SharedMemoryTable(path, sets, slot_size)
+        elif (table.sets, table.slot_size) != (sets, slot_size):
+            raise ImproperlyConfigured(
+                f"The shared memory cache {path} is configured with another size."
+            )
+        return table
+
+
+class SharedMemoryCache(BaseCache):
+    """A cache in a memory-mapped file, shared by the processes of the host."""
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, path, params):
+        """Initialize the cache."""
+        super().__init__(params)
+        self._path = path
+        self._sets = ceil(self._max_entries / WAYS)
+        self._slot_size = int(params.get("SLOT_SIZE", SLOT_SIZE))
+
+    @property
+    def _table(self):
+        """Return the table, mapped once by each process."""
+        return get_table(self._path, self._sets, self._slot_size)
+
+    def _get_expires(self, timeout):
+        """Return the expiration time of the given timeout."""
+        expires = self.get_backend_timeout(timeout)
+        return inf if expires is None else expires
+
+    def _write(self, table, offset, key_hash, key, value, expires):
+        """Write the given key in the locked set, warning when larger than the slots."""
+        if table.write(offset, key_hash, key, value, expires):
+            return True
+        logger.warning(
+            "Cache key %s not cached: %d bytes, larger than the %d bytes slots.",
+            key.decode(),
+            SLOT_HEADER.size + len(key) + len(value),
+            self._slot_size,
+        )
+        return False
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Set the given key, if not already in the cache."""
+        key = self.make_and_validate_key(key, version=version).encode()
+        value = pickle.dumps(value, self.pickle_protocol)
+        table = self._table
+        offset, key_hash = table.locate(key)
+        with table.lock(offset):
+            if table.find(offset, key_hash, key) is not None:
+                return False
+            return self._write(
+                table, offset, key_hash, key, value, self._get_expires(timeout)
+            )
+
+    def get(self, key, default=None, version=None):
+        """Return the value of the given key, or the default."""
+        key = self.make_and_validate_key(key, version=version).encode()
+        table = self._table
+        offset, key_hash = table.locate(key)
+        with table.lock(offset):
+            entry = table.read(offset, key_hash, key)
+        return default if entry is None else pickle.loads(entry[0])  # nosec B301
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Set the given key, unless larger than the slots."""
+        key = self.make_and_validate_key(key, version=version).encode()
+        value = pickle.dumps(value, self.pickle_protocol)
+        table = self._table
+        offset, key_hash = table.locate(key)
+        with table.lock(offset):
+            self._write(table, offset, key_hash, key, value, self._get_expires(timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        """Set the timeout of the given key."""
+        key = self.make_and_validate_key(key, version=version).encode()
+        table = self._table
+        offset, key_hash = table.locate(key)
+        with table.lock(offset):
+            return table.touch(offset, key_hash, key, self._get_expires(timeout))
+
+    def delete(self, key, version=None):
+        """Delete the given key."""
+        key = self.make_and_validate_key(key, version=version).encode()
+        table = self._table
+        offset, key_hash = table.locate(key)
+        with table.lock(offset):
+            return table.delete(offset, key_hash, key)
+
+    def has_key(self, key, version=None):
+        """Return whether the given key is in the cache."""
+        key = self.make_and_validate_key(key, version=version).encode()
+        table = self._table
+        offset, key_hash = table.locate(key)
+        with table.lock(offset):
+            return table.find(offset, key_hash, key) is not None
+
+    def incr(self, key, delta=1, version=None):
+        """Increment the given key, atomically."""
+        validated_key = self.make_and_validate_key(key, version=version)
+        encoded_key = validated_key.encode()
+        table = self._table
+        offset, key_hash = table.locate(encoded_key)
+        with table.lock(offset):
+            if (entry := table.read(offset, key_hash, encoded_key)) is None:
+                raise ValueError(f"Key '{validated_key}' not found.")
+            value, expires = entry
+            new_value = pickle.loads(value) + delta  # nosec B301
+            self._write(
+                table,
+                offset,
+                key_hash,
+                encoded_key,
+                pickle.dumps(new_value, self.pickle_protocol),
+                expires,
+            )
+        return new_value
+
+    def clear(self):
+        """Delete all the keys."""
+        self._table.clear(){% if cookiecutter.use_redis == "true" %}
+
+
+CACHE_TIER_REQUESTS = Counter(
+    "django_cache_tier_requests_total",
+    "The two-tier cache lookups, by the tier serving them.",
+    ["tier"],
+)
+
+# the labelled counters are bound once, not to look them up on each read
+LOCAL_REQUESTS = CACHE_TIER_REQUESTS.labels("local")
+
+MISSED_REQUESTS = CACHE_TIER_REQUESTS.labels("miss")
+
+REDIS_REQUESTS = CACHE_TIER_REQUESTS.labels("redis")
+
+INVALIDATIONS_CHANNEL = "django:cache:invalidations"
+
+LISTEN_TIMEOUT = 1.0  # seconds
+
+LOCAL_TIMEOUT = 60  # seconds
+
+MISSING = object()
+
+RECONNECT_DELAY = 1.0  # seconds
+
+# the listener connection is checked when idle, not to miss the invalidations
+REDIS_HEALTH_CHECK_INTERVAL = 5  # seconds
+
+_tiers = {}
+
+_tiers_lock = Lock()
+
+
+class LocalTier:
+    """A per-process LRU of the Redis keys, invalidated through Redis pub/sub."""
+
+    def __init__(self, max_entries, timeout):
+        """Initialize the tier."""
+        self.entries = OrderedDict()
+        # incremented on each invalidation, not to store the values read before it
+        self.generation = 0
+        self.lock = Lock()
+        self.max_entries = max_entries
+        self.pid = os.getpid()
+        self.sender = uuid4().hex
+        self.stopped = Event()
+        self.subscribed = False
+        self.timeout = timeout
+
+    def get(self, key):
+        """Return the data of the given key, or MISSING."""
+        with self.lock:
+            try:
+                expires, data = self.entries[key]
+            except KeyError:
+                return MISSING
+            if expires <= monotonic():
+                del self.entries[key]
+                return MISSING
+            self.entries.move_to_end(key)
+            return data
+
+    def store(self, key, data, ttl, generation):
+        """Store the data read from Redis, unless invalidated after the read."""
+        with self.lock:
+            # the keys are only served while subscribed to the invalidations
+            if not self.subscribed or generation != self.generation:
+                return
+            self.entries[key] = (monotonic() + min(ttl, self.timeout), data)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        """Remove the given keys, or all of them if None."""
+        with self.lock:
+            self.generation += 1
+            if keys is None:
+                self.entries.clear()
+            else:
+                for key in keys:
+                    self.entries.pop(key, None)
+
+    def get_message(self, keys):
+        """Return the invalidation message of the given keys, or all if None."""
+        return json.dumps({"sender": self.sender, "keys": keys})
+
+    def receive(self, message):
+        """Apply the given pub/sub message."""
+        if message["type"] == "subscribe":
+            # the invalidations sent while not subscribed are lost
+            self.invalidate(None)
+            self.subscribed = True
+        elif message["type"] == "message":
+            data = json.loads(message["data"])
+            if data["sender"] != self.sender:
+                self.invalidate(data["keys"])
+
+    def listen(self, client):
+        """Receive the invalidations, until stopped."""
+        while not self.stopped.is_set():
+            try:
+                with client.pubsub() as pubsub:
+                    pubsub.subscribe(INVALIDATIONS_CHANNEL)
+                    while not self.stopped.is_set():
+                        if message := pubsub.get_message(timeout=LISTEN_TIMEOUT):
+                            self.receive(message)
+            except RedisError:
+                self.subscribed = False
+                self.stopped.wait(RECONNECT_DELAY)
+        self.subscribed = False
+
+    def start(self, client):
+        """Start receiving the invalidations in a thread."""
+        Thread(target=self.listen, args=(client,), daemon=True).start()
+
+    def stop(self):
+        """Stop receiving the invalidations."""
+        self.stopped.set()
+
+
+def get_tier(server, max_entries, timeout):
+    """Return the local tier of the given Redis server, in the current process."""
+    with _tiers_lock:
+        tier = _tiers.get(server)
+        # the forked processes start their own tier
+        if tier is None or tier.pid != os.getpid():
+            tier = _tiers[server] = LocalTier(max_entries, timeout)
+            return tier, True
+        return tier, False
+
+
+class TieredRedisCacheClient(RedisCacheClient):
+    """A Redis cache client serving the hottest keys from the process memory."""
+
+    def __init__(self, servers, local_max_entries, local_timeout, **options):
+        """Initialize the client."""
+        super().__init__(servers, **options)
+        self._local_max_entries = local_max_entries
+        self._local_timeout = local_timeout
+
+    @property
+    def _tier(self):
+        """Return the local tier, started by the first client of each process."""
+        tier, created = get_tier(
+            self._servers[0], self._local_max_entries, self._local_timeout
+        )
+        if created:
+            tier.start(
+                self._lib.Redis.from_url(
+                    self._servers[0],
+                    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                    **self._pool_options,
+                )
+            )
+        return tier
+
+    def _execute(self, pipeline, keys):
+        """Execute the pipeline, invalidating the given keys in all the processes."""
+        tier = self._tier
+        pipeline.publish(INVALIDATIONS_CHANNEL, tier.get_message(keys))
+        tier.invalidate(keys)
+        try:
+            return pipeline.execute()
+        finally:
+            # the own messages are ignored, the values read meanwhile are dropped here
+            tier.invalidate(keys)
+
+    def _publish(self, keys):
+        """Invalidate the given keys in all the processes."""
+        self._execute(self.get_client(None, write=True).pipeline(), keys)
+
+    def _read(self, tier, keys):
+        """Return the data of the given keys read from Redis, storing it locally."""
+        generation = tier.generation
+        pipeline = self.get_client(None).pipeline(transaction=False)
+        pipeline.mget(keys)
+        for key in keys:
+            pipeline.pttl(key)
+        values, *ttls = pipeline.execute()
+        data = {}
+        for key, key_data, ttl in zip(keys, values, ttls, strict=True):
+            if key_data is not None:
+                # the keys without expiration have a negative TTL
+                ttl = ttl / 1000 if ttl >= 0 else self._local_timeout
+                tier.store(key, key_data, ttl, generation)
+                data[key] = key_data
+        REDIS_REQUESTS.inc(len(data))
+        MISSED_REQUESTS.inc(len(keys) - len(data))
+        return data
+
+    def get(self, key, default):
+        """Return the value of the given key, from the process memory if there."""
+        tier = self._tier
+        if (data := tier.get(key)) is not MISSING:
+            LOCAL_REQUESTS.inc()
+        elif (data := self._read(tier, [key]).get(key)) is None:
+            return default
+        return self._serializer.loads(data)
+
+    def get_many(self, keys):
+        """Return the values of the given keys, from the process memory if there."""
+        tier = self._tier
+        data = {}
+        for key in keys:
+            if (key_data := tier.get(key)) is not MISSING:
+                data[key] = key_data
+        LOCAL_REQUESTS.inc(len(data))
+        if missing_keys := [i for i in keys if i not in data]:
+            data.update(self._read(tier, missing_keys))
+        return {key: self._serializer.loads(value) for key, value in data.items()}
+
+    def has_key(self, key):
+        """Return whether the given key exists, from the process memory if there."""
+        return self._tier.get(key) is not MISSING or super().has_key(key)
+
+    def set(self, key, value, timeout):
+        """Set the given key, invalidating it in all the processes."""
+        pipeline = self.get_client(key, write=True).pipeline()
+        if timeout == 0:
+            pipeline.delete(key)
+        else:
+            pipeline.set(key, self._serializer.dumps(value), ex=timeout)
+        self._execute(pipeline, [key])
+
+    def set_many(self, data, timeout):
+        """Set the given keys, invalidating them in all the processes."""
+        pipeline = self.get_client(None, write=True).pipeline()
+        pipeline.mset({k: self._serializer.dumps(v) for k, v in data.items()})
+        if timeout is not None:
+            for key in data:
+                pipeline.expire(key, timeout)
+        self._execute(pipeline, list(data))
+
+    def delete(self, key):
+        """Delete the given key, invalidating it in all the processes."""
+        pipeline = self.get_client(key, write=True).pipeline()
+        pipeline.delete(key)
+        return bool(self._execute(pipeline, [key])[0])
+
+    def delete_many(self, keys):
+        """Delete the given keys, invalidating them in all the processes."""
+        pipeline = self.get_client(None, write=True).pipeline()
+        pipeline.delete(*keys)
+        self._execute(pipeline, list(keys))
+
+    def add(self, key, value, timeout):
+        """Add the given key, invalidating it in all the processes."""
+        if added := super().add(key, value, timeout):
+            self._publish([key])
+        return added
+
+    def touch(self, key, timeout):
+        """Set the timeout of the given key, invalidating it in all the processes."""
+        touched = super().touch(key, timeout)
+        self._publish([key])
+        return touched
+
+    def incr(self, key, delta):
+        """Increment the given key, invalidating it in all the processes."""
+        try:
+            return super().incr(key, delta)
+        finally:
+            self._publish([key])
+
+    def clear(self):
+        """Clear the cache, in all the processes."""
+        pipeline = self.get_client(None, write=True).pipeline()
+        pipeline.flushdb()
+        return bool(self._execute(pipeline, None)[0])
+
+
+class TieredRedisCache(RedisCache):
+    """A Redis cache serving the hottest keys from a per-process LRU."""
+
+    def __init__(self, server, params):
+        """Initialize the cache."""
+        super().__init__(server, params)
+        self._class = TieredRedisCacheClient
+        options = {
+            key: value
+            for key, value in self._options.items()
+            if key not in ("CULL_FREQUENCY", "MAX_ENTRIES", "PASSWORD")
+        }
+        # the cache URL password is passed as option, if not the Django backend
+        if password := self._options.get("PASSWORD"):
+            options["password"] = password
+        self._options = {
+            **options,
+            "local_max_entries": self._max_entries,
+            "local_timeout": int(params.get("LOCAL_TIMEOUT", LOCAL_TIMEOUT)),
+        }{% endif %}
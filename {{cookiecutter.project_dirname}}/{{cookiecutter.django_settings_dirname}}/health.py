@@ -0,0 +1,26 @@
+"""The ASGI health check router."""
+
+HEALTH_METHODS = ("GET", "HEAD")
+
+HEALTH_PATH = "/{{ cookiecutter.service_slug }}/health/"
+
+
+class HealthRouter:
+    """An ASGI application answering the health checks before the wrapped one."""
+
+    def __init__(self, application, path=HEALTH_PATH):
+        """Initialize the router."""
+        self.application = application
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        """Answer the health checks, and pass the other requests through."""
+        if (
+            scope["type"] == "http"
+            and scope["path"] == self.path
+            and scope["method"] in HEALTH_METHODS
+        ):
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+        else:
+            await self.application(scope, receive, send)
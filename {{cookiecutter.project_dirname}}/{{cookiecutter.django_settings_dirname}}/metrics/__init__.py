@@ -0,0 +1 @@
+"""The Prometheus metrics app."""
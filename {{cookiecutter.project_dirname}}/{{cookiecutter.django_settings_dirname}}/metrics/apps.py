@@ -0,0 +1,24 @@
+"""The metrics app config."""
+
+from django.apps import AppConfig
+
+
+class MetricsConfig(AppConfig):
+    """The metrics app config."""
+
+    name = "{{ cookiecutter.django_settings_dirname }}.metrics"
+
+    def ready(self):
+        """Instrument the database connections and the caches."""
+        from django.db.backends.signals import connection_created
+
+        from .instruments import (
+            instrument_caches,
+            instrument_connection,
+            record_pools_stats,
+        )
+
+        instrument_caches()
+        connection_created.connect(instrument_connection)
+        # the pooled connections are created when taken from the pool
+        connection_created.connect(record_pools_stats)
@@ -0,0 +1,149 @@
+"""The metrics instruments."""
+
+from functools import wraps
+from time import perf_counter
+
+from django.core.cache import caches
+from django.db import connections
+from prometheus_client import Counter, Gauge, Histogram
+
+CACHE_REQUESTS = Counter(
+    "django_cache_requests_total", "The cache lookups.", ["alias", "result"]
+)
+
+DB_QUERY_DURATION = Histogram(
+    "django_db_query_duration_seconds", "The database queries duration.", ["alias"]
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "django_db_pool_connections",
+    "The database pool connections.",
+    ["alias", "state"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_MAX_SIZE = Gauge(
+    "django_db_pool_max_size",
+    "The database pool maximum size.",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_REQUESTS = Counter(
+    "django_db_pool_requests_total", "The database pool connection requests.", ["alias"]
+)
+
+DB_POOL_REQUESTS_ERRORS = Counter(
+    "django_db_pool_requests_errors_total",
+    "The database pool connection requests failed.",
+    ["alias"],
+)
+
+DB_POOL_REQUESTS_QUEUED = Counter(
+    "django_db_pool_requests_queued_total",
+    "The database pool connection requests queued.",
+    ["alias"],
+)
+
+DB_POOL_REQUESTS_WAITING = Gauge(
+    "django_db_pool_requests_waiting",
+    "The database pool connection requests waiting.",
+    ["alias"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_WAIT = Counter(
+    "django_db_pool_wait_seconds",
+    "The database pool connection requests waiting time.",
+    ["alias"],
+)
+
+HTTP_REQUESTS = Counter(
+    "django_http_requests_total", "The HTTP requests.", ["method", "route", "status"]
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "django_http_request_duration_seconds",
+    "The HTTP requests duration.",
+    ["route", "status"],
+)
+
+MISSING = object()
+
+
+def instrument_caches():
+    """Instrument the caches when created."""
+    create_connection = caches.create_connection
+
+    @wraps(create_connection)
+    def instrumented_create_connection(alias):
+        return instrument_cache(create_connection(alias), alias)
+
+    caches.create_connection = instrumented_create_connection
+
+
+def instrument_cache(cache, alias):
+    """Count the hits and misses of the given cache."""
+    # the methods are looked up on each call, to include the later class patches
+    cache_class = type(cache)
+
+    @wraps(cache_class.get)
+    def instrumented_get(key, default=None, version=None):
+        # the default 'get_many' implementation gets each key with this default
+        if default is cache._missing_key:
+            return cache_class.get(cache, key, default, version=version)
+        value = cache_class.get(cache, key, MISSING, version=version)
+        CACHE_REQUESTS.labels(alias, "miss" if value is MISSING else "hit").inc()
+        return default if value is MISSING else value
+
+    @wraps(cache_class.get_many)
+    def instrumented_get_many(keys, version=None):
+        values = cache_class.get_many(cache, keys := list(keys), version=version)
+        CACHE_REQUESTS.labels(alias, "hit").inc(len(values))
+        CACHE_REQUESTS.labels(alias, "miss").inc(len(keys) - len(values))
+        return values
+
+    cache.get, cache.get_many = instrumented_get, instrumented_get_many
+    return cache
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """Time the given database query."""
+    start_time = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERY_DURATION.labels(context["connection"].alias).observe(
+            perf_counter() - start_time
+        )
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """Time the queries of the given database connection."""
+    # the signal is sent again when the connection is reestablished
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+def record_pool_stats(connection):
+    """Record the stats of the pool of the given database connection, if any."""
+    if (pool := getattr(connection, "pool", None)) is None:
+        return
+    # the counters stats are reset when popped, to be recorded only once
+    stats = pool.pop_stats()
+    alias = connection.alias
+    in_use = stats["pool_size"] - stats["pool_available"]
+    DB_POOL_CONNECTIONS.labels(alias, "available").set(stats["pool_available"])
+    DB_POOL_CONNECTIONS.labels(alias, "in_use").set(in_use)
+    DB_POOL_MAX_SIZE.labels(alias).set(stats["pool_max"])
+    DB_POOL_REQUESTS_WAITING.labels(alias).set(stats["requests_waiting"])
+    DB_POOL_REQUESTS.labels(alias).inc(stats.get("requests_num", 0))
+    DB_POOL_REQUESTS_ERRORS.labels(alias).inc(stats.get("requests_errors", 0))
+    DB_POOL_REQUESTS_QUEUED.labels(alias).inc(stats.get("requests_queued", 0))
+    DB_POOL_WAIT.labels(alias).inc(stats.get("requests_wait_ms", 0) / 1000)
+
+
+def record_pools_stats(sender=None, connection=None, **kwargs):
+    """Record the stats of the given database connection pool, or of all of them."""
+    for pool_connection in [connection] if connection else connections.all():
+        record_pool_stats(pool_connection)
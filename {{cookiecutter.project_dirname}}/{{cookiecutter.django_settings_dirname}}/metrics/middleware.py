@@ -0,0 +1,87 @@
+"""The metrics middleware."""
+
+import os
+from ipaddress import ip_address, ip_network
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+
+from .instruments import HTTP_REQUEST_DURATION, HTTP_REQUESTS, record_pools_stats
+
+METRICS_PATH = "/{{ cookiecutter.service_slug }}/metrics/"
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def get_metrics_response():
+    """Return the metrics response, aggregating the ones of all the workers."""
+    record_pools_stats()
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Serve the metrics, and measure the requests handled by the next middleware."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        """Initialize the middleware."""
+        self.get_response = get_response
+        self.allowed_networks = [
+            ip_network(i) for i in settings.METRICS_ALLOWED_NETWORKS
+        ]
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Return the response, measuring it."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_metrics_request(request):
+            return get_metrics_response()
+        start_time = perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, perf_counter() - start_time)
+        return response
+
+    async def __acall__(self, request):
+        """Return the response, measuring it, asynchronously."""
+        if self.is_metrics_request(request):
+            return await sync_to_async(get_metrics_response)()
+        start_time = perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, perf_counter() - start_time)
+        return response
+
+    def is_metrics_request(self, request):
+        """Return whether the metrics are requested directly by an allowed client."""
+        # the requests forwarded by the ingress come from the allowed networks too
+        if request.path != METRICS_PATH or "HTTP_X_FORWARDED_FOR" in request.META:
+            return False
+        try:
+            address = ip_address(request.META.get("REMOTE_ADDR", ""))
+        except ValueError:
+            return False
+        return any(address in network for network in self.allowed_networks)
+
+    def observe(self, request, response, duration):
+        """Record the request, by its route to limit the labels cardinality."""
+        resolver_match = request.resolver_match
+        route = resolver_match and resolver_match.route or UNMATCHED_ROUTE
+        status = str(response.status_code)
+        HTTP_REQUESTS.labels(request.method, route, status).inc()
+        HTTP_REQUEST_DURATION.labels(route, status).observe(duration)
@@ -0,0 +1,244 @@
+"""The project middleware."""
+
+import heapq
+import logging
+import random
+from contextvars import ContextVar
+from functools import wraps
+from math import inf
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import import_string
+
+from .routers import PrimaryPin, get_replicas, primary_pin
+
+CACHE_METHODS = (
+    "add",
+    "decr",
+    "delete",
+    "delete_many",
+    "get",
+    "get_many",
+    "get_or_set",
+    "has_key",
+    "incr",
+    "set",
+    "set_many",
+    "touch",
+)
+
+PRIMARY_PIN_COOKIE = "primary_pin"
+
+logger = logging.getLogger(__name__)
+
+request_timings = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """The database queries and cache calls durations of a request."""
+
+    def __init__(self, top_queries):
+        """Initialize the timings."""
+        self.cache_calls = 0
+        self.cache_depth = 0
+        self.cache_duration = 0.0
+        self.db_duration = 0.0
+        self.db_queries = 0
+        self.slowest_queries = []
+        self.top_queries = top_queries
+
+    def add_query(self, sql, duration):
+        """Add a database query, keeping only the slowest ones."""
+        self.db_queries += 1
+        self.db_duration += duration
+        query = (duration, self.db_queries, sql)
+        if len(self.slowest_queries) < self.top_queries:
+            heapq.heappush(self.slowest_queries, query)
+        else:
+            heapq.heappushpop(self.slowest_queries, query)
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    """Time the given database query, if in a timed request."""
+    if (timings := request_timings.get()) is None:
+        return execute(sql, params, many, context)
+    start_time = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(sql, perf_counter() - start_time)
+
+
+def add_execute_wrapper(sender, connection, **kwargs):
+    """Time the queries of the given database connection."""
+    # the signal is sent again when the connection is reestablished
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+def time_cache_method(method):
+    """Return the given cache method, timed if in a timed request."""
+
+    @wraps(method)
+    def timed_method(*args, **kwargs):
+        # the calls made by other cache methods are timed as part of them
+        if (timings := request_timings.get()) is None or timings.cache_depth:
+            return method(*args, **kwargs)
+        timings.cache_depth += 1
+        start_time = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings.cache_depth -= 1
+            timings.cache_calls += 1
+            timings.cache_duration += perf_counter() - start_time
+
+    timed_method.timed = True
+    return timed_method
+
+
+def install_timers():
+    """Time the queries of the database connections and the calls of the caches."""
+    connection_created.connect(add_execute_wrapper)
+    for connection in connections.all(initialized_only=True):
+        add_execute_wrapper(None, connection)
+    # the backend classes are patched, to time the already created caches too
+    for cache_settings in settings.CACHES.values():
+        cache_class = import_string(cache_settings["BACKEND"])
+        for name in CACHE_METHODS:
+            if not getattr(method := getattr(cache_class, name), "timed", False):
+                setattr(cache_class, name, time_cache_method(method))
+
+
+class ServerTimingMiddleware:
+    """Add the database, cache and view durations as Server-Timing header."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        """Initialize the middleware, if enabled."""
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        install_timers()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Return the response, timing it."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings(settings.SERVER_TIMING_TOP_QUERIES)
+        token = request_timings.set(timings)
+        start_time = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_timings.reset(token)
+        return self.add_timings(request, response, timings, perf_counter() - start_time)
+
+    async def __acall__(self, request):
+        """Return the response, timing it, asynchronously."""
+        timings = RequestTimings(settings.SERVER_TIMING_TOP_QUERIES)
+        token = request_timings.set(timings)
+        start_time = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_timings.reset(token)
+        return self.add_timings(request, response, timings, perf_counter() - start_time)
+
+    def add_timings(self, request, response, timings, duration):
+        """Add the Server-Timing header, and log the sampled slow requests."""
+        response["Server-Timing"] = ", ".join(
+            (
+                f"db;dur={timings.db_duration * 1000:.1f};"
+                f'desc="{timings.db_queries} queries"',
+                f"cache;dur={timings.cache_duration * 1000:.1f};"
+                f'desc="{timings.cache_calls} calls"',
+                f"view;dur={duration * 1000:.1f}",
+            )
+        )
+        if (
+            duration >= settings.SERVER_TIMING_SLOW_REQUEST
+            and random.random() < settings.SERVER_TIMING_SLOW_SAMPLE_RATE  # nosec B311
+        ):
+            logger.warning(
+                "Slow request %s %s (%.1fms, db %.1fms in %d queries, "
+                "cache %.1fms in %d calls)%s",
+                request.method,
+                request.path,
+                duration * 1000,
+                timings.db_duration * 1000,
+                timings.db_queries,
+                timings.cache_duration * 1000,
+                timings.cache_calls,
+                "".join(
+                    f"\n\t{query_duration * 1000:.1f}ms {sql}"
+                    for query_duration, _, sql in sorted(
+                        timings.slowest_queries, reverse=True
+                    )
+                ),
+            )
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """Pin the reads to the primary database, after a write, for a while."""
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        """Initialize the middleware, if any replica is configured."""
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """Return the response, pinning the reads after a write."""
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        pin = self.get_pin(request)
+        token = primary_pin.set(pin)
+        try:
+            response = self.get_response(request)
+        finally:
+            primary_pin.reset(token)
+        return self.set_pin_cookie(request, response, pin)
+
+    async def __acall__(self, request):
+        """Return the response, pinning the reads after a write, asynchronously."""
+        pin = self.get_pin(request)
+        token = primary_pin.set(pin)
+        try:
+            response = await self.get_response(request)
+        finally:
+            primary_pin.reset(token)
+        return self.set_pin_cookie(request, response, pin)
+
+    def get_pin(self, request):
+        """Return the request pin, pinned if a previous request wrote."""
+        # the whole request is pinned, the cookie expiring after the pin window
+        return PrimaryPin(inf if PRIMARY_PIN_COOKIE in request.COOKIES else 0.0)
+
+    def set_pin_cookie(self, request, response, pin):
+        """Set the pin cookie, if the request wrote."""
+        if pin.written:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                "1",
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,106 @@
+"""The readiness checks of the configured backends."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.storage import storages
+from django.db import connections
+
+READINESS_KEY = "readiness"
+
+logger = logging.getLogger(__name__)
+
+
+def check_database(alias):
+    """Check the given database accepts queries."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    finally:
+        connection.close()
+
+
+def check_cache(alias):
+    """Check the given cache accepts lookups."""
+    cache = caches[alias]
+    try:
+        cache.has_key(READINESS_KEY)
+    finally:
+        cache.close()
+
+
+def check_storage():
+    """Check the default storage accepts lookups."""
+    storages["default"].exists(READINESS_KEY)
+
+
+def get_checks():
+    """Return the checks of the configured databases, caches and storage."""
+    return {
+        **{f"database:{i}": partial(check_database, i) for i in settings.DATABASES},
+        **{f"cache:{i}": partial(check_cache, i) for i in settings.CACHES},
+        "storage:default": check_storage,
+    }
+
+
+class ReadinessChecks:
+    """The readiness checks results, cached by each worker."""
+
+    def __init__(self):
+        """Initialize the checks."""
+        self.executor = None
+        self.expires = 0.0
+        self.futures = {}
+        self.lock = Lock()
+        self.results = None
+
+    def run_checks(self):
+        """Run the checks concurrently, and return their results by name."""
+        checks = get_checks()
+        if self.executor is None:
+            # a long-lived pool, with a thread for each check even if it hangs
+            self.executor = ThreadPoolExecutor(
+                len(checks), thread_name_prefix="readiness"
+            )
+        futures = {}
+        for name, check in checks.items():
+            # the checks still running since a previous run are awaited again
+            if (future := self.futures.get(name)) is None or future.done():
+                future = self.executor.submit(check)
+            futures[name] = future
+        self.futures = futures
+        done, _ = wait(futures.values(), timeout=settings.READINESS_CHECK_TIMEOUT)
+        results = {}
+        for name, future in futures.items():
+            if future not in done:
+                logger.warning("Readiness check %s timed out.", name)
+                results[name] = "timeout"
+            elif error := future.exception():
+                logger.warning("Readiness check %s failed: %r", name, error)
+                results[name] = "error"
+            else:
+                results[name] = "ok"
+        return results
+
+    def get_results(self):
+        """Return the checks results, running the checks once they expire."""
+        # the concurrent requests wait for the running checks, reusing their results
+        with self.lock:
+            if self.results is None or monotonic() >= self.expires:
+                self.results = self.run_checks()
+                self.expires = monotonic() + settings.READINESS_CACHE_TTL
+            return self.results
+
+    def clear(self):
+        """Clear the cached results."""
+        with self.lock:
+            self.results = None
+
+
+readiness_checks = ReadinessChecks()
@@ -0,0 +1,145 @@
+"""The database routers."""
+
+import logging
+import random
+from contextvars import ContextVar
+from math import inf
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# the replay lag is zero when all the received changes are replayed, since the last
+# replayed transaction timestamp only changes with the primary ones
+LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+REPLICA_PREFIX = "replica_"
+
+logger = logging.getLogger(__name__)
+
+primary_pin = ContextVar("primary_pin", default=None)
+
+
+class PrimaryPin:
+    """The pinning of the reads to the primary database, after a write."""
+
+    def __init__(self, until=0.0):
+        """Initialize the pin."""
+        self.until = until
+        self.written = False
+
+    def is_pinned(self):
+        """Return whether the reads are pinned to the primary database."""
+        return monotonic() < self.until
+
+    def pin(self):
+        """Pin the reads to the primary database, after a write."""
+        pin_until = monotonic() + settings.DATABASE_REPLICA_PIN_SECONDS
+        self.until = max(self.until, pin_until)
+        self.written = True
+
+
+def get_replicas():
+    """Return the replicas aliases, with their weights."""
+    aliases = [i for i in settings.DATABASES if i.startswith(REPLICA_PREFIX)]
+    weights = settings.DATABASE_REPLICA_WEIGHTS
+    return {
+        alias: weights[i] if i < len(weights) else 1 for i, alias in enumerate(aliases)
+    }
+
+
+def measure_lag(alias):
+    """Return the replication lag of the given replica, in seconds."""
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_QUERY)
+            return float(cursor.fetchone()[0])
+    except DatabaseError as error:
+        logger.warning("Replica %s lag measurement failed: %r", alias, error)
+        return inf
+
+
+class ReplicaLags:
+    """The replication lags of the replicas, measured by each worker."""
+
+    def __init__(self):
+        """Initialize the lags."""
+        self.expires = 0.0
+        self.lags = {}
+        self.lock = Lock()
+
+    def get_lags(self, aliases):
+        """Return the lags of the given replicas, measuring them once expired."""
+        # the concurrent reads use the previous lags while they are measured
+        if monotonic() >= self.expires and self.lock.acquire(blocking=False):
+            try:
+                self.lags = {alias: measure_lag(alias) for alias in aliases}
+                interval = settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL
+                self.expires = monotonic() + interval
+            finally:
+                self.lock.release()
+        return self.lags
+
+    def clear(self):
+        """Clear the measured lags."""
+        with self.lock:
+            self.expires = 0.0
+            self.lags = {}
+
+
+replica_lags = ReplicaLags()
+
+
+class ReplicaRouter:
+    """Route the reads to the replicas by weight, skipping the lagging ones."""
+
+    def db_for_read(self, model, **hints):
+        """Return a replica, or the primary database if pinned or none is healthy."""
+        if not (replicas := get_replicas()):
+            return None
+        if (pin := primary_pin.get()) is not None and pin.is_pinned():
+            return DEFAULT_DB_ALIAS
+        lags = replica_lags.get_lags(replicas)
+        healthy = {
+            alias: weight
+            for alias, weight in replicas.items()
+            if lags.get(alias, inf) <= settings.DATABASE_REPLICA_MAX_LAG
+        }
+        if not healthy:
+            return DEFAULT_DB_ALIAS
+        return random.choices(  # nosec B311
+            list(healthy), weights=list(healthy.values())
+        )[0]
+
+    def db_for_write(self, model, **hints):
+        """Return the primary database, pinning the next reads to it."""
+        if not get_replicas():
+            return None
+        if (pin := primary_pin.get()) is None:
+            # the reads outside the requests are pinned in the current context
+            primary_pin.set(pin := PrimaryPin())
+        pin.pin()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Allow the relations between the primary and the replicas objects."""
+        aliases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Skip migrating the replicas."""
+        if db.startswith(REPLICA_PREFIX):
+            return False
+        return None
@@ -15,8 +15,15 @@ from copy import deepcopy
 from pathlib import Path
 
 import dj_database_url
+import django_cache_url
 from configurations import Configuration, values
 
+# the shared memory cache backend, selected by the `shm://` cache URL scheme
+django_cache_url.BACKENDS["shm"] = "{{ cookiecutter.django_settings_dirname }}.caches.SharedMemoryCache"{% if cookiecutter.use_redis == "true" %}
+
+# the two-tier Redis cache backend, selected by the `lib=tiered` cache URL parameter
+django_cache_url.BACKENDS["tiered"] = "{{ cookiecutter.django_settings_dirname }}.caches.TieredRedisCache"{% endif %}
+
 
 class ProjectDefault(Configuration):
     """
@@ -49,9 +56,13 @@ class ProjectDefault(Configuration):
         "django.contrib.sessions",
         "django.contrib.messages",
         "django.contrib.staticfiles",
+        "{{ cookiecutter.django_settings_dirname }}.metrics",
     ]
 
     MIDDLEWARE = [
+        "{{ cookiecutter.django_settings_dirname }}.metrics.middleware.MetricsMiddleware",
+        "{{ cookiecutter.django_settings_dirname }}.middleware.ServerTimingMiddleware",
+        "{{ cookiecutter.django_settings_dirname }}.middleware.ReplicaPinningMiddleware",
         "django.middleware.security.SecurityMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
@@ -84,9 +95,36 @@ class ProjectDefault(Configuration):
     # Database
     # https://docs.djangoproject.com/en/stable/ref/settings/#databases
 
-    DATABASES = {
-        "default": dj_database_url.config(),
-    }
+    @property
+    def DATABASES(self):
+        """Return the databases, the read replicas included."""
+        return {
+            "default": dj_database_url.config(),
+            **{
+                f"replica_{i}": {
+                    **dj_database_url.parse(url),
+                    "TEST": {"MIRROR": "default"},
+                }
+                for i, url in enumerate(self.DATABASE_REPLICA_URLS, 1)
+            },
+        }
+
+    # Database read replicas
+
+    DATABASE_REPLICA_URLS = values.ListValue([])
+
+    DATABASE_REPLICA_WEIGHTS = values.ListValue([], converter=int)
+
+    DATABASE_REPLICA_MAX_LAG = values.FloatValue(5.0)  # seconds
+
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL = values.FloatValue(5.0)  # seconds
+
+    DATABASE_REPLICA_PIN_SECONDS = values.PositiveIntegerValue(5)
+
+    # Database routers
+    # https://docs.djangoproject.com/en/stable/topics/db/multi-db/#automatic-database-routing
+
+    DATABASE_ROUTERS = ["{{ cookiecutter.django_settings_dirname }}.routers.ReplicaRouter"]
 
     # Password validation
     # https://docs.djangoproject.com/en/stable/ref/settings/#auth-password-validators
@@ -194,6 +232,30 @@ class ProjectDefault(Configuration):
 
     CSRF_TRUSTED_ORIGINS = values.ListValue([])
 
+    # Metrics
+
+    METRICS_ALLOWED_NETWORKS = values.ListValue(
+        ["127.0.0.0/8", "::1/128", "10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"]
+    )
+
+    # Server Timing
+    # https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Server-Timing
+
+    SERVER_TIMING = values.BooleanValue(False)
+
+    SERVER_TIMING_SLOW_REQUEST = values.FloatValue(1.0)  # seconds
+
+    SERVER_TIMING_SLOW_SAMPLE_RATE = values.FloatValue(0.1)
+
+    SERVER_TIMING_TOP_QUERIES = values.PositiveIntegerValue(5)
+
+    # Readiness
+    # https://kubernetes.io/docs/concepts/configuration/liveness-readiness-startup-probes/
+
+    READINESS_CACHE_TTL = values.FloatValue(5.0)  # seconds
+
+    READINESS_CHECK_TIMEOUT = values.FloatValue(2.0)  # seconds
+
 
 class Local(ProjectDefault):
     """The local settings."""
@@ -342,7 +404,10 @@ class Remote(ProjectDefault):
         except ModuleNotFoundError:  # pragma: no cover
             pass
         else:  # pragma: no cover
-            middleware.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+            middleware.insert(
+                middleware.index("django.middleware.security.SecurityMiddleware") + 1,
+                "whitenoise.middleware.WhiteNoiseMiddleware",
+            )
         return middleware
 
     # DB Transaction pooling and server-side cursors
@@ -350,13 +415,37 @@ class Remote(ProjectDefault):
 
     DISABLE_SERVER_SIDE_CURSORS = values.BooleanValue(False)
 
+    # DB Connection pool
+    # https://docs.djangoproject.com/en/stable/ref/databases/#connection-pool
+
+    DATABASE_POOL = values.BooleanValue(False)
+
+    DATABASE_POOL_MIN_SIZE = values.PositiveIntegerValue(1)
+
+    DATABASE_POOL_MAX_SIZE = values.PositiveIntegerValue(4)
+
+    DATABASE_POOL_TIMEOUT = values.FloatValue(10.0)  # seconds
+
+    DATABASE_POOL_MAX_IDLE = values.FloatValue(600.0)  # seconds
+
+    DATABASE_POOL_MAX_LIFETIME = values.FloatValue(3_600.0)  # seconds
+
     @property
     def DATABASES(self):  # pragma: no cover
         """Return the databases."""
-        databases = deepcopy(ProjectDefault.DATABASES)
-        databases["default"][
-            "DISABLE_SERVER_SIDE_CURSORS"
-        ] = self.DISABLE_SERVER_SIDE_CURSORS
+        databases = super().DATABASES
+        for database in databases.values():
+            database["DISABLE_SERVER_SIDE_CURSORS"] = self.DISABLE_SERVER_SIDE_CURSORS
+            if self.DATABASE_POOL:
+                # the pooled connections are returned to the pool, not persisted
+                database["CONN_MAX_AGE"] = 0
+                database.setdefault("OPTIONS", {})["pool"] = {
+                    "min_size": self.DATABASE_POOL_MIN_SIZE,
+                    "max_size": self.DATABASE_POOL_MAX_SIZE,
+                    "timeout": self.DATABASE_POOL_TIMEOUT,
+                    "max_idle": self.DATABASE_POOL_MAX_IDLE,
+                    "max_lifetime": self.DATABASE_POOL_MAX_LIFETIME,
+                }
         return databases
 
     # Email URL
@@ -392,11 +481,6 @@ class Remote(ProjectDefault):
 
     X_FRAME_OPTIONS = "DENY"
 
-    # Persistent connections
-    # https://docs.djangoproject.com/en/stable/ref/databases/#general-notes
-
-    CONN_MAX_AGE = None
-
     # Storages
     # https://docs.djangoproject.com/en/stable/ref/settings/#std-setting-STORAGES
 
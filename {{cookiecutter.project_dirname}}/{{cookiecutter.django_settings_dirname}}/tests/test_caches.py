@@ -0,0 +1,342 @@
+"""The cache backends tests."""
+
+{% if cookiecutter.use_redis == "true" %}import json
+{% endif %}import os
+from itertools import count
+from tempfile import TemporaryDirectory
+from time import {% if cookiecutter.use_redis == "true" %}monotonic, sleep, {% endif %}time
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase{% if cookiecutter.use_redis == "true" %}
+from prometheus_client import REGISTRY
+from redis import Redis
+from redis.client import Pipeline
+from redis.exceptions import ConnectionError{% endif %}
+
+from {{ cookiecutter.django_settings_dirname }}.caches import (
+{% if cookiecutter.use_redis == "true" %}    INVALIDATIONS_CHANNEL,
+    MISSING,
+    LocalTier,
+{% endif %}    SharedMemoryCache,
+{% if cookiecutter.use_redis == "true" %}    TieredRedisCache,
+{% endif %}    get_table,
+{% if cookiecutter.use_redis == "true" %}    get_tier,
+{% endif %})
+
+CACHES_MODULE = "{{ cookiecutter.django_settings_dirname }}.caches"{% if cookiecutter.use_redis == "true" %}
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0"){% endif %}
+
+
+class SharedMemoryCacheTest(SimpleTestCase):
+    """The shared memory cache backend tests."""
+
+    def setUp(self):
+        """Initialize a cache of a single set, in a temporary file."""
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, "cache")
+        self.addCleanup(mock.patch.dict(f"{CACHES_MODULE}._tables").stop)
+        mock.patch.dict(f"{CACHES_MODULE}._tables").start()
+        self.cache = self.get_cache()
+        return super().setUp()
+
+    def get_cache(self, max_entries=8):
+        """Return a cache of the temporary file."""
+        return SharedMemoryCache(
+            self.path, {"OPTIONS": {"MAX_ENTRIES": max_entries}, "SLOT_SIZE": "256"}
+        )
+
+    def test_operations(self):
+        """Test the cache operations."""
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", {"value": 1})
+        self.assertEqual(self.cache.get("a"), {"value": 1})
+        self.assertFalse(self.cache.add("a", 2))
+        self.assertTrue(self.cache.add("b", 2))
+        self.assertEqual(self.cache.incr("b", 3), 5)
+        self.assertEqual(
+            self.cache.get_many(["a", "b", "c"]), {"a": {"value": 1}, "b": 5}
+        )
+        self.assertTrue(self.cache.has_key("b"))
+        self.assertTrue(self.cache.delete("b"))
+        self.assertFalse(self.cache.delete("b"))
+        self.assertFalse(self.cache.has_key("b"))
+        self.assertFalse(self.cache.touch("b"))
+        with self.assertRaises(ValueError):
+            self.cache.incr("b")
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_expiration(self):
+        """Test the keys expire with their timeout."""
+        self.cache.set("a", 1, 10)
+        self.cache.set("b", 2, None)
+        self.cache.set("c", 3, 10)
+        self.assertTrue(self.cache.touch("c", 30))
+        with mock.patch(f"{CACHES_MODULE}.time", return_value=time() + 20):
+            self.assertIsNone(self.cache.get("a"))
+            self.assertEqual(self.cache.get("b"), 2)
+            self.assertEqual(self.cache.get("c"), 3)
+        self.cache.set("b", 2, 0)
+        self.assertFalse(self.cache.has_key("b"))
+
+    def test_eviction(self):
+        """Test the least recently used keys of the set are evicted."""
+        with mock.patch(f"{CACHES_MODULE}.time", side_effect=count(time())):
+            for key in range(8):
+                self.cache.set(key, key)
+            self.assertEqual(self.cache.get(0), 0)
+            self.cache.set(8, 8)
+        expected = {i: i for i in range(9) if i != 1}
+        self.assertEqual(self.cache.get_many(range(9)), expected)
+
+    def test_too_large(self):
+        """Test the values larger than the slots are not cached, with a warning."""
+        self.cache.set("a", 1)
+        with self.assertLogs(CACHES_MODULE, "WARNING") as logs:
+            self.cache.set("a", "x" * 256)
+            self.assertFalse(self.cache.add("b", "x" * 256))
+        self.assertIsNone(self.cache.get("a"))
+        self.assertFalse(self.cache.has_key("b"))
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("larger than the 256 bytes slots", logs.output[0])
+
+    def test_shared(self):
+        """Test the file is shared by the processes with the same size."""
+        self.cache.set("a", 1)
+        table = self.cache._table
+        with mock.patch(f"{CACHES_MODULE}.os.getpid", return_value=-1):
+            self.assertEqual(self.get_cache().get("a"), 1)
+        with mock.patch(f"{CACHES_MODULE}.os.getpid", return_value=-2):
+            self.assertIsNone(self.get_cache(max_entries=16).get("a"))
+        # the processes mapping the replaced file keep using it
+        key = self.cache.make_key("a").encode()
+        self.assertIsNotNone(table.read(*table.locate(key), key))
+
+    def test_get_table(self):
+        """Test each process maps each table once, with a single size."""
+        table = get_table(self.path, 1, 256)
+        self.assertIs(get_table(self.path, 1, 256), table)
+        with self.assertRaises(ImproperlyConfigured):
+            get_table(self.path, 2, 256){% if cookiecutter.use_redis == "true" %}
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait for the given condition to be true, and return it."""
+    expires = monotonic() + timeout
+    while not (result := condition()) and monotonic() < expires:
+        sleep(0.01)  # pragma: no cover (the condition may already be true)
+    return result
+
+
+class LocalTierTest(SimpleTestCase):
+    """The local tier tests."""
+
+    def setUp(self):
+        """Initialize a subscribed tier."""
+        self.tier = LocalTier(max_entries=2, timeout=60)
+        self.tier.receive({"type": "subscribe"})
+        return super().setUp()
+
+    def test_lru(self):
+        """Test the least recently used keys are evicted."""
+        for key in ("a", "b"):
+            self.tier.store(key, b"data", 10, self.tier.generation)
+        self.assertEqual(self.tier.get("a"), b"data")
+        self.tier.store("c", b"data", 10, self.tier.generation)
+        self.assertEqual(list(self.tier.entries), ["a", "c"])
+
+    def test_expiration(self):
+        """Test the keys expire with their TTL, up to the tier timeout."""
+        with mock.patch(f"{CACHES_MODULE}.monotonic", return_value=0.0):
+            self.tier.store("a", b"data", 10, self.tier.generation)
+            self.tier.store("b", b"data", 120, self.tier.generation)
+        self.assertEqual(
+            {key: expires for key, (expires, _) in self.tier.entries.items()},
+            {"a": 10, "b": 60},
+        )
+        with mock.patch(f"{CACHES_MODULE}.monotonic", return_value=30.0):
+            self.assertIs(self.tier.get("a"), MISSING)
+            self.assertEqual(self.tier.get("b"), b"data")
+        self.assertEqual(list(self.tier.entries), ["b"])
+
+    def test_store_invalidated(self):
+        """Test the keys invalidated while read, or not subscribed, are not stored."""
+        generation = self.tier.generation
+        self.tier.invalidate(["a"])
+        self.tier.store("a", b"data", 10, generation)
+        self.assertIs(self.tier.get("a"), MISSING)
+        self.tier.subscribed = False
+        self.tier.store("a", b"data", 10, self.tier.generation)
+        self.assertIs(self.tier.get("a"), MISSING)
+
+    def test_receive(self):
+        """Test the invalidations of the other processes are applied."""
+        for key in ("a", "b"):
+            self.tier.store(key, b"data", 10, self.tier.generation)
+        for sender, keys in ((self.tier.sender, ["a"]), ("other", ["b"])):
+            data = json.dumps({"sender": sender, "keys": keys})
+            self.tier.receive({"type": "message", "data": data})
+        self.assertEqual(list(self.tier.entries), ["a"])
+        self.tier.receive({"type": "message", "data": self.tier.get_message(None)})
+        self.assertEqual(list(self.tier.entries), ["a"])
+        self.tier.receive(
+            {"type": "message", "data": json.dumps({"sender": "other", "keys": None})}
+        )
+        self.assertEqual(list(self.tier.entries), [])
+        self.tier.receive({"type": "unsubscribe"})
+        self.assertTrue(self.tier.subscribed)
+
+    def test_listen(self):
+        """Test the invalidations are received until stopped."""
+        client = mock.MagicMock()
+        pubsub = client.pubsub.return_value.__enter__.return_value
+        pubsub.get_message.side_effect = lambda timeout: self.tier.stop()
+        self.tier.listen(client)
+        pubsub.subscribe.assert_called_once_with(INVALIDATIONS_CHANNEL)
+        self.assertFalse(self.tier.subscribed)
+
+    def test_listen_reconnect(self):
+        """Test the local tier is bypassed while reconnecting."""
+        client = mock.Mock()
+        client.pubsub.side_effect = ConnectionError
+        with mock.patch.object(
+            self.tier.stopped, "wait", side_effect=lambda _: self.tier.stop()
+        ) as mocked_wait:
+            self.tier.listen(client)
+        mocked_wait.assert_called_once()
+        self.assertFalse(self.tier.subscribed)
+
+    def test_get_tier(self):
+        """Test each process has its own tier per server."""
+        tier, created = get_tier("redis://test:6379/0", 2, 60)
+        self.assertTrue(created)
+        self.assertEqual(get_tier("redis://test:6379/0", 2, 60), (tier, False))
+        with mock.patch(f"{CACHES_MODULE}.os.getpid", return_value=-1):
+            self.assertEqual(get_tier("redis://test:6379/0", 2, 60)[1], True)
+
+
+class TieredRedisCacheTest(SimpleTestCase):
+    """The two-tier cache backend tests."""
+
+    def setUp(self):
+        """Initialize the cache, waiting for the invalidations subscription."""
+        self.cache = TieredRedisCache(
+            REDIS_URL, {"KEY_PREFIX": "test", "OPTIONS": {"MAX_ENTRIES": 10}}
+        )
+        self.cache.clear()
+        self.tier = self.cache._cache._tier
+        self.assertTrue(wait_for(lambda: self.tier.subscribed))
+        self.redis = Redis.from_url(REDIS_URL)
+        self.addCleanup(self.redis.close)
+        return super().setUp()
+
+    def get_sample_value(self, tier):
+        """Return the current count of the lookups served by the given tier."""
+        name = "django_cache_tier_requests_total"
+        return REGISTRY.get_sample_value(name, {"tier": tier}) or 0
+
+    def test_options(self):
+        """Test the local tier and password options are not passed to Redis."""
+        cache = TieredRedisCache(
+            REDIS_URL,
+            {
+                "LOCAL_TIMEOUT": "5",
+                "OPTIONS": {"CULL_FREQUENCY": 3, "MAX_ENTRIES": 10, "PASSWORD": "pw"},
+            },
+        )
+        self.assertEqual(
+            cache._options,
+            {"local_max_entries": 10, "local_timeout": 5, "password": "pw"},
+        )
+
+    def test_get(self):
+        """Test the values read from Redis are then served from the local tier."""
+        self.cache.set("key", {"value": 1}, 30)
+        counts = {i: self.get_sample_value(i) for i in ("local", "redis", "miss")}
+        self.assertEqual(self.cache.get("key"), {"value": 1})
+        self.assertEqual(self.cache.get("key"), {"value": 1})
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(
+            {i: self.get_sample_value(i) - counts[i] for i in counts},
+            {"local": 1, "redis": 1, "miss": 1},
+        )
+        self.assertLessEqual(
+            self.tier.entries[self.cache.make_key("key")][0], monotonic() + 30
+        )
+        self.assertTrue(self.cache.has_key("key"))
+        self.assertFalse(self.cache.has_key("missing"))
+
+    def test_get_persistent(self):
+        """Test the values without expiration are kept up to the tier timeout."""
+        self.cache.set("key", 1, None)
+        self.assertEqual(self.cache.get_many(["key", "missing"]), {"key": 1})
+        self.assertIn(self.cache.make_key("key"), self.tier.entries)
+        self.assertEqual(self.cache.get_many(["key"]), {"key": 1})
+
+    def test_writes(self):
+        """Test the writes are not followed by stale local reads."""
+        self.cache.set_many({"a": 1, "b": 2}, 30)
+        self.assertEqual(self.cache.get_many(["a", "b"]), {"a": 1, "b": 2})
+        self.cache.set("a", 3, 30)
+        self.assertEqual(self.cache.get("a"), 3)
+        self.cache.set("a", 4, 0)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertFalse(self.cache.add("b", 5))
+        self.assertEqual(self.cache.incr("b"), 3)
+        self.assertEqual(self.cache.get("b"), 3)
+        self.assertTrue(self.cache.touch("b", None))
+        self.assertTrue(self.cache.add("c", 6))
+        self.assertEqual(self.cache.get("c"), 6)
+        self.assertTrue(self.cache.delete("c"))
+        self.assertIsNone(self.cache.get("c"))
+        self.cache.set_many({"a": 7}, None)
+        self.assertEqual(self.cache.get("a"), 7)
+        self.cache.delete_many(["a", "b"])
+        self.assertEqual(self.cache.get_many(["a", "b"]), {})
+        with self.assertRaises(ValueError):
+            self.cache.incr("a")
+
+    def publish(self, keys):
+        """Publish the given keys invalidation, and wait for it to be received."""
+        generation = self.tier.generation
+        self.redis.publish(
+            INVALIDATIONS_CHANNEL, json.dumps({"sender": "other", "keys": keys})
+        )
+        self.assertTrue(wait_for(lambda: self.tier.generation > generation))
+
+    def test_read_while_writing(self):
+        """Test the values read while writing are not served after the write."""
+        self.cache.set("key", "old", 30)
+        execute = Pipeline.execute
+        reads = []
+
+        def read_and_execute(pipeline, *args, **kwargs):
+            # the first pipeline is the write, reading before it is sent to Redis
+            if not reads:
+                reads.append(None)
+                reads[0] = self.cache.get("key")
+            return execute(pipeline, *args, **kwargs)
+
+        with mock.patch.object(
+            Pipeline, "execute", autospec=True, side_effect=read_and_execute
+        ):
+            self.cache.set("key", "new", 30)
+        self.assertEqual(reads, ["old"])
+        self.assertEqual(self.cache.get("key"), "new")
+
+    def test_other_process_writes(self):
+        """Test the writes of the other processes invalidate the local tier."""
+        self.cache.set("key", 1, 30)
+        self.assertEqual(self.cache.get("key"), 1)
+        key = self.cache.make_key("key")
+        self.assertIn(key, self.tier.entries)
+        # the values of the other processes are written and published by Redis
+        self.redis.set(key, 2)
+        self.publish([key])
+        self.assertNotIn(key, self.tier.entries)
+        self.assertEqual(self.cache.get("key"), 2)
+        self.publish(None)
+        self.assertEqual(self.tier.entries, {}){% endif %}
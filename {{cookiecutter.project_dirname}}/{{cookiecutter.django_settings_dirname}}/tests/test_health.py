@@ -0,0 +1,52 @@
+"""The ASGI health check router tests."""
+
+from django.test import SimpleTestCase
+
+from {{ cookiecutter.django_settings_dirname }}.health import HealthRouter
+
+
+async def application(scope, receive, send):
+    """Respond to any request with a 200 status."""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"application"})
+
+
+class HealthRouterTest(SimpleTestCase):
+    """The ASGI health check router tests."""
+
+    url = "/{{ cookiecutter.service_slug }}/health/"
+
+    async def get_messages(self, scope):
+        """Return the messages sent by the router for the given scope."""
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}  # pragma: no cover
+
+        async def send(message):
+            messages.append(message)
+
+        await HealthRouter(application)(scope, receive, send)
+        return messages
+
+    async def test_health(self):
+        """Test the health checks are answered by the router."""
+        for method in ("GET", "HEAD"):
+            with self.subTest(method):
+                messages = await self.get_messages(
+                    {"type": "http", "method": method, "path": self.url}
+                )
+                self.assertEqual(messages[0]["status"], 204)
+                self.assertEqual(messages[1]["body"], b"")
+
+    async def test_pass_through(self):
+        """Test the other requests are passed to the wrapped application."""
+        for scope in (
+            {"type": "http", "method": "GET", "path": "/"},
+            {"type": "http", "method": "POST", "path": self.url},
+            {"type": "websocket", "path": self.url},
+        ):
+            with self.subTest(**scope):
+                messages = await self.get_messages(scope)
+                self.assertEqual(messages[0]["status"], 200)
+                self.assertEqual(messages[1]["body"], b"application")
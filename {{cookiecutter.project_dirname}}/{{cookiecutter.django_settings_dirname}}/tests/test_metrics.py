@@ -0,0 +1,171 @@
+"""The metrics app tests."""
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, Client, TestCase, override_settings
+from prometheus_client import REGISTRY
+
+from {{ cookiecutter.django_settings_dirname }}.metrics.instruments import (
+    execute_wrapper,
+    instrument_connection,
+    record_pools_stats,
+)
+
+
+class MetricsTest(TestCase):
+    """The metrics tests."""
+
+    url = "/{{ cookiecutter.service_slug }}/metrics/"
+    client = Client()
+
+    def get_sample_value(self, name, **labels):
+        """Return the current value of the given metric sample."""
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_http_requests(self):
+        """Test the requests are counted by route and status."""
+        route = "{{ cookiecutter.service_slug }}/health/"
+        labels = {"method": "GET", "route": route, "status": "204"}
+        count = self.get_sample_value("django_http_requests_total", **labels)
+        unmatched_count = self.get_sample_value(
+            "django_http_requests_total",
+            method="GET",
+            route="<unmatched>",
+            status="404",
+        )
+        self.client.get("/{{ cookiecutter.service_slug }}/health/")
+        self.client.get("/missing/")
+        self.assertEqual(
+            self.get_sample_value("django_http_requests_total", **labels), count + 1
+        )
+        self.assertEqual(
+            self.get_sample_value(
+                "django_http_requests_total",
+                method="GET",
+                route="<unmatched>",
+                status="404",
+            ),
+            unmatched_count + 1,
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'django_http_request_duration_seconds_count{route="'
+            + route
+            + '",status="204"}',
+            response.content.decode(),
+        )
+
+    async def test_http_requests_async(self):
+        """Test the requests are counted when handled asynchronously."""
+        labels = {"method": "GET", "route": "<unmatched>", "status": "404"}
+        count = self.get_sample_value("django_http_requests_total", **labels)
+        await AsyncClient().get("/missing/")
+        self.assertEqual(
+            self.get_sample_value("django_http_requests_total", **labels), count + 1
+        )
+        response = await AsyncClient().get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_restricted(self):
+        """Test the metrics are only served directly to the allowed networks."""
+        for client in (
+            Client(REMOTE_ADDR="203.0.113.1"),
+            Client(REMOTE_ADDR=""),
+            Client(headers={"x-forwarded-for": "10.0.0.1"}),
+        ):
+            with self.subTest(client=client):
+                self.assertEqual(client.get(self.url).status_code, 404)
+        with override_settings(METRICS_ALLOWED_NETWORKS=["203.0.113.0/24"]):
+            response = Client(REMOTE_ADDR="203.0.113.1").get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_multiprocess(self):
+        """Test the metrics of all the workers are served in multiprocess mode."""
+        with TemporaryDirectory() as tmp_dir, mock.patch.dict(
+            os.environ, PROMETHEUS_MULTIPROC_DIR=tmp_dir
+        ):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+
+    def test_cache_requests(self):
+        """Test the cache hits and misses are counted."""
+        hits = self.get_sample_value(
+            "django_cache_requests_total", alias="default", result="hit"
+        )
+        misses = self.get_sample_value(
+            "django_cache_requests_total", alias="default", result="miss"
+        )
+        cache.set("key", "value")
+        self.assertEqual(cache.get("key"), "value")
+        self.assertEqual(cache.get("missing", "default"), "default")
+        self.assertEqual(cache.get_many(["key", "missing"]), {"key": "value"})
+        self.assertEqual(
+            self.get_sample_value(
+                "django_cache_requests_total", alias="default", result="hit"
+            ),
+            hits + 2,
+        )
+        self.assertEqual(
+            self.get_sample_value(
+                "django_cache_requests_total", alias="default", result="miss"
+            ),
+            misses + 2,
+        )
+
+    def test_db_queries(self):
+        """Test the database queries are timed."""
+        count = self.get_sample_value(
+            "django_db_query_duration_seconds_count", alias="default"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.assertEqual(
+            self.get_sample_value(
+                "django_db_query_duration_seconds_count", alias="default"
+            ),
+            count + 1,
+        )
+        instrument_connection(sender=None, connection=connection)
+        self.assertEqual(connection.execute_wrappers.count(execute_wrapper), 1)
+
+    def test_db_pool_stats(self):
+        """Test the database pool stats are recorded."""
+        requests = self.get_sample_value(
+            "django_db_pool_requests_total", alias="pooled"
+        )
+        pool = mock.Mock()
+        pool.pop_stats.return_value = {
+            "pool_min": 1,
+            "pool_max": 4,
+            "pool_size": 3,
+            "pool_available": 1,
+            "requests_waiting": 2,
+            "requests_num": 10,
+            "requests_queued": 4,
+            "requests_wait_ms": 1500,
+        }
+        record_pools_stats(connection=mock.Mock(alias="pooled", pool=pool))
+        self.assertEqual(
+            self.get_sample_value(
+                "django_db_pool_connections", alias="pooled", state="in_use"
+            ),
+            2,
+        )
+        self.assertEqual(
+            self.get_sample_value("django_db_pool_requests_waiting", alias="pooled"),
+            2,
+        )
+        self.assertEqual(
+            self.get_sample_value("django_db_pool_requests_total", alias="pooled"),
+            requests + 10,
+        )
+        response = self.client.get(self.url)
+        self.assertIn(
+            'django_db_pool_max_size{alias="pooled"} 4.0', response.content.decode()
+        )
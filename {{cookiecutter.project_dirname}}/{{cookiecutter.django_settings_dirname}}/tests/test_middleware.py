@@ -0,0 +1,152 @@
+"""The project middleware tests."""
+
+import re
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from {{ cookiecutter.django_settings_dirname }}.middleware import (
+    PRIMARY_PIN_COOKIE,
+    ReplicaPinningMiddleware,
+    ServerTimingMiddleware,
+)
+from {{ cookiecutter.django_settings_dirname }}.routers import ReplicaRouter
+
+SERVER_TIMING_PATTERN = (
+    r'^db;dur=[\d.]+;desc="(\d+) queries", '
+    r'cache;dur=[\d.]+;desc="(\d+) calls", '
+    r"view;dur=[\d.]+$"
+)
+
+
+def get_response(request):
+    """Return a response, querying the database and the cache."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.execute("SELECT 2")
+    cache.get_or_set("key", "value")
+    cache.get("key")
+    return HttpResponse()
+
+
+async def aget_response(request):
+    """Return a response, querying the database and the cache, asynchronously."""
+    return await sync_to_async(get_response)(request)
+
+
+@override_settings(SERVER_TIMING=True)
+class ServerTimingMiddlewareTest(TestCase):
+    """The Server-Timing middleware tests."""
+
+    def assertServerTiming(self, response, queries, calls):
+        """Assert the response Server-Timing header has the given counts."""
+        match = re.match(SERVER_TIMING_PATTERN, response["Server-Timing"])
+        self.assertIsNotNone(match)
+        self.assertEqual(match.groups(), (str(queries), str(calls)))
+
+    def test_disabled(self):
+        """Test the middleware is not used when disabled."""
+        with override_settings(SERVER_TIMING=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ServerTimingMiddleware(get_response)
+
+    def test_server_timing(self):
+        """Test the database queries and the cache calls are timed."""
+        request = RequestFactory().get("/")
+        with self.assertNoLogs("{{ cookiecutter.django_settings_dirname }}.middleware"):
+            response = ServerTimingMiddleware(get_response)(request)
+        self.assertServerTiming(response, 2, 2)
+        get_response(request)
+        response = ServerTimingMiddleware(get_response)(request)
+        self.assertServerTiming(response, 2, 2)
+
+    async def test_server_timing_async(self):
+        """Test the database queries and the cache calls are timed asynchronously."""
+        # the middleware is loaded synchronously, like by the ASGI handler
+        middleware = await sync_to_async(ServerTimingMiddleware)(aget_response)
+        response = await middleware(RequestFactory().get("/"))
+        self.assertServerTiming(response, 2, 2)
+
+    @override_settings(
+        SERVER_TIMING_SLOW_REQUEST=0,
+        SERVER_TIMING_SLOW_SAMPLE_RATE=1,
+        SERVER_TIMING_TOP_QUERIES=1,
+    )
+    def test_slow_request(self):
+        """Test the slow requests are logged, with their slowest queries."""
+        with self.assertLogs(
+            "{{ cookiecutter.django_settings_dirname }}.middleware", "WARNING"
+        ) as logs:
+            ServerTimingMiddleware(get_response)(RequestFactory().get("/slow/"))
+        self.assertEqual(len(logs.records), 1)
+        message = logs.records[0].getMessage()
+        self.assertTrue(message.startswith("Slow request GET /slow/ ("))
+        self.assertEqual(len(re.findall(r"\n\t[\d.]+ms SELECT \d", message)), 1)
+
+
+def get_routed_response(request):
+    """Return a response with the database routed for a read, writing if a POST."""
+    if request.method == "POST":
+        ReplicaRouter().db_for_write(None)
+    return HttpResponse(ReplicaRouter().db_for_read(None))
+
+
+async def aget_routed_response(request):
+    """Return a response with the database routed for a read, asynchronously."""
+    return await sync_to_async(get_routed_response)(request)
+
+
+class ReplicaPinningMiddlewareTest(SimpleTestCase):
+    """The replica pinning middleware tests."""
+
+    def setUp(self):
+        """Mock a configured replica."""
+        for target in (
+            "{{ cookiecutter.django_settings_dirname }}.middleware.get_replicas",
+            "{{ cookiecutter.django_settings_dirname }}.routers.get_replicas",
+        ):
+            patcher = mock.patch(target, return_value={"replica_1": 1})
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch(
+            "{{ cookiecutter.django_settings_dirname }}.routers.replica_lags.get_lags",
+            return_value={"replica_1": 0.0},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return super().setUp()
+
+    def test_no_replicas(self):
+        """Test the middleware is not used, if no replica is configured."""
+        with mock.patch(
+            "{{ cookiecutter.django_settings_dirname }}.middleware.get_replicas",
+            return_value={},
+        ), self.assertRaises(MiddlewareNotUsed):
+            ReplicaPinningMiddleware(get_routed_response)
+
+    def test_pinning(self):
+        """Test the reads are pinned to the primary database after a write."""
+        middleware = ReplicaPinningMiddleware(get_routed_response)
+        response = middleware(RequestFactory().get("/"))
+        self.assertEqual(response.content, b"replica_1")
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+        response = middleware(RequestFactory().post("/"))
+        self.assertEqual(response.content, b"default")
+        self.assertEqual(response.cookies[PRIMARY_PIN_COOKIE]["max-age"], 5)
+        request = RequestFactory().get("/")
+        request.COOKIES[PRIMARY_PIN_COOKIE] = "1"
+        self.assertEqual(middleware(request).content, b"default")
+
+    async def test_pinning_async(self):
+        """Test the reads are pinned to the primary database, asynchronously."""
+        middleware = ReplicaPinningMiddleware(aget_routed_response)
+        response = await middleware(RequestFactory().get("/"))
+        self.assertEqual(response.content, b"replica_1")
+        response = await middleware(RequestFactory().post("/"))
+        self.assertEqual(response.content, b"default")
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
@@ -0,0 +1,145 @@
+"""The database routers tests."""
+
+from contextvars import copy_context
+from math import inf
+from unittest import mock
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.test import SimpleTestCase, override_settings
+
+from {{ cookiecutter.django_settings_dirname }}.routers import (
+    PrimaryPin,
+    ReplicaLags,
+    ReplicaRouter,
+    get_replicas,
+    measure_lag,
+    primary_pin,
+)
+
+ROUTERS_MODULE = "{{ cookiecutter.django_settings_dirname }}.routers"
+
+REPLICAS = {"replica_1": 3, "replica_2": 1}
+
+
+@override_settings(DATABASE_REPLICA_MAX_LAG=5)
+class ReplicaRouterTest(SimpleTestCase):
+    """The replica router tests."""
+
+    router = ReplicaRouter()
+
+    def setUp(self):
+        """Mock the configured replicas and their lags."""
+        self.lags = {"replica_1": 0.0, "replica_2": 1.0}
+        for target, kwargs in (
+            (f"{ROUTERS_MODULE}.get_replicas", {"return_value": REPLICAS}),
+            (f"{ROUTERS_MODULE}.replica_lags.get_lags", {"return_value": self.lags}),
+        ):
+            patcher = mock.patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return super().setUp()
+
+    def test_get_replicas(self):
+        """Test the replicas are the aliases with the prefix, with their weights."""
+        databases = {"default": {}, "replica_1": {}, "replica_2": {}, "other": {}}
+        with mock.patch.object(settings, "DATABASES", databases), override_settings(
+            DATABASE_REPLICA_WEIGHTS=[3]
+        ):
+            self.assertEqual(get_replicas(), REPLICAS)
+
+    def test_no_replicas(self):
+        """Test the router is not used, if no replica is configured."""
+        with mock.patch(f"{ROUTERS_MODULE}.get_replicas", return_value={}):
+            self.assertIsNone(self.router.db_for_read(None))
+            self.assertIsNone(self.router.db_for_write(None))
+
+    def test_db_for_read(self):
+        """Test the reads are routed to the healthy replicas."""
+        self.assertIn(self.router.db_for_read(None), REPLICAS)
+        self.lags["replica_2"] = 10.0
+        self.assertEqual(self.router.db_for_read(None), "replica_1")
+        self.lags["replica_1"] = inf
+        self.assertEqual(self.router.db_for_read(None), "default")
+
+    def test_db_for_write(self):
+        """Test the writes pin the next reads to the primary database."""
+        pin = PrimaryPin()
+        token = primary_pin.set(pin)
+        self.addCleanup(primary_pin.reset, token)
+        self.assertIn(self.router.db_for_read(None), REPLICAS)
+        self.assertEqual(self.router.db_for_write(None), "default")
+        self.assertTrue(pin.written)
+        self.assertEqual(self.router.db_for_read(None), "default")
+        with override_settings(DATABASE_REPLICA_PIN_SECONDS=0):
+            pin = PrimaryPin()
+            primary_pin.set(pin)
+            self.router.db_for_write(None)
+            self.assertIn(self.router.db_for_read(None), REPLICAS)
+
+    def test_db_for_write_outside_request(self):
+        """Test the writes outside the requests pin the reads of their context."""
+
+        def write_and_read():
+            self.router.db_for_write(None)
+            return self.router.db_for_read(None)
+
+        self.assertEqual(copy_context().run(write_and_read), "default")
+        self.assertIsNone(primary_pin.get())
+
+    def test_allow_relation(self):
+        """Test the relations between the primary and the replicas are allowed."""
+        self.assertTrue(
+            self.router.allow_relation(
+                mock.Mock(_state=mock.Mock(db="default")),
+                mock.Mock(_state=mock.Mock(db="replica_1")),
+            )
+        )
+        self.assertIsNone(
+            self.router.allow_relation(
+                mock.Mock(_state=mock.Mock(db="default")),
+                mock.Mock(_state=mock.Mock(db="other")),
+            )
+        )
+
+    def test_allow_migrate(self):
+        """Test the replicas are not migrated."""
+        self.assertFalse(self.router.allow_migrate("replica_1", "auth"))
+        self.assertIsNone(self.router.allow_migrate("default", "auth"))
+
+
+class ReplicaLagsTest(SimpleTestCase):
+    """The replicas lags tests."""
+
+    def test_get_lags(self):
+        """Test the lags are measured once per check interval."""
+        replica_lags = ReplicaLags()
+        with mock.patch(
+            f"{ROUTERS_MODULE}.measure_lag", return_value=1.0
+        ) as mocked_measure_lag:
+            self.assertEqual(
+                replica_lags.get_lags(REPLICAS), {"replica_1": 1.0, "replica_2": 1.0}
+            )
+            replica_lags.get_lags(REPLICAS)
+            self.assertEqual(mocked_measure_lag.call_count, 2)
+            replica_lags.clear()
+            replica_lags.get_lags(REPLICAS)
+            self.assertEqual(mocked_measure_lag.call_count, 4)
+
+    def test_measure_lag(self):
+        """Test measuring the lag of the PostgreSQL replicas."""
+        connection = mock.MagicMock(vendor="postgresql")
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (2.5,)
+        with mock.patch(f"{ROUTERS_MODULE}.connections", {"replica_1": connection}):
+            self.assertEqual(measure_lag("replica_1"), 2.5)
+            cursor.execute.side_effect = DatabaseError
+            with self.assertLogs(ROUTERS_MODULE, "WARNING"):
+                self.assertEqual(measure_lag("replica_1"), inf)
+
+    def test_measure_lag_other_vendor(self):
+        """Test the lag of the other databases replicas is not measured."""
+        connection = mock.Mock(vendor="sqlite")
+        with mock.patch(f"{ROUTERS_MODULE}.connections", {"replica_1": connection}):
+            self.assertEqual(measure_lag("replica_1"), 0.0)
+        connection.cursor.assert_not_called()
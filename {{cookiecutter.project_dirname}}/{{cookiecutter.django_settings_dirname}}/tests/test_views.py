@@ -1,6 +1,13 @@
 """The main app views tests."""
 
-from django.test import Client, TestCase
+from concurrent.futures import wait
+from threading import Event
+from unittest import mock
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+
+from {{ cookiecutter.django_settings_dirname }}.readiness import readiness_checks
 
 
 class ApiHealthTest(TestCase):
@@ -60,3 +67,92 @@ class ApiHealthTest(TestCase):
         with self.subTest("POST"):
             response = self.client.post(self.url)
             self.assertEqual(response.status_code, 405)
+
+
+class ApiReadinessTest(TestCase):
+    """The readiness view tests."""
+
+    url = "/{{ cookiecutter.service_slug }}/ready/"
+    client = Client()
+    databases = "__all__"
+
+    def setUp(self):
+        """Clear the cached readiness checks results."""
+        readiness_checks.clear()
+        self.addCleanup(readiness_checks.clear)
+        # the checks released by the test are awaited, not to be reused by the next
+        self.addCleanup(lambda: wait(readiness_checks.futures.values()))
+        return super().setUp()
+
+    def test_ready(self):
+        """Test the readiness endpoint, when all the checks pass."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                **{f"database:{i}": "ok" for i in settings.DATABASES},
+                "cache:default": "ok",
+                "storage:default": "ok",
+            },
+        )
+        self.assertEqual(self.client.head(self.url).status_code, 200)
+
+    def test_cached(self):
+        """Test the checks results are cached."""
+        self.client.get(self.url)
+        with mock.patch(
+            "{{ cookiecutter.django_settings_dirname }}.readiness.check_storage"
+        ) as check_storage:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        check_storage.assert_not_called()
+
+    @override_settings(READINESS_CHECK_TIMEOUT=0.05)
+    def test_not_ready(self):
+        """Test the readiness endpoint, when a check fails or times out."""
+        released = Event()
+        self.addCleanup(released.set)
+        with mock.patch(
+            "{{ cookiecutter.django_settings_dirname }}.readiness.check_cache",
+            side_effect=ConnectionError,
+        ), mock.patch(
+            "{{ cookiecutter.django_settings_dirname }}.readiness.check_storage",
+            side_effect=released.wait,
+        ), self.assertLogs(
+            "{{ cookiecutter.django_settings_dirname }}.readiness", "WARNING"
+        ) as logs:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response.json(),
+            {
+                **{f"database:{i}": "ok" for i in settings.DATABASES},
+                "cache:default": "error",
+                "storage:default": "timeout",
+            },
+        )
+        self.assertEqual(len(logs.records), 2)
+
+    @override_settings(READINESS_CHECK_TIMEOUT=0.05)
+    def test_running(self):
+        """Test the checks still running are not run again."""
+        released = Event()
+        self.addCleanup(released.set)
+        with mock.patch(
+            "{{ cookiecutter.django_settings_dirname }}.readiness.check_storage",
+            side_effect=released.wait,
+        ) as check_storage, self.assertLogs(
+            "{{ cookiecutter.django_settings_dirname }}.readiness", "WARNING"
+        ):
+            self.client.get(self.url)
+            readiness_checks.clear()
+            response = self.client.get(self.url)
+            self.assertEqual(response.json()["storage:default"], "timeout")
+            check_storage.assert_called_once_with()
+            released.set()
+            wait(readiness_checks.futures.values())
+            readiness_checks.clear()
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(check_storage.call_count, 2)
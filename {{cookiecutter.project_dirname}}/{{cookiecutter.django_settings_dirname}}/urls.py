@@ -23,7 +23,7 @@ from django.contrib import admin
 from django.urls import include, path, re_path
 from django.views.static import serve
 
-from .views import HealthView
+from .views import HealthView, ReadinessView
 
 admin.site.site_header = admin.site.site_title = "{{ cookiecutter.project_name }}"
 
@@ -34,6 +34,11 @@ urlpatterns = [
         HealthView.as_view(),
         name="health-check",
     ),
+    path(
+        "{{ cookiecutter.service_slug }}/ready/",
+        ReadinessView.as_view(),
+        name="readiness-check",
+    ),
 ]
 
 if settings.DEBUG:  # pragma: no cover
@@ -1,8 +1,11 @@
 """The main app views."""
 
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
 from django.views.generic import View
 
+from .readiness import readiness_checks
+
 
 class HealthView(View):
     """The health endpoint view."""
@@ -12,3 +15,17 @@ class HealthView(View):
     def get(self, request, *args, **kwargs):
         """Return health endpoint GET response."""
         return HttpResponse(status=204)
+
+
+class ReadinessView(View):
+    """The readiness endpoint view."""
+
+    http_method_names = ("get", "head", "options")
+
+    async def get(self, request, *args, **kwargs):
+        """Return the backends checks results, with a 503 status if any failed."""
+        results = await sync_to_async(
+            readiness_checks.get_results, thread_sensitive=False
+        )()
+        status = 200 if all(i == "ok" for i in results.values()) else 503
+        return JsonResponse(results, status=status)